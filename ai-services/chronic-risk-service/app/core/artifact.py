@@ -0,0 +1,215 @@
+"""
+Formato de artefato mapeável em memória para o pipeline LightGBM.
+
+O artefato é um diretório com:
+    manifest.json  versão, colunas, categorias, classes, metadados e lista de arquivos
+    *.npy          arrays do scaler, do encoder e das árvores (scorer compilado)
+    booster.txt    modelo LightGBM em texto (caminho nativo, carregado sob demanda)
+
+Os arrays são abertos com np.load(mmap_mode='r'): carregar o modelo leva
+milissegundos, não importa sklearn/lightgbm/pandas, e processos que abrem o
+mesmo artefato compartilham as páginas pelo page cache do sistema.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.compiled_scorer import CompiledScorer, compile_pipeline
+from app.core.features import NUMERIC_FEATURES, CATEGORICAL_FEATURES, CATEGORY_LABELS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ARTIFACT_FORMAT = "chronic-risk-mmap"
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+BOOSTER_FILE = "booster.txt"
+
+# Arrays de índices salvos já em intp para uso direto (sem cópia) após o mmap
+_INDEX_ARRAYS = ('tree_feature', 'tree_left', 'tree_right', 'tree_roots')
+
+def is_model_artifact(path: str) -> bool:
+    """
+    Se o caminho é um diretório de artefato mapeável (contém manifest.json)
+    """
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_FILE))
+
+def artifact_stamp_path(path: str) -> str:
+    """
+    Arquivo cuja data de modificação identifica a versão do artefato
+    (manifest.json para diretórios, o próprio arquivo para joblib)
+    """
+    return os.path.join(path, MANIFEST_FILE) if os.path.isdir(path) else path
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _json_safe(value: Any) -> Any:
+    """
+    Converte metadados de treinamento (tuplas, escalares/arrays NumPy) para JSON
+    """
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+def export_model_artifact(pipeline: Any, directory: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Salva o pipeline treinado como artefato mapeável em memória.
+    O manifest é escrito por último, de modo que um diretório sem manifest
+    nunca é tratado como artefato completo.
+    """
+    arrays = compile_pipeline(pipeline)
+    for name in _INDEX_ARRAYS:
+        arrays[name] = np.asarray(arrays[name], dtype=np.intp)
+
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    files: Dict[str, Dict[str, Any]] = {}
+    for name, array in arrays.items():
+        filename = f"{name}.npy"
+        path = os.path.join(directory, filename)
+        np.save(path, array, allow_pickle=False)
+        files[name] = {
+            "file": filename,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "sha256": _sha256(path)
+        }
+
+    booster_path = os.path.join(directory, BOOSTER_FILE)
+    pipeline.named_steps['classifier'].booster_.save_model(booster_path)
+
+    metadata = metadata or {}
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model_version": metadata.get('model_version'),
+        "created_at": datetime.now().isoformat(),
+        "numeric_features": NUMERIC_FEATURES,
+        "categorical_features": CATEGORICAL_FEATURES,
+        "classes": np.asarray(arrays['classes']).tolist(),
+        "arrays": files,
+        "booster": {"file": BOOSTER_FILE, "sha256": _sha256(booster_path)},
+        "metadata": _json_safe(metadata)
+    }
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+    return directory
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    """
+    Lê e valida o manifest do artefato
+    """
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != ARTIFACT_FORMAT or manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Artefato não suportado: {manifest.get('format')} v{manifest.get('format_version')}"
+        )
+    if manifest["numeric_features"] != NUMERIC_FEATURES or manifest["categorical_features"] != CATEGORICAL_FEATURES:
+        raise ValueError("Colunas do artefato diferem das features do serviço")
+    return manifest
+
+def verify_model_artifact(directory: str) -> Dict[str, bool]:
+    """
+    Confere o sha256 de cada arquivo do artefato contra o manifest
+    """
+    manifest = read_manifest(directory)
+    entries = dict(manifest["arrays"])
+    entries["booster"] = manifest["booster"]
+    return {
+        name: _sha256(os.path.join(directory, entry["file"])) == entry["sha256"]
+        for name, entry in entries.items()
+    }
+
+class ArtifactModel:
+    """
+    Modelo carregado de um artefato mapeável, com a interface usada pelo
+    ModelManager (classes_, predict_proba(DataFrame), get/set_params(n_jobs)).
+    predict_proba usa o booster LightGBM nativo, carregado na primeira chamada;
+    o caminho de serviço usa o scorer compilado sobre os arrays mapeados.
+    """
+
+    def __init__(self, directory: str, manifest: Dict[str, Any], scorer: CompiledScorer):
+        self.directory = directory
+        self.manifest = manifest
+        self.scorer = scorer
+        self.classes_ = np.asarray(manifest["classes"])
+        self.n_jobs: Optional[int] = None
+        self._booster = None
+        self._booster_lock = threading.Lock()
+
+    def get_params(self, deep: bool = True) -> Dict[str, Any]:
+        return {"n_jobs": self.n_jobs}
+
+    def set_params(self, **params: Any) -> "ArtifactModel":
+        self.n_jobs = params.get("n_jobs", self.n_jobs)
+        return self
+
+    @property
+    def booster(self):
+        """
+        Booster LightGBM do booster.txt (importa lightgbm apenas quando necessário)
+        """
+        if self._booster is None:
+            with self._booster_lock:
+                if self._booster is None:
+                    import lightgbm as lgb
+                    self._booster = lgb.Booster(
+                        model_file=os.path.join(self.directory, self.manifest["booster"]["file"])
+                    )
+        return self._booster
+
+    def predict_proba(self, df: "pd.DataFrame") -> np.ndarray:
+        """
+        Probabilidades [classe 0, classe 1] para o DataFrame de features (mesmas colunas do pipeline)
+        """
+        numeric = df[NUMERIC_FEATURES].to_numpy(dtype=np.float64)
+        codes = np.empty((len(df), len(CATEGORICAL_FEATURES)), dtype=np.intp)
+        for j, column in enumerate(CATEGORICAL_FEATURES):
+            labels = list(CATEGORY_LABELS[column])
+            try:
+                codes[:, j] = [labels.index(value) for value in df[column]]
+            except ValueError as e:
+                raise ValueError(f"Categoria desconhecida em {column}: {e}")
+        X = self.scorer.transform(numeric, codes)
+        kwargs = {"num_threads": self.n_jobs} if self.n_jobs else {}
+        positive = self.booster.predict(X, **kwargs)
+        return np.column_stack([1.0 - positive, positive])
+
+def load_model_artifact(directory: str) -> Tuple[ArtifactModel, Dict[str, Any]]:
+    """
+    Abre o artefato com os arrays mapeados em memória (somente leitura)
+    """
+    manifest = read_manifest(directory)
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        array = np.load(os.path.join(directory, entry["file"]), mmap_mode='r', allow_pickle=False)
+        if array.dtype.str != entry["dtype"] or list(array.shape) != entry["shape"]:
+            raise ValueError(f"Array {name} do artefato não corresponde ao manifest")
+        arrays[name] = array
+    scorer = CompiledScorer(arrays)
+    return ArtifactModel(directory, manifest, scorer), manifest.get("metadata") or {}
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_MAX_INFLIGHT
+from app.core.model_manager import ModelManager, model_manager
+from app.core.executor import InferenceExecutor, inference_executor
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores dos buckets do histograma de tamanho de lote
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+class PredictionBatcher:
+    """
+    Agrupa predições individuais concorrentes em lotes.
+
+    Requisições que chegam dentro da janela (max_wait_ms) ou até max_batch_size
+    itens são pontuadas com uma única chamada vetorizada a predict_batch no
+    pool de inferência, e o future de cada chamador é resolvido com o seu resultado. Até
+    max_inflight lotes são pontuados ao mesmo tempo; enquanto isso o próximo
+    lote continua sendo coletado.
+    """
+
+    def __init__(
+        self,
+        manager: ModelManager,
+        executor: InferenceExecutor,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+        max_inflight: int = BATCH_MAX_INFLIGHT
+    ):
+        self.manager = manager
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_inflight = max(1, max_inflight)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._tasks: set = set()
+        # Lote em coleta, ainda não despachado (pontuado no stop)
+        self._collecting: List[Tuple[Dict[str, Any], asyncio.Future, float]] = []
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._batches = 0
+        self._items = 0
+        self._failed_batches = 0
+        self._max_batch = 0
+        self._last_batch = 0
+        self._inflight_items = 0
+        self._wait_total = 0.0
+        self._score_total = 0.0
+        self._size_histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Batching ativo (iniciado e com lotes de mais de um item)
+        """
+        return self._worker is not None and self.max_batch_size > 1
+
+    async def start(self):
+        """
+        Inicia o coletor de lotes no event loop atual
+        """
+        if self._worker is not None or self.max_batch_size <= 1:
+            return
+        self._queue = asyncio.Queue()
+        self._inflight = asyncio.Semaphore(self.max_inflight)
+        self._reset_stats()
+        self._worker = asyncio.create_task(self._collect())
+        logger.info(
+            f"Micro-batching ativo: até {self.max_batch_size} itens ou "
+            f"{self.max_wait * 1000:.1f}ms por lote, {self.max_inflight} lote(s) simultâneo(s)"
+        )
+
+    async def stop(self):
+        """
+        Para o coletor, aguardando os lotes em andamento e pontuando os pendentes
+        """
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        pending, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            await self._score(pending)
+
+    async def predict(self, patient: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Predição de um paciente, agrupada com as demais requisições concorrentes
+        """
+        # Acerto no cache dispensa a janela de coleta e o pool de inferência
+        cached = self.manager.cached_prediction(patient)
+        if cached is not None:
+            return cached
+        if not self.enabled:
+            return await self.executor.run(self.manager.predict, patient)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((patient, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        """
+        Loop de coleta: forma um lote por janela e o despacha para pontuação
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = self._collecting = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._inflight.acquire()
+            self._collecting = []
+            task = asyncio.create_task(self._score(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._score_done)
+
+    def _score_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        self._inflight.release()
+
+    async def _score(self, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]]):
+        """
+        Pontua um lote no pool de inferência e resolve o future de cada chamador
+        """
+        started = time.perf_counter()
+        self._inflight_items += len(batch)
+        patients = [patient for patient, _, _ in batch]
+        try:
+            try:
+                results = await self.executor.run(self.manager.predict_batch, patients)
+            except Exception as e:
+                self._failed_batches += 1
+                logger.error(f"Erro ao pontuar lote de {len(batch)} pacientes: {e}")
+                # Isola a falha: cada item é pontuado individualmente
+                results = await self.executor.run(self._predict_each, patients)
+        except Exception as e:
+            # O fallback também falhou: todos os chamadores recebem o erro
+            logger.error(f"Erro ao pontuar individualmente lote de {len(batch)} pacientes: {e}")
+            results = [e] * len(batch)
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        finally:
+            self._inflight_items -= len(batch)
+        self._record(batch, started)
+
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue  # chamador cancelado
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _predict_each(self, patients: List[Dict[str, Any]]) -> List[Any]:
+        results: List[Any] = []
+        for patient in patients:
+            try:
+                results.append(self.manager.predict(patient))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _record(self, batch: List[Tuple[Dict[str, Any], asyncio.Future, float]], started: float):
+        size = len(batch)
+        self._batches += 1
+        self._items += size
+        self._last_batch = size
+        self._max_batch = max(self._max_batch, size)
+        self._wait_total += sum(started - enqueued for _, _, enqueued in batch)
+        self._score_total += time.perf_counter() - started
+        bucket = next(
+            (i for i, limit in enumerate(BATCH_SIZE_BUCKETS) if size <= limit),
+            len(BATCH_SIZE_BUCKETS)
+        )
+        self._size_histogram[bucket] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Profundidade da fila e estatísticas de tamanho/latência dos lotes
+        """
+        histogram = {
+            f"le_{limit}": count
+            for limit, count in zip(BATCH_SIZE_BUCKETS, self._size_histogram)
+        }
+        histogram[f"gt_{BATCH_SIZE_BUCKETS[-1]}"] = self._size_histogram[-1]
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_inflight": self.max_inflight,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "inflight_batches": len(self._tasks),
+            "inflight_items": self._inflight_items,
+            "batches": self._batches,
+            "items": self._items,
+            "failed_batches": self._failed_batches,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size_seen": self._max_batch,
+            "last_batch_size": self._last_batch,
+            "avg_queue_wait_ms": round(self._wait_total / self._items * 1000, 3) if self._items else 0.0,
+            "avg_score_ms": round(self._score_total / self._batches * 1000, 3) if self._batches else 0.0,
+            "batch_size_histogram": histogram
+        }
+
+# Instância global
+prediction_batcher = PredictionBatcher(model_manager, inference_executor)
+
+def get_prediction_batcher() -> PredictionBatcher:
+    """
+    Dependency injection para o batcher de predições
+    """
+    return prediction_batcher
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.config import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL
+from app.core.features import RAW_FEATURES
+
+def prediction_cache_key(model_version: str, patient: Dict[str, Any]) -> Tuple[Hashable, ...]:
+    """
+    Chave do cache: versão do modelo + features de entrada normalizadas
+    (70 e 70.0 geram a mesma chave; user_id e demais campos são ignorados)
+    """
+    return (model_version,) + tuple(float(patient[name]) for name in RAW_FEATURES)
+
+class PredictionCache:
+    """
+    Cache LRU thread-safe com expiração (TTL) para resultados de predição
+    """
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, ttl: float = PREDICTION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable, record_miss: bool = True) -> Optional[Any]:
+        """
+        Valor em cache para a chave, ou None se ausente/expirado.
+        record_miss=False para consultas prévias que serão repetidas no caminho de predição.
+        """
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += record_miss
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += record_miss
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Armazena o valor, descartando as entradas menos usadas acima do limite
+        """
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """
+        Invalida todas as entradas (ex.: troca de modelo)
+        """
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Tamanho, hits/misses e descartes do cache
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations
+            }
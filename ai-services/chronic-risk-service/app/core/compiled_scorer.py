@@ -0,0 +1,382 @@
+"""
+Scorer compilado em NumPy puro para o pipeline LightGBM treinado.
+
+O StandardScaler, as categorias do OneHotEncoder e o ensemble de árvores são
+achatados em arrays compactos, e a predição percorre todas as árvores de todas
+as linhas simultaneamente, sem DataFrame nem ColumnTransformer.
+"""
+
+import numpy as np
+from typing import Any, Dict, List, Mapping
+
+from app.core.features import (
+    NUMERIC_FEATURES, CATEGORICAL_FEATURES, CATEGORY_LABELS,
+    build_feature_arrays, build_patient_frame
+)
+
+FORMAT_VERSION = 1
+
+# Códigos de missing_type do LightGBM
+MISSING_NONE = 0
+MISSING_ZERO = 1
+MISSING_NAN = 2
+_MISSING_TYPES = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+
+# Mesmo limiar usado pelo LightGBM para considerar um valor como zero
+_ZERO_THRESHOLD = 1e-35
+
+# Coluna one-hot de categoria descartada (drop='first') / desconhecida pelo encoder
+_DROPPED = -1
+_UNKNOWN = -2
+
+
+def _flatten_trees(tree_info: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Converte a estrutura de árvores do dump_model em arrays planos.
+    Folhas apontam para si mesmas, de modo que iterar `depth` vezes sempre
+    termina em uma folha.
+    """
+    feature: List[int] = []
+    threshold: List[float] = []
+    left: List[int] = []
+    right: List[int] = []
+    value: List[float] = []
+    missing: List[int] = []
+    default_left: List[bool] = []
+    roots: List[int] = []
+    max_depth = 0
+
+    def add_node(node: Dict[str, Any], depth: int) -> int:
+        nonlocal max_depth
+        index = len(feature)
+        feature.append(0)
+        threshold.append(np.inf)
+        left.append(index)
+        right.append(index)
+        value.append(0.0)
+        missing.append(MISSING_NONE)
+        default_left.append(True)
+
+        if 'leaf_value' in node:
+            value[index] = node['leaf_value']
+            max_depth = max(max_depth, depth)
+            return index
+
+        if node.get('decision_type') != '<=':
+            raise ValueError(f"Split não suportado pelo scorer compilado: {node.get('decision_type')}")
+        feature[index] = node['split_feature']
+        threshold[index] = node['threshold']
+        missing[index] = _MISSING_TYPES[node.get('missing_type', 'None')]
+        default_left[index] = bool(node.get('default_left', True))
+        left[index] = add_node(node['left_child'], depth + 1)
+        right[index] = add_node(node['right_child'], depth + 1)
+        return index
+
+    for tree in tree_info:
+        roots.append(add_node(tree['tree_structure'], 0))
+
+    return {
+        'tree_feature': np.asarray(feature, dtype=np.int32),
+        'tree_threshold': np.asarray(threshold, dtype=np.float64),
+        'tree_left': np.asarray(left, dtype=np.int32),
+        'tree_right': np.asarray(right, dtype=np.int32),
+        'tree_value': np.asarray(value, dtype=np.float64),
+        'tree_missing': np.asarray(missing, dtype=np.int8),
+        'tree_default_left': np.asarray(default_left, dtype=bool),
+        'tree_roots': np.asarray(roots, dtype=np.int32),
+        'tree_depth': np.asarray(max_depth, dtype=np.int32)
+    }
+
+
+def compile_pipeline(pipeline: Any) -> Dict[str, np.ndarray]:
+    """
+    Extrai scaler, encoder e árvores de um Pipeline (preprocessor + LGBMClassifier)
+    """
+    preprocessor = pipeline.named_steps['preprocessor']
+    classifier = pipeline.named_steps['classifier']
+    transformers = {name: (transformer, list(columns))
+                    for name, transformer, columns in preprocessor.transformers_}
+    scaler, numeric_columns = transformers['num']
+    encoder, categorical_columns = transformers['cat']
+    if numeric_columns != NUMERIC_FEATURES or categorical_columns != CATEGORICAL_FEATURES:
+        raise ValueError("Colunas do pipeline diferem de app.core.features")
+    if not hasattr(classifier, 'booster_'):
+        raise ValueError(f"Classificador não suportado: {type(classifier).__name__}")
+
+    dump = classifier.booster_.dump_model()
+    objective = dump.get('objective', '')
+    if not objective.startswith('binary') or dump.get('num_class') != 1 or dump.get('average_output'):
+        raise ValueError(f"Objetivo não suportado pelo scorer compilado: {objective}")
+    sigmoid = 1.0
+    for token in objective.split():
+        if token.startswith('sigmoid:'):
+            sigmoid = float(token.split(':', 1)[1])
+
+    n_numeric = len(NUMERIC_FEATURES)
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(n_numeric)
+    scale = scaler.scale_ if scaler.with_std else np.ones(n_numeric)
+
+    # Coluna de saída do one-hot para cada código de categoria de app.core.features
+    max_labels = max(len(labels) for labels in CATEGORY_LABELS.values())
+    category_columns = np.full((len(CATEGORICAL_FEATURES), max_labels), _UNKNOWN, dtype=np.int32)
+    column = n_numeric
+    drop_idx = encoder.drop_idx_ if encoder.drop_idx_ is not None else [None] * len(CATEGORICAL_FEATURES)
+    for j, name in enumerate(CATEGORICAL_FEATURES):
+        categories = list(encoder.categories_[j])
+        output_columns: Dict[Any, int] = {}
+        for k, category in enumerate(categories):
+            if drop_idx[j] is not None and k == drop_idx[j]:
+                output_columns[category] = _DROPPED
+            else:
+                output_columns[category] = column
+                column += 1
+        for code, label in enumerate(CATEGORY_LABELS[name]):
+            category_columns[j, code] = output_columns.get(label, _UNKNOWN)
+
+    if column != dump['max_feature_idx'] + 1:
+        raise ValueError("Número de features do modelo difere do pré-processamento")
+
+    arrays = _flatten_trees(dump['tree_info'])
+    arrays.update({
+        'format_version': np.asarray(FORMAT_VERSION, dtype=np.int32),
+        'scaler_mean': np.asarray(mean, dtype=np.float64),
+        'scaler_scale': np.asarray(scale, dtype=np.float64),
+        'category_columns': category_columns,
+        'n_features': np.asarray(column, dtype=np.int32),
+        'sigmoid': np.asarray(sigmoid, dtype=np.float64),
+        'classes': np.asarray(classifier.classes_)
+    })
+    return arrays
+
+
+def export_compiled_model(pipeline: Any, path: str) -> str:
+    """
+    Salva o pipeline compilado em um arquivo .npz
+    """
+    np.savez(path, **compile_pipeline(pipeline))
+    return path
+
+
+class CompiledScorer:
+    """
+    Avalia o pipeline compilado usando apenas operações vetorizadas do NumPy.
+
+    Para uma única linha, todas as condições de split são avaliadas de uma vez,
+    gerando o próximo nó de cada nó; descer as árvores custa então uma única
+    indexação por nível, o que mantém o overhead fixo por chamada baixo. Para
+    lotes, apenas os nós visitados em cada nível são avaliados.
+    Indexação avançada (x[idx]) é usada em vez de np.take, que é mais lento
+    para estes tamanhos de array.
+    """
+
+    # Linhas avaliadas por vez na descida por caminho
+    chunk_size = 4096
+
+    def __init__(self, arrays: Mapping[str, np.ndarray]):
+        if int(arrays['format_version']) != FORMAT_VERSION:
+            raise ValueError(f"Versão de artefato compilado não suportada: {int(arrays['format_version'])}")
+        self.scaler_mean = arrays['scaler_mean']
+        self.scaler_scale = arrays['scaler_scale']
+        self.category_columns = arrays['category_columns']
+        self.n_features = int(arrays['n_features'])
+        self.sigmoid = float(arrays['sigmoid'])
+        self.classes = arrays['classes']
+        # Índices em intp evitam conversões a cada indexação (sem cópia se já
+        # estiverem em intp, preservando arrays mapeados em memória)
+        self.feature = np.asarray(arrays['tree_feature'], dtype=np.intp)
+        self.threshold = arrays['tree_threshold']
+        self.left = np.asarray(arrays['tree_left'], dtype=np.intp)
+        self.right = np.asarray(arrays['tree_right'], dtype=np.intp)
+        self.value = arrays['tree_value']
+        self.missing = arrays['tree_missing']
+        self.default_left = arrays['tree_default_left']
+        self.roots = np.asarray(arrays['tree_roots'], dtype=np.intp)
+        self.depth = int(arrays['tree_depth'])
+        # Sem splits Zero/NaN basta trocar NaN por 0 (semântica de missing_type None)
+        self._simple_missing = not np.any(self.missing != MISSING_NONE)
+        self._n_numeric = self.scaler_mean.shape[0]
+
+        # Filhos intercalados (esquerda, direita) para a descida por caminho
+        self._children = np.stack([self.left, self.right], axis=1).ravel()
+        # Apenas nós de split (folhas apontam para si mesmas)
+        node_ids = np.arange(self.feature.shape[0], dtype=np.intp)
+        self._self_loops = node_ids
+        self._splits = np.flatnonzero(self.left != node_ids)
+        self._split_feature = self.feature[self._splits]
+        self._split_threshold = self.threshold[self._splits]
+        self._split_missing = self.missing[self._splits]
+        self._split_default_left = self.default_left[self._splits]
+        self._split_left = self.left[self._splits]
+        self._split_right = self.right[self._splits]
+        self._build_onehot_table()
+
+    def _build_onehot_table(self):
+        """
+        Pré-calcula o bloco one-hot para cada combinação de códigos de categoria
+        """
+        label_counts = [len(CATEGORY_LABELS[name]) for name in CATEGORICAL_FEATURES]
+        self._code_strides = np.array(
+            [int(np.prod(label_counts[j + 1:])) for j in range(len(label_counts))], dtype=np.intp
+        )
+        combinations = int(np.prod(label_counts))
+        table = np.zeros((combinations, self.n_features - self._n_numeric), dtype=np.float64)
+        valid = np.ones(combinations, dtype=bool)
+        for combination in range(combinations):
+            for j, stride in enumerate(self._code_strides):
+                column = self.category_columns[j, (combination // stride) % label_counts[j]]
+                if column == _UNKNOWN:
+                    valid[combination] = False
+                elif column >= 0:
+                    table[combination, column - self._n_numeric] = 1.0
+        self._onehot_table = table
+        self._onehot_valid = valid
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledScorer":
+        """
+        Carrega um artefato gerado por export_compiled_model
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    @classmethod
+    def from_pipeline(cls, pipeline: Any) -> "CompiledScorer":
+        return cls(compile_pipeline(pipeline))
+
+    def transform(self, numeric: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Equivalente ao ColumnTransformer: padroniza as numéricas e aplica o one-hot
+        """
+        combination = codes @ self._code_strides
+        if not self._onehot_valid[combination].all():
+            raise ValueError("Categoria desconhecida pelo OneHotEncoder do modelo")
+        X = np.empty((numeric.shape[0], self.n_features), dtype=np.float64)
+        X[:, :self._n_numeric] = (numeric - self.scaler_mean) / self.scaler_scale
+        X[:, self._n_numeric:] = self._onehot_table[combination]
+        return X
+
+    def _go_right(
+        self,
+        values: np.ndarray,
+        threshold: np.ndarray,
+        missing: np.ndarray,
+        default_left: np.ndarray
+    ) -> np.ndarray:
+        """
+        Direção de cada split (mesma regra NumericalDecision do LightGBM)
+        """
+        if self._simple_missing:
+            return values > threshold
+        is_nan = np.isnan(values)
+        values = np.where(is_nan & (missing != MISSING_NAN), 0.0, values)
+        use_default = (
+            ((missing == MISSING_ZERO) & (np.abs(values) <= _ZERO_THRESHOLD)) |
+            ((missing == MISSING_NAN) & is_nan)
+        )
+        return np.where(use_default, ~default_left, ~(values <= threshold))
+
+    def _leaves_all_splits(self, x: np.ndarray) -> np.ndarray:
+        """
+        Folha de cada árvore para uma única linha, avaliando todos os splits de uma vez
+        """
+        go_right = self._go_right(
+            x[self._split_feature], self._split_threshold,
+            self._split_missing, self._split_default_left
+        )
+        next_node = self._self_loops.copy()
+        next_node[self._splits] = np.where(go_right, self._split_right, self._split_left)
+        node = self.roots
+        for _ in range(self.depth):
+            node = next_node[node]
+        return node
+
+    def _leaves_by_path(self, X: np.ndarray) -> np.ndarray:
+        """
+        Folha de cada árvore descendo apenas pelos nós visitados (várias linhas)
+        """
+        rows = np.arange(X.shape[0], dtype=np.intp)[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0]))
+        for _ in range(self.depth):
+            values = X[rows, self.feature[node]]
+            if self._simple_missing:
+                go_right = values > self.threshold[node]
+            else:
+                go_right = self._go_right(
+                    values, self.threshold[node],
+                    self.missing[node], self.default_left[node]
+                )
+            node = self._children[2 * node + go_right]
+        return node
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """
+        Score bruto do ensemble (soma das folhas de todas as árvores)
+        """
+        if self._simple_missing and np.isnan(X).any():
+            X = np.where(np.isnan(X), 0.0, X)
+        if X.shape[0] == 1:
+            return self.value[self._leaves_all_splits(X[0])].sum(keepdims=True)
+        leaves = np.concatenate([
+            self._leaves_by_path(X[start:start + self.chunk_size])
+            for start in range(0, X.shape[0], self.chunk_size)
+        ])
+        return self.value[leaves].sum(axis=1)
+
+    def predict_proba_arrays(self, numeric: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """
+        Probabilidade da classe positiva a partir dos arrays de features
+        """
+        raw = self.decision_function(self.transform(numeric, codes))
+        return 1.0 / (1.0 + np.exp(-self.sigmoid * raw))
+
+    def predict_arrays(self, proba: np.ndarray) -> np.ndarray:
+        """
+        Classe predita (mesmo critério de argmax do LGBMClassifier.predict)
+        """
+        return self.classes[(proba > 1.0 - proba).astype(np.intp)]
+
+
+def verify_against_pipeline(
+    scorer: CompiledScorer,
+    pipeline: Any,
+    patients: List[Dict[str, Any]],
+    tolerance: float = 1e-9
+) -> Dict[str, Any]:
+    """
+    Compara o scorer compilado com o pipeline sklearn nos mesmos pacientes
+    """
+    expected = pipeline.predict_proba(build_patient_frame(patients))[:, 1]
+    numeric, codes = build_feature_arrays(patients)
+    actual = scorer.predict_proba_arrays(numeric, codes)
+    diff = np.abs(expected - actual)
+    expected_classes = pipeline.classes_[(expected > 1.0 - expected).astype(np.intp)]
+    mismatches = int(np.sum(expected_classes != scorer.predict_arrays(actual)))
+    return {
+        'rows': int(len(patients)),
+        'max_abs_diff': float(diff.max()) if len(diff) else 0.0,
+        'prediction_mismatches': mismatches,
+        'ok': bool((diff.max() if len(diff) else 0.0) <= tolerance and mismatches == 0)
+    }
+
+
+def sample_patients(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Pacientes sintéticos cobrindo as faixas válidas de entrada (checagem de paridade)
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'age': int(rng.integers(18, 100)),
+            'gender': int(rng.integers(1, 3)),
+            'height': int(rng.integers(100, 251)),
+            'weight': round(float(rng.uniform(30, 300)), 1),
+            'ap_hi': int(rng.integers(70, 251)),
+            'ap_lo': int(rng.integers(40, 151)),
+            'cholesterol': int(rng.integers(1, 4)),
+            'gluc': int(rng.integers(1, 4)),
+            'smoke': int(rng.integers(0, 2)),
+            'alco': int(rng.integers(0, 2)),
+            'active': int(rng.integers(0, 2))
+        }
+        for _ in range(n)
+    ]
@@ -0,0 +1,63 @@
+"""
+Configuração do serviço via variáveis de ambiente
+"""
+
+import os
+
+# Artefatos do modelo
+MODEL_PATH = os.getenv("MODEL_PATH", "models/cardiac_risck_model_v2.joblib")
+# MODEL_PATH pode ser um .joblib ou um diretório de artefato mapeável (manifest.json).
+# MODEL_ARTIFACT_FORMAT: "auto" usa <modelo>.mmap ao lado do joblib quando existir,
+# "mmap" exige o artefato mapeável e "joblib" sempre desserializa o pipeline.
+# Um .mmap mais antigo que o joblib nunca é servido ("auto" volta ao joblib)
+MODEL_ARTIFACT_FORMAT = os.getenv("MODEL_ARTIFACT_FORMAT", "auto").lower()
+# Quando vazio, usa model_metadata.joblib no mesmo diretório do modelo
+MODEL_METADATA_PATH = os.getenv("MODEL_METADATA_PATH") or None
+
+# /admin/reload_model só carrega artefatos dentro de MODEL_DIR (padrão: o
+# diretório de MODEL_PATH) e exige o header X-Admin-Token igual a ADMIN_TOKEN;
+# sem ADMIN_TOKEN os endpoints de administração ficam desativados
+MODEL_DIR = os.getenv("MODEL_DIR") or os.path.dirname(MODEL_PATH) or "."
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+
+# Intervalo (s) de verificação de novos artefatos; 0 desativa o watcher
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+
+# Scorer compilado (NumPy) para o pipeline LightGBM
+USE_COMPILED_SCORER = os.getenv("USE_COMPILED_SCORER", "true").lower() in ("1", "true", "yes")
+# Quando vazio, usa <modelo>.compiled.npz ao lado do modelo
+COMPILED_MODEL_PATH = os.getenv("COMPILED_MODEL_PATH") or None
+# Lotes maiores que isso usam o pipeline sklearn (mais rápido para lotes grandes)
+COMPILED_SCORER_MAX_BATCH = int(os.getenv("COMPILED_SCORER_MAX_BATCH", "512"))
+
+# Micro-batching de /predict_risk: tamanho máximo do lote, janela de coleta (ms)
+# e lotes pontuados simultaneamente; BATCH_MAX_SIZE <= 1 desativa
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "2"))
+BATCH_MAX_INFLIGHT = int(os.getenv("BATCH_MAX_INFLIGHT", "2"))
+
+# Threads do pool de inferência (0 = número de CPUs, máx. 4) e threads do modelo
+# por chamada (0 = CPUs / threads do pool, evitando oversubscription)
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))
+MODEL_NUM_THREADS = int(os.getenv("MODEL_NUM_THREADS", "0"))
+
+# Cache de resultados de predição (entradas; 0 desativa) e TTL em segundos
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+
+# Logging: "text" (síncrono, dump completo das requisições) ou "structured"
+# (JSON via fila não bloqueante, detalhe por requisição amostrado)
+LOG_MODE = os.getenv("LOG_MODE", "text").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Fração das requisições com detalhe completo logado no modo structured
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+# Dump completo de todas as requisições (padrão no modo text)
+LOG_VERBOSE_REQUESTS = os.getenv(
+    "LOG_VERBOSE_REQUESTS", "true" if LOG_MODE == "text" else "false"
+).lower() in ("1", "true", "yes")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Startup: "blocking" carrega o modelo antes de aceitar conexões; "background"
+# aceita conexões imediatamente e carrega/aquece o modelo em segundo plano
+# (/ready retorna 503 até o modelo estar pronto)
+STARTUP_MODE = os.getenv("STARTUP_MODE", "blocking").lower()
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import INFERENCE_THREADS, MODEL_NUM_THREADS
+
+logger = logging.getLogger(__name__)
+
+def default_pool_size() -> int:
+    """
+    Tamanho do pool de inferência: INFERENCE_THREADS ou número de CPUs (máx. 4)
+    """
+    if INFERENCE_THREADS > 0:
+        return INFERENCE_THREADS
+    return max(1, min(4, os.cpu_count() or 1))
+
+def model_threads_per_call(pool_size: int) -> int:
+    """
+    Threads do modelo por chamada, de forma que pool x threads não exceda as CPUs
+    """
+    if MODEL_NUM_THREADS > 0:
+        return MODEL_NUM_THREADS
+    return max(1, (os.cpu_count() or 1) // pool_size)
+
+class InferenceExecutor:
+    """
+    Pool de threads dedicado à inferência, separado do event loop e do pool
+    padrão do asyncio (usado por reloads e I/O), com métricas de saturação.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or default_pool_size()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._active = 0
+        self._queued = 0
+        self._max_active = 0
+        self._max_queued = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._saturated_submissions = 0
+        self._queue_wait_total = 0.0
+        self._run_total = 0.0
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="inference"
+            )
+        return self._executor
+
+    def start(self):
+        """
+        Cria o pool de threads
+        """
+        self._ensure_executor()
+        logger.info(
+            f"Pool de inferência: {self.max_workers} thread(s), "
+            f"{model_threads_per_call(self.max_workers)} thread(s) do modelo por chamada"
+        )
+
+    def shutdown(self):
+        """
+        Encerra o pool aguardando as tarefas em andamento
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Executa func(*args) no pool de inferência sem bloquear o event loop
+        """
+        submitted = time.perf_counter()
+        with self._stats_lock:
+            self._submitted += 1
+            if self._active + self._queued >= self.max_workers:
+                self._saturated_submissions += 1
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._ensure_executor(), self._call, func, args, submitted
+        )
+
+    def _call(self, func: Callable[..., Any], args: tuple, submitted: float) -> Any:
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._queued -= 1
+            self._active += 1
+            self._max_active = max(self._max_active, self._active)
+            self._queue_wait_total += started - submitted
+        failed = False
+        try:
+            return func(*args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._stats_lock:
+                self._active -= 1
+                self._completed += 1
+                self._failed += failed
+                self._run_total += time.perf_counter() - started
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Ocupação e saturação do pool de inferência
+        """
+        with self._stats_lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "model_threads_per_call": model_threads_per_call(self.max_workers),
+                "active": self._active,
+                "queued": self._queued,
+                "utilization": round(self._active / self.max_workers, 3),
+                "max_active": self._max_active,
+                "max_queued": self._max_queued,
+                "submitted": self._submitted,
+                "completed": completed,
+                "failed": self._failed,
+                # Submissões que encontraram todas as threads ocupadas
+                "saturated_submissions": self._saturated_submissions,
+                "avg_queue_wait_ms": round(self._queue_wait_total / completed * 1000, 3) if completed else 0.0,
+                "avg_run_ms": round(self._run_total / completed * 1000, 3) if completed else 0.0
+            }
+
+# Instância global
+inference_executor = InferenceExecutor()
+
+def get_inference_executor() -> InferenceExecutor:
+    """
+    Dependency injection para o pool de inferência
+    """
+    return inference_executor
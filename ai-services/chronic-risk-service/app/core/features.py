@@ -0,0 +1,161 @@
+"""
+Engenharia de features vetorizada, compartilhada entre treinamento e serviço
+"""
+
+import numpy as np
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Colunas de entrada do paciente (mesma ordem do dataset cardio_train.csv)
+RAW_FEATURES = [
+    'age', 'gender', 'height', 'weight', 'ap_hi', 'ap_lo',
+    'cholesterol', 'gluc', 'smoke', 'alco', 'active'
+]
+
+# Features consumidas pelo ColumnTransformer do pipeline
+NUMERIC_FEATURES = RAW_FEATURES + [
+    'bmi', 'age_cholesterol_interaction', 'bmi_age_interaction',
+    'pressure_pulse', 'lifestyle_score'
+]
+CATEGORICAL_FEATURES = ['bmi_category', 'bp_category', 'age_category']
+
+# Categorias de BMI (padrões WHO)
+BMI_BINS = np.array([18.5, 25.0, 30.0])
+BMI_LABELS = np.array(['Underweight', 'Normal', 'Overweight', 'Obese'], dtype=object)
+
+# Categorias de Pressão Arterial (American Heart Association)
+BP_LABELS = np.array([
+    'Normal', 'Elevated', 'Stage1_Hypertension',
+    'Stage2_Hypertension', 'Hypertensive_Crisis'
+], dtype=object)
+SYSTOLIC_BINS = np.array([120, 130, 140])
+DIASTOLIC_BINS = np.array([80, 90])
+# Categoria por faixa sistólica (linhas) x faixa diastólica (colunas), seguindo a
+# precedência das regras: Normal, Elevated, Stage1 (130-139 ou 80-89), Stage2
+BP_CATEGORY_TABLE = np.array([
+    [0, 2, 3],  # sistólica < 120
+    [1, 2, 3],  # 120-129
+    [2, 2, 2],  # 130-139
+    [3, 2, 3]   # >= 140
+])
+
+# Categorias de idade
+AGE_BINS = np.array([40, 55])
+AGE_LABELS = np.array(['Young', 'Middle_aged', 'Senior'], dtype=object)
+
+CATEGORY_LABELS = {
+    'bmi_category': BMI_LABELS,
+    'bp_category': BP_LABELS,
+    'age_category': AGE_LABELS
+}
+
+
+def compute_bmi(weight: Any, height: Any) -> Any:
+    """
+    Calcula o IMC a partir do peso (kg) e altura (cm)
+    """
+    return weight / ((height / 100) ** 2)
+
+
+def bmi_category_codes(bmi: Any) -> np.ndarray:
+    """
+    Índice em BMI_LABELS para cada valor de IMC
+    """
+    # Equivalente a np.digitize(bmi, BMI_BINS), com menos overhead por chamada
+    return BMI_BINS.searchsorted(np.asarray(bmi, dtype=np.float64), side='right')
+
+
+def bp_category_codes(systolic: Any, diastolic: Any) -> np.ndarray:
+    """
+    Índice em BP_LABELS para cada par de pressões (mesma precedência das regras AHA)
+    """
+    systolic_band = SYSTOLIC_BINS.searchsorted(np.asarray(systolic), side='right')
+    diastolic_band = DIASTOLIC_BINS.searchsorted(np.asarray(diastolic), side='right')
+    return BP_CATEGORY_TABLE[systolic_band, diastolic_band]
+
+
+def age_in_years(age_days: Any) -> Any:
+    """
+    Idade do dataset (dias) em anos completos, o inteiro que o serviço recebe
+    """
+    return (age_days / 365.25).astype(int)
+
+
+def age_category_codes(age: Any) -> np.ndarray:
+    """
+    Índice em AGE_LABELS para cada idade (anos)
+    """
+    return AGE_BINS.searchsorted(np.asarray(age), side='right')
+
+
+def engineer_features(df: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Adiciona as features derivadas ao DataFrame (requer a coluna 'bmi')
+    """
+    df['bmi_category'] = BMI_LABELS[bmi_category_codes(df['bmi'])]
+    df['bp_category'] = BP_LABELS[bp_category_codes(df['ap_hi'], df['ap_lo'])]
+    # Features de interação
+    df['age_cholesterol_interaction'] = df['age'] * df['cholesterol']
+    df['bmi_age_interaction'] = df['bmi'] * df['age']
+    df['pressure_pulse'] = df['ap_hi'] - df['ap_lo']
+    # Lifestyle score
+    df['lifestyle_score'] = df['smoke'] + df['alco'] - df['active']
+    df['age_category'] = AGE_LABELS[age_category_codes(df['age'])]
+    return df
+
+
+def build_patient_frame(patients: List[Dict[str, Any]]) -> "pd.DataFrame":
+    """
+    Constrói o DataFrame de entrada do pipeline a partir de registros de pacientes
+    """
+    # Importado sob demanda: o caminho do scorer compilado não usa pandas
+    import pandas as pd
+    df = pd.DataFrame(patients)
+    df['bmi'] = compute_bmi(df['weight'], df['height'])
+    return engineer_features(df)
+
+
+def build_feature_arrays(patients: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Constrói diretamente os arrays prontos para o modelo, sem DataFrame:
+    matriz numérica (n, len(NUMERIC_FEATURES)) na ordem de NUMERIC_FEATURES e
+    códigos das categorias (n, len(CATEGORICAL_FEATURES)) na ordem de CATEGORICAL_FEATURES
+    """
+    raw = np.array([[patient[name] for name in RAW_FEATURES] for patient in patients], dtype=np.float64)
+    (age, gender, height, weight, ap_hi, ap_lo,
+     cholesterol, gluc, smoke, alco, active) = raw.T
+    bmi = compute_bmi(weight, height)
+
+    numeric = np.empty((raw.shape[0], len(NUMERIC_FEATURES)), dtype=np.float64)
+    numeric[:, :len(RAW_FEATURES)] = raw
+    numeric[:, 11] = bmi
+    numeric[:, 12] = age * cholesterol
+    numeric[:, 13] = bmi * age
+    numeric[:, 14] = ap_hi - ap_lo
+    numeric[:, 15] = smoke + alco - active
+
+    codes = np.column_stack([
+        bmi_category_codes(bmi),
+        bp_category_codes(ap_hi, ap_lo),
+        age_category_codes(age)
+    ])
+    return numeric, codes
+
+
+def derived_feature_record(patient: Dict[str, Any], codes: np.ndarray) -> Dict[str, Any]:
+    """
+    Registro de features processadas de um paciente (mesmas chaves e ordem das
+    colunas de build_patient_frame), a partir dos códigos de categoria já calculados
+    """
+    record = dict(patient)
+    record['bmi'] = compute_bmi(patient['weight'], patient['height'])
+    record['bmi_category'] = BMI_LABELS[codes[0]]
+    record['bp_category'] = BP_LABELS[codes[1]]
+    record['age_cholesterol_interaction'] = patient['age'] * patient['cholesterol']
+    record['bmi_age_interaction'] = record['bmi'] * patient['age']
+    record['pressure_pulse'] = patient['ap_hi'] - patient['ap_lo']
+    record['lifestyle_score'] = patient['smoke'] + patient['alco'] - patient['active']
+    record['age_category'] = AGE_LABELS[codes[2]]
+    return record
@@ -0,0 +1,141 @@
+"""
+Configuração de logging do serviço.
+
+LOG_MODE=text (padrão) mantém os logs atuais, escritos de forma síncrona.
+LOG_MODE=structured envia os registros por uma fila limitada a uma thread de
+escrita (QueueHandler/QueueListener), em JSON de uma linha; o detalhe por
+requisição é amostrado (LOG_SAMPLE_RATE) e cada predição gera uma única linha
+de resumo. LOG_VERBOSE_REQUESTS=true mantém o dump completo das requisições.
+"""
+
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core.config import (
+    LOG_MODE, LOG_LEVEL, LOG_SAMPLE_RATE, LOG_VERBOSE_REQUESTS, LOG_QUEUE_SIZE
+)
+
+STRUCTURED = LOG_MODE == "structured"
+
+# Atributos padrão de LogRecord (o restante vem de extra= e vai para o JSON)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata cada registro como um objeto JSON em uma linha
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que nunca bloqueia: com a fila cheia o registro é descartado e contado
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Cópia do registro segura para outra thread: mensagem já formatada, sem
+        args. Diferente do QueueHandler padrão, o traceback não é embutido na
+        mensagem: vai formatado em exc_text para o campo "exc" do JSON.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_queue_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_previous_handlers: Dict[str, Any] = {}
+
+def start_structured_logging():
+    """
+    Modo structured: instala o QueueHandler no logger raiz e nos loggers do
+    uvicorn e inicia a thread de escrita. Chamado no startup de cada processo
+    que atende requisições (após o fork, no modo pre-fork).
+    """
+    global _queue_handler, _listener
+    if not STRUCTURED or _listener is not None:
+        return
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(
+        _queue_handler.queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+
+    for name in ("", "uvicorn", "uvicorn.error", "uvicorn.access"):
+        target = logging.getLogger(name)
+        _previous_handlers[name] = (target.handlers, target.propagate)
+        target.handlers = [_queue_handler]
+        # Os do uvicorn não propagam para a raiz (evita linhas duplicadas)
+        target.propagate = name == ""
+    logging.getLogger().setLevel(LOG_LEVEL)
+
+def stop_structured_logging():
+    """
+    Escreve os registros pendentes, para a thread de escrita e restaura os handlers
+    """
+    global _listener
+    if _listener is None:
+        return
+    for name, (handlers, propagate) in _previous_handlers.items():
+        target = logging.getLogger(name)
+        target.handlers = handlers
+        target.propagate = propagate
+    _previous_handlers.clear()
+    _listener.stop()
+    _listener = None
+
+def should_log_request_detail() -> bool:
+    """
+    Se o detalhe desta requisição deve ser logado (dump completo ou amostragem)
+    """
+    return LOG_VERBOSE_REQUESTS or (LOG_SAMPLE_RATE > 0 and random.random() < LOG_SAMPLE_RATE)
+
+def get_logging_stats() -> Dict[str, Any]:
+    """
+    Modo de logging e registros descartados por fila cheia
+    """
+    return {
+        "mode": LOG_MODE,
+        "sample_rate": LOG_SAMPLE_RATE,
+        "verbose_requests": LOG_VERBOSE_REQUESTS,
+        "queue_size": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0
+    }
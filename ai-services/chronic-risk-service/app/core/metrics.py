@@ -0,0 +1,127 @@
+"""
+Métricas Prometheus do serviço: latência por etapa da predição, contadores de
+resultados, níveis de risco e erros, e gauges do batcher, pool e cache.
+"""
+
+import os
+from typing import Callable, Dict, Iterable, Optional
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, REGISTRY,
+    CONTENT_TYPE_LATEST, generate_latest
+)
+from prometheus_client.core import GaugeMetricFamily, CounterMetricFamily
+
+# Buckets de 50µs a 2.5s: as etapas de uma predição ficam na faixa de µs a ms
+STAGE_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+STAGE_SECONDS = Histogram(
+    "chronic_risk_stage_duration_seconds",
+    "Duração de cada etapa da predição (etapas do modelo medidas por lote)",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "chronic_risk_request_duration_seconds",
+    "Duração total do processamento de uma requisição de predição",
+    ["endpoint"],
+    buckets=STAGE_BUCKETS
+)
+BATCH_ROWS = Histogram(
+    "chronic_risk_model_batch_rows",
+    "Linhas pontuadas por chamada ao modelo",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 5000)
+)
+PREDICTIONS = Counter(
+    "chronic_risk_predictions_total",
+    "Predições por endpoint e resultado (success, invalid, error)",
+    ["endpoint", "outcome"]
+)
+RISK_LEVELS = Counter(
+    "chronic_risk_risk_level_total",
+    "Predições bem-sucedidas por nível de risco",
+    ["risk_level"]
+)
+ERRORS = Counter(
+    "chronic_risk_errors_total",
+    "Erros por endpoint e tipo de exceção",
+    ["endpoint", "error_type"]
+)
+
+# Instâncias por etapa resolvidas uma vez (evita lookup de labels por chamada)
+VALIDATION_SECONDS = STAGE_SECONDS.labels(stage="validation")
+FEATURES_SECONDS = STAGE_SECONDS.labels(stage="feature_building")
+PREDICT_PROBA_SECONDS = STAGE_SECONDS.labels(stage="predict_proba")
+INTERPRETATION_SECONDS = STAGE_SECONDS.labels(stage="interpretation")
+SERIALIZATION_SECONDS = STAGE_SECONDS.labels(stage="serialization")
+
+class RuntimeStatsCollector:
+    """
+    Expõe as estatísticas de runtime (mesmas de /stats) como métricas no momento da coleta
+    """
+
+    # (seção, chave, nome da métrica, descrição, é contador)
+    FIELDS = (
+        ("batcher", "queue_depth", "chronic_risk_batcher_queue_depth", "Itens aguardando na fila do micro-batcher", False),
+        ("batcher", "inflight_items", "chronic_risk_batcher_inflight_items", "Itens em lotes sendo pontuados", False),
+        ("batcher", "batches", "chronic_risk_batcher_batches", "Lotes pontuados pelo micro-batcher", True),
+        ("batcher", "items", "chronic_risk_batcher_items", "Itens pontuados pelo micro-batcher", True),
+        ("executor", "active", "chronic_risk_executor_active", "Tarefas em execução no pool de inferência", False),
+        ("executor", "queued", "chronic_risk_executor_queued", "Tarefas aguardando no pool de inferência", False),
+        ("executor", "saturated_submissions", "chronic_risk_executor_saturated_submissions", "Submissões com o pool totalmente ocupado", True),
+        ("cache", "size", "chronic_risk_cache_size", "Entradas no cache de predições", False),
+        ("cache", "hits", "chronic_risk_cache_hits", "Acertos no cache de predições", True),
+        ("cache", "misses", "chronic_risk_cache_misses", "Faltas no cache de predições", True),
+        ("cache", "evictions", "chronic_risk_cache_evictions", "Entradas descartadas por LRU", True),
+    )
+
+    def __init__(self, stats_provider: Callable[[], Dict[str, Dict]], worker: Optional[str] = None):
+        self.stats_provider = stats_provider
+        # Nos workers pre-fork cada processo tem suas próprias estatísticas
+        self.worker = worker
+
+    def collect(self) -> Iterable:
+        stats = self.stats_provider()
+        for section, key, name, documentation, is_counter in self.FIELDS:
+            value = stats.get(section, {}).get(key)
+            if value is None:
+                continue
+            family = CounterMetricFamily if is_counter else GaugeMetricFamily
+            if self.worker is None:
+                yield family(name, documentation, value=value)
+                continue
+            metric = family(name, documentation, labels=["worker"])
+            metric.add_metric([self.worker], value)
+            yield metric
+
+_runtime_stats_provider: Optional[Callable[[], Dict[str, Dict]]] = None
+
+def register_runtime_stats(stats_provider: Callable[[], Dict[str, Dict]]):
+    """
+    Registra o coletor das estatísticas de runtime no registry padrão (e no
+    registry montado a cada coleta no modo multiprocesso)
+    """
+    global _runtime_stats_provider
+    _runtime_stats_provider = stats_provider
+    REGISTRY.register(RuntimeStatsCollector(stats_provider))
+
+def render_metrics() -> bytes:
+    """
+    Métricas no formato de exposição do Prometheus. Com PROMETHEUS_MULTIPROC_DIR
+    (workers pre-fork), agrega os arquivos de todos os processos; as
+    estatísticas de runtime são as do worker que atendeu a coleta, com o
+    label worker (pid).
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        if _runtime_stats_provider is not None:
+            registry.register(RuntimeStatsCollector(_runtime_stats_provider, worker=str(os.getpid())))
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
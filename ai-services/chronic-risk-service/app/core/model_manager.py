@@ -1,15 +1,86 @@
-import joblib
+import hashlib
 import threading
 import os
 import logging
-import pandas as pd
-from typing import Dict, Any
+import time
+import numpy as np
+import dataclasses
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
+
+from app.core.config import (
+    MODEL_PATH, MODEL_METADATA_PATH, USE_COMPILED_SCORER,
+    COMPILED_MODEL_PATH, COMPILED_SCORER_MAX_BATCH, MODEL_ARTIFACT_FORMAT
+)
+from app.core.features import build_patient_frame, build_feature_arrays, derived_feature_record
+from app.core.compiled_scorer import CompiledScorer, sample_patients, verify_against_pipeline
+from app.core.executor import default_pool_size, model_threads_per_call
+from app.core.cache import PredictionCache, prediction_cache_key
+from app.core.artifact import is_model_artifact, artifact_stamp_path, load_model_artifact
+from app.core.metrics import FEATURES_SECONDS, PREDICT_PROBA_SECONDS, BATCH_ROWS
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Paciente sintético usado para aquecer um modelo recém-carregado antes da troca
+WARMUP_PATIENT: Dict[str, Any] = {
+    "user_id": "warmup",
+    "age": 45,
+    "gender": 1,
+    "height": 165,
+    "weight": 70.5,
+    "ap_hi": 120,
+    "ap_lo": 80,
+    "cholesterol": 1,
+    "gluc": 1,
+    "smoke": 0,
+    "alco": 0,
+    "active": 1
+}
+
+# Pacientes sintéticos para checar a paridade do scorer compilado com o pipeline
+PARITY_CHECK_ROWS = 512
+# Tamanho do lote sintético de aquecimento (mesmo tamanho padrão do micro-batching)
+WARMUP_BATCH_SIZE = 64
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """
+    Estado imutável do modelo carregado; leitores obtêm a referência sem lock
+    """
+    model: Any
+    metadata: Optional[Dict[str, Any]]
+    model_path: str
+    metadata_path: Optional[str]
+    version: str
+    loaded_at: float
+    # Scorer NumPy equivalente ao pipeline; None quando indisponível ou divergente
+    scorer: Optional[CompiledScorer] = None
+    # Maior lote pontuado pelo scorer (acima disso, o modelo nativo); None = sem limite
+    scorer_max_batch: Optional[int] = COMPILED_SCORER_MAX_BATCH
+    # "joblib" (pipeline sklearn serializado) ou "mmap" (artefato mapeável)
+    artifact_format: str = "joblib"
+    # Tempos (ms) de desserialização, carga do scorer compilado e warm-up
+    load_timings: Dict[str, float] = field(default_factory=dict)
+    # Caminho pedido no carregamento (o .joblib mesmo quando o .mmap ao lado é
+    # servido): base dos reloads sem caminho e do monitoramento de artefatos
+    source_path: Optional[str] = None
+
 class ModelManager:
     """
-    Gerenciador thread-safe para o modelo aprimorado
+    Gerenciador thread-safe para o modelo aprimorado.
+
+    O modelo é publicado como um ModelSnapshot imutável: as predições leem
+    a referência atual uma única vez e rodam em paralelo, enquanto apenas
+    os carregamentos são serializados por _load_lock. Um reload constrói e
+    aquece o novo snapshot fora do caminho das predições e o troca
+    atomicamente; requisições em andamento terminam no snapshot antigo.
+
+    Resultados são guardados em um cache LRU+TTL chaveado pela versão do
+    modelo e pelas features de entrada, invalidado a cada troca de modelo.
     """
     _instance = None
     _lock = threading.Lock()
@@ -19,147 +90,420 @@ class ModelManager:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super(ModelManager, cls).__new__(cls)
-                    cls._instance._model = None
-                    cls._instance._metadata = None
-                    cls._instance._model_lock = threading.RLock()
+                    cls._instance._snapshot = None
+                    cls._instance._load_lock = threading.Lock()
+                    cls._instance._cache = PredictionCache()
         return cls._instance
 
-    def load_model(self, model_path: str = "models/cardiac_risck_model_v2.joblib"):
-        """
-        Carrega o modelo aprimorado de forma thread-safe
-        """
-        with self._model_lock:
-            if self._model is None:
-                if not os.path.exists(model_path):
-                    raise FileNotFoundError(f"Modelo aprimorado não encontrado em: {model_path}")
-                
-                self._model = joblib.load(model_path)
-
-                # Carregar metadados se existir
-                metadata_path = model_path.replace(
-                    'cardiac_risck_model_v2.joblib',
-                    'model_metadata.joblib'
-                )
-                if os.path.exists(metadata_path):
-                    self._metadata = joblib.load(metadata_path)
-
-                logger.info(f"Modelo aprimorado carregado com sucesso de: {model_path}")
-                if self._metadata:
-                    # Logar nome do modelo e ROC-AUC de forma segura
-                    final_metrics = self._metadata.get('final_metrics', {})
-                    roc_auc = final_metrics.get('roc_auc')
-                    try:
-                        roc_auc_str = f"{roc_auc:.4f}"
-                    except Exception:
-                        roc_auc_str = str(roc_auc)
-                    logger.info(
-                        f"Modelo: {self._metadata.get('model_name')}, ROC-AUC: {roc_auc_str}"
+    def load_model(self, model_path: Optional[str] = None, metadata_path: Optional[str] = None):
+        """
+        Carrega o modelo aprimorado de forma thread-safe (apenas se ainda não carregado)
+        """
+        with self._load_lock:
+            if self._snapshot is not None:
+                return
+            self._snapshot = self._build_snapshot(model_path, metadata_path)
+            self._log_snapshot(self._snapshot)
+
+    def reload_model(self, model_path: Optional[str] = None, metadata_path: Optional[str] = None) -> ModelSnapshot:
+        """
+        Carrega e aquece uma nova versão do modelo e a troca atomicamente.
+        Em caso de falha o snapshot atual continua servindo.
+        """
+        with self._load_lock:
+            previous = self._snapshot
+            if model_path is None and previous is not None:
+                model_path = previous.source_path
+                metadata_path = metadata_path or previous.metadata_path
+            snapshot = self._build_snapshot(model_path, metadata_path)
+            self._snapshot = snapshot
+            self._cache.clear()
+            self._log_snapshot(snapshot)
+            logger.info(
+                f"Modelo recarregado: {previous.version if previous else None} -> {snapshot.version}"
+            )
+            return snapshot
+
+    def _build_snapshot(self, model_path: Optional[str], metadata_path: Optional[str]) -> ModelSnapshot:
+        """
+        Desserializa os artefatos, calcula a versão e aquece o modelo
+        """
+        model_path = model_path or MODEL_PATH
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Modelo aprimorado não encontrado em: {model_path}")
+
+        started = time.perf_counter()
+        snapshot = None
+        artifact_dir = self._mmap_artifact_path(model_path)
+        if artifact_dir is not None:
+            try:
+                snapshot = self._load_mmap_artifact(artifact_dir)
+            except Exception as e:
+                if artifact_dir == model_path:
+                    raise
+                logger.warning(f"Falha ao abrir artefato mapeável {artifact_dir}: {e}; usando joblib")
+        deserialized = compiled = time.perf_counter()
+        if snapshot is None:
+            snapshot = self._load_joblib_artifact(model_path, metadata_path)
+            deserialized = time.perf_counter()
+            snapshot = dataclasses.replace(
+                snapshot, scorer=self._load_compiled_scorer(snapshot.model, model_path)
+            )
+            compiled = time.perf_counter()
+
+        # Warm-up: falhas aqui abortam a troca antes de atingir tráfego real
+        self._warm_up(snapshot)
+        warmed = time.perf_counter()
+
+        return dataclasses.replace(snapshot, source_path=model_path, load_timings={
+            "deserialize_ms": round((deserialized - started) * 1000, 1),
+            "compiled_scorer_ms": round((compiled - deserialized) * 1000, 1),
+            "warmup_ms": round((warmed - compiled) * 1000, 1)
+        })
+
+    @staticmethod
+    def _mmap_artifact_path(model_path: str) -> Optional[str]:
+        """
+        Artefato mapeável a usar: o próprio caminho (diretório) ou <modelo>.mmap ao
+        lado do joblib, conforme MODEL_ARTIFACT_FORMAT (auto, mmap ou joblib)
+        """
+        if MODEL_ARTIFACT_FORMAT == "joblib":
+            return None
+        if is_model_artifact(model_path):
+            return model_path
+        sibling = os.path.splitext(model_path)[0] + '.mmap'
+        if is_model_artifact(sibling):
+            # Artefato mais antigo que o joblib (modelo re-treinado sem exportar) nunca é
+            # servido; a folga de 1s evita falsos positivos com datas de um checkout
+            if (os.path.exists(model_path)
+                    and os.path.getmtime(model_path) > os.path.getmtime(artifact_stamp_path(sibling)) + 1):
+                if MODEL_ARTIFACT_FORMAT == "mmap":
+                    raise ValueError(
+                        f"Artefato mapeável {sibling} mais antigo que {model_path}; reexporte com compile_model.py"
                     )
+                logger.warning(f"Artefato mapeável desatualizado, usando joblib: {sibling}")
+                return None
+            return sibling
+        if MODEL_ARTIFACT_FORMAT == "mmap":
+            raise FileNotFoundError(f"Artefato mapeável não encontrado para: {model_path}")
+        return None
+
+    def _load_mmap_artifact(self, artifact_dir: str) -> ModelSnapshot:
+        """
+        Abre o artefato mapeável: o scorer compilado sobre os arrays mapeados é o
+        próprio modelo e atende lotes de qualquer tamanho
+        """
+        model, metadata = load_model_artifact(artifact_dir)
+        self._configure_threads(model)
+        return ModelSnapshot(
+            model=model,
+            metadata=metadata,
+            model_path=artifact_dir,
+            metadata_path=None,
+            version=self._artifact_version(artifact_dir, metadata),
+            loaded_at=time.time(),
+            scorer=model.scorer,
+            scorer_max_batch=None,
+            artifact_format="mmap"
+        )
+
+    def _load_joblib_artifact(self, model_path: str, metadata_path: Optional[str]) -> ModelSnapshot:
+        """
+        Desserializa o pipeline sklearn (joblib) e seus metadados
+        """
+        # joblib (e sklearn/lightgbm, via unpickle) só são importados no carregamento
+        import joblib
+        if os.path.isdir(model_path):
+            raise FileNotFoundError(f"Diretório sem manifest.json de artefato: {model_path}")
+        model = joblib.load(model_path)
+        self._configure_threads(model)
+
+        # Carregar metadados se existir
+        metadata = None
+        metadata_path = metadata_path or MODEL_METADATA_PATH or os.path.join(
+            os.path.dirname(model_path), 'model_metadata.joblib'
+        )
+        if os.path.exists(metadata_path):
+            metadata = joblib.load(metadata_path)
+        else:
+            metadata_path = None
+
+        return ModelSnapshot(
+            model=model,
+            metadata=metadata,
+            model_path=model_path,
+            metadata_path=metadata_path,
+            version=self._artifact_version(model_path, metadata),
+            loaded_at=time.time()
+        )
+
+    def _warm_up(self, snapshot: ModelSnapshot):
+        """
+        Pontua pacientes sintéticos pelos mesmos caminhos das requisições reais
+        (sem cache e sem métricas), pagando a inicialização tardia do
+        sklearn/LightGBM antes do tráfego
+        """
+        self._score(snapshot, [WARMUP_PATIENT], record_metrics=False)
+        warmup_batch = sample_patients(WARMUP_BATCH_SIZE, seed=1)
+        self._score(snapshot, warmup_batch, record_metrics=False)
+        if snapshot.scorer is not None and snapshot.scorer_max_batch is not None:
+            # Lotes acima de scorer_max_batch usam o pipeline sklearn
+            snapshot.model.predict_proba(build_patient_frame(warmup_batch))
+
+    @staticmethod
+    def _configure_threads(model: Any):
+        """
+        Limita as threads internas do classificador ao seu quinhão de CPUs do pool de inferência
+        """
+        classifier = getattr(model, 'named_steps', {}).get('classifier', model)
+        if 'n_jobs' in classifier.get_params():
+            threads = model_threads_per_call(default_pool_size())
+            classifier.set_params(n_jobs=threads)
+            logger.info(f"Classificador configurado com {threads} thread(s) por predição")
+
+    @staticmethod
+    def _load_compiled_scorer(model: Any, model_path: str) -> Optional[CompiledScorer]:
+        """
+        Carrega o scorer compilado ao lado do modelo, se existir e for equivalente ao pipeline
+        """
+        if not USE_COMPILED_SCORER:
+            return None
+        compiled_path = COMPILED_MODEL_PATH or os.path.splitext(model_path)[0] + '.compiled.npz'
+        if not os.path.exists(compiled_path):
+            logger.info(f"Scorer compilado não encontrado em {compiled_path}; usando pipeline sklearn")
+            return None
+        try:
+            scorer = CompiledScorer.load(compiled_path)
+            # Artefato de outra versão do modelo não pode servir predições
+            parity = verify_against_pipeline(scorer, model, sample_patients(PARITY_CHECK_ROWS))
+        except Exception as e:
+            logger.warning(f"Falha ao carregar scorer compilado de {compiled_path}: {e}")
+            return None
+        if not parity['ok']:
+            logger.warning(
+                f"Scorer compilado em {compiled_path} diverge do pipeline "
+                f"(max_abs_diff={parity['max_abs_diff']:.3g}, "
+                f"divergências={parity['prediction_mismatches']}); usando pipeline sklearn"
+            )
+            return None
+        logger.info(f"Scorer compilado carregado de: {compiled_path}")
+        return scorer
+
+    @staticmethod
+    def _artifact_version(model_path: str, metadata: Optional[Dict[str, Any]]) -> str:
+        """
+        Versão do modelo: 'model_version' dos metadados ou hash do artefato
+        """
+        if metadata and metadata.get('model_version'):
+            return str(metadata['model_version'])
+        digest = hashlib.sha256()
+        with open(artifact_stamp_path(model_path), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:12]
+
+    @staticmethod
+    def _log_snapshot(snapshot: ModelSnapshot):
+        """
+        Loga origem, versão e métricas do snapshot carregado
+        """
+        logger.info(
+            f"Modelo aprimorado carregado com sucesso de: {snapshot.model_path} "
+            f"(versão {snapshot.version}, "
+            + ", ".join(f"{phase}: {ms:.0f}" for phase, ms in snapshot.load_timings.items())
+            + ")"
+        )
+        metadata = snapshot.metadata
+        if metadata:
+            # Logar nome do modelo e ROC-AUC de forma segura
+            final_metrics = metadata.get('final_metrics', {})
+            roc_auc = final_metrics.get('roc_auc')
+            try:
+                roc_auc_str = f"{roc_auc:.4f}"
+            except Exception:
+                roc_auc_str = str(roc_auc)
+            logger.info(
+                f"Modelo: {metadata.get('model_name')}, ROC-AUC: {roc_auc_str}"
+            )
 
-    def preprocess_patient_data(self, patient_data: Dict[str, Any]) -> pd.DataFrame:
+    def get_snapshot(self) -> ModelSnapshot:
+        """
+        Retorna o snapshot atual do modelo (sem lock)
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("Modelo não carregado")
+        return snapshot
+
+    def preprocess_patient_data(self, patient_data: Dict[str, Any]) -> "pd.DataFrame":
         """
         Preprocessa dados do paciente usando as mesmas transformações do pipeline de treinamento
         """
-        df = pd.DataFrame([patient_data])
-        # Calcular BMI
-        df['bmi'] = df['weight'] / ((df['height'] / 100) ** 2)
-        # Categorias de BMI
-        def categorize_bmi(bmi):
-            if bmi < 18.5:
-                return 'Underweight'
-            elif bmi < 25:
-                return 'Normal'
-            elif bmi < 30:
-                return 'Overweight'
-            else:
-                return 'Obese'
-        df['bmi_category'] = df['bmi'].apply(categorize_bmi)
-        # Categorias de Pressão Arterial
-        def categorize_blood_pressure(systolic, diastolic):
-            if systolic < 120 and diastolic < 80:
-                return 'Normal'
-            elif systolic < 130 and diastolic < 80:
-                return 'Elevated'
-            elif (systolic >= 130 and systolic < 140) or (diastolic >= 80 and diastolic < 90):
-                return 'Stage1_Hypertension'
-            elif systolic >= 140 or diastolic >= 90:
-                return 'Stage2_Hypertension'
-            else:
-                return 'Hypertensive_Crisis'
-        df['bp_category'] = df.apply(lambda x: categorize_blood_pressure(x['ap_hi'], x['ap_lo']), axis=1)
-        # Features de interação
-        df['age_cholesterol_interaction'] = df['age'] * df['cholesterol']
-        df['bmi_age_interaction'] = df['bmi'] * df['age']
-        df['pressure_pulse'] = df['ap_hi'] - df['ap_lo']
-        # Lifestyle score
-        df['lifestyle_score'] = df['smoke'] + df['alco'] - df['active']
-        # Categorização de idade
-        def categorize_age(age):
-            if age < 40:
-                return 'Young'
-            elif age < 55:
-                return 'Middle_aged'
-            else:
-                return 'Senior'
-        df['age_category'] = df['age'].apply(categorize_age)
-        return df
+        return self.preprocess_patient_batch([patient_data])
+
+    def preprocess_patient_batch(self, patients: List[Dict[str, Any]]) -> "pd.DataFrame":
+        """
+        Preprocessa um lote de pacientes em um único DataFrame
+        """
+        return build_patient_frame(patients)
 
     def predict(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Faz predição usando o pipeline completo
         """
-        with self._model_lock:
-            if self._model is None:
-                raise RuntimeError("Modelo não carregado")
-
-            df = self.preprocess_patient_data(patient_data)
-            
-            # Pipeline salva já inclui preprocessamento
-            risk_proba = self._model.predict_proba(df)[0][1]
-            risk_prediction = self._model.predict(df)[0]
-            
-            return {
-                'risk_probability': risk_proba,
-                'risk_prediction': int(risk_prediction),
-                'processed_features': df.iloc[0].to_dict()
+        return self.predict_batch([patient_data])[0]
+
+    def cached_prediction(self, patient_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Resultado em cache para o paciente no modelo atual, sem executar o modelo
+        """
+        if not self._cache.enabled:
+            return None
+        snapshot = self.get_snapshot()
+        cached = self._cache.get(
+            prediction_cache_key(snapshot.version, patient_data), record_miss=False
+        )
+        return self._from_cache(cached, patient_data) if cached is not None else None
+
+    @staticmethod
+    def _from_cache(cached: Dict[str, Any], patient_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cópia do resultado em cache com os campos do paciente atual (ex.: user_id)
+        """
+        processed_features = dict(cached['processed_features'])
+        processed_features.update(patient_data)
+        return {**cached, 'processed_features': processed_features}
+
+    def predict_batch(self, patients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Faz predição de um lote de pacientes; apenas os ausentes do cache
+        são pontuados, com uma única chamada ao pipeline
+        """
+        snapshot = self.get_snapshot()
+        if not self._cache.enabled:
+            return self._score(snapshot, patients)
+
+        keys = [prediction_cache_key(snapshot.version, patient) for patient in patients]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(patients)
+        misses = []
+        for i, (patient, key) in enumerate(zip(patients, keys)):
+            cached = self._cache.get(key)
+            if cached is None:
+                misses.append(i)
+            else:
+                results[i] = self._from_cache(cached, patient)
+        if misses:
+            scored = self._score(snapshot, [patients[i] for i in misses])
+            for i, result in zip(misses, scored):
+                self._cache.put(keys[i], result)
+                results[i] = result
+        return results
+
+    def _score(
+        self, snapshot: ModelSnapshot, patients: List[Dict[str, Any]], record_metrics: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Executa o modelo do snapshot para o lote (scorer compilado ou pipeline sklearn).
+        Com record_metrics=False (warm-up) os histogramas de produção não são alimentados.
+        """
+        if record_metrics:
+            BATCH_ROWS.observe(len(patients))
+        if snapshot.scorer is not None and (
+            snapshot.scorer_max_batch is None or len(patients) <= snapshot.scorer_max_batch
+        ):
+            return self._predict_compiled(snapshot, patients, record_metrics)
+        with self._timer(FEATURES_SECONDS, record_metrics):
+            df = self.preprocess_patient_batch(patients)
+
+        # Pipeline salva já inclui preprocessamento; a classe predita é
+        # derivada das mesmas probabilidades (equivalente a predict)
+        with self._timer(PREDICT_PROBA_SECONDS, record_metrics):
+            proba = snapshot.model.predict_proba(df)
+        predictions = snapshot.model.classes_[np.argmax(proba, axis=1)]
+
+        return [
+            {
+                'risk_probability': float(proba[i, 1]),
+                'risk_prediction': int(predictions[i]),
+                'processed_features': features,
+                'model_version': snapshot.version
+            }
+            for i, features in enumerate(df.to_dict('records'))
+        ]
+
+    @staticmethod
+    def _timer(histogram: Any, record_metrics: bool):
+        """
+        Cronômetro do histograma, ou nenhum quando as métricas estão desligadas
+        """
+        return histogram.time() if record_metrics else nullcontext()
+
+    @classmethod
+    def _predict_compiled(
+        cls, snapshot: ModelSnapshot, patients: List[Dict[str, Any]], record_metrics: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Predição pelo scorer compilado, sem DataFrame (mesma saída do pipeline)
+        """
+        scorer = snapshot.scorer
+        with cls._timer(FEATURES_SECONDS, record_metrics):
+            numeric, codes = build_feature_arrays(patients)
+        with cls._timer(PREDICT_PROBA_SECONDS, record_metrics):
+            proba = scorer.predict_proba_arrays(numeric, codes)
+        predictions = scorer.predict_arrays(proba)
+        return [
+            {
+                'risk_probability': float(proba[i]),
+                'risk_prediction': int(predictions[i]),
+                'processed_features': derived_feature_record(patient, codes[i]),
+                'model_version': snapshot.version
             }
+            for i, patient in enumerate(patients)
+        ]
 
     def get_model_info(self) -> Dict[str, Any]:
         """
         Retorna informações do modelo aprimorado
         """
-        with self._model_lock:
-            if self._model is None:
-                raise RuntimeError("Modelo não carregado")
-
-            info = {
-                "model_type": "Enhanced Pipeline with LightGBM",
-                "version": "2.0",
-                "pipeline_stages": [
-                    "Data Cleaning",
-                    "Feature Engineering",
-                    "Preprocessing Pipeline",
-                    "Model Comparison",
-                    "Hyperparameter Optimization",
-                    "Cross-Validation"
-                ]
-            }
-            if self._metadata:
-                info.update({
-                    "model_name": self._metadata.get('model_name'),
-                    "training_date": self._metadata.get('training_date'),
-                    "final_metrics": self._metadata.get('final_metrics'),
-                    "data_shape": self._metadata.get('data_shape'),
-                    "features_count": self._metadata.get('features_count')
-                })
-            return info
+        snapshot = self.get_snapshot()
+        metadata = snapshot.metadata
+        info = {
+            "model_type": "Enhanced Pipeline with LightGBM",
+            "version": "2.0",
+            "model_version": snapshot.version,
+            "model_path": snapshot.model_path,
+            "compiled_scorer": snapshot.scorer is not None,
+            "artifact_format": snapshot.artifact_format,
+            "pipeline_stages": [
+                "Data Cleaning",
+                "Feature Engineering",
+                "Preprocessing Pipeline",
+                "Model Comparison",
+                "Hyperparameter Optimization",
+                "Cross-Validation"
+            ]
+        }
+        if metadata:
+            info.update({
+                "model_name": metadata.get('model_name'),
+                "training_date": metadata.get('training_date'),
+                "final_metrics": metadata.get('final_metrics'),
+                "data_shape": metadata.get('data_shape'),
+                "features_count": metadata.get('features_count')
+            })
+        return info
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas do cache de predições
+        """
+        return self._cache.get_stats()
 
     def is_loaded(self) -> bool:
         """
         Verifica se o modelo está carregado
         """
-        with self._model_lock:
-            return self._model is not None
+        return self._snapshot is not None
 
 # Instância global
 model_manager = ModelManager()
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+import os
+from typing import Optional, Tuple
+
+from app.core.model_manager import ModelManager
+from app.core.artifact import artifact_stamp_path
+
+logger = logging.getLogger(__name__)
+
+def _artifact_mtimes(manager: ModelManager) -> Tuple[Optional[float], ...]:
+    """
+    Datas de modificação do artefato de origem (o .joblib mesmo quando o .mmap
+    ao lado é servido), do artefato servido e dos metadados
+    """
+    snapshot = manager.get_snapshot()
+    mtimes = []
+    for path in (snapshot.source_path, snapshot.model_path, snapshot.metadata_path):
+        try:
+            mtimes.append(os.stat(artifact_stamp_path(path)).st_mtime if path else None)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+async def watch_model_artifacts(manager: ModelManager, interval: float):
+    """
+    Recarrega o modelo em background quando os artefatos em disco mudam
+    """
+    logger.info(f"Monitorando artefatos do modelo a cada {interval}s")
+    # No startup em background o primeiro modelo ainda pode estar carregando
+    while not manager.is_loaded():
+        await asyncio.sleep(interval)
+    last_seen = _artifact_mtimes(manager)
+    while True:
+        await asyncio.sleep(interval)
+        current = _artifact_mtimes(manager)
+        if current == last_seen or current[0] is None:
+            continue
+        try:
+            await asyncio.to_thread(manager.reload_model)
+        except Exception as e:
+            # Arquivo possivelmente ainda em escrita; tenta de novo no próximo ciclo
+            logger.error(f"Erro ao recarregar modelo alterado em disco: {e}")
+            continue
+        last_seen = _artifact_mtimes(manager)
@@ -0,0 +1,79 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import STARTUP_MODE
+
+logger = logging.getLogger(__name__)
+
+class StartupState:
+    """
+    Estado de prontidão do serviço e tempos de cada fase do startup
+    (importação, desserialização do modelo, aquecimento)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = "starting"
+        self.error: Optional[str] = None
+        self.started_at = time.perf_counter()
+        self.phases_ms: Dict[str, float] = {}
+        self.time_to_ready_ms: Optional[float] = None
+        self.model_version: Optional[str] = None
+
+    def record_import(self, import_started: float):
+        """
+        Registra o tempo de importação da aplicação, início da contagem do startup
+        """
+        self.started_at = import_started
+        self.phases_ms["import_ms"] = round((time.perf_counter() - import_started) * 1000, 1)
+
+    def mark_ready(self, model_version: str, load_timings: Dict[str, float]):
+        """
+        Modelo carregado e aquecido: o serviço passa a aceitar tráfego
+        """
+        with self._lock:
+            self.phases_ms.update(load_timings)
+            self.model_version = model_version
+            self.time_to_ready_ms = round((time.perf_counter() - self.started_at) * 1000, 1)
+            self.status = "ready"
+        logger.info(
+            f"Serviço pronto em {self.time_to_ready_ms:.0f}ms ({STARTUP_MODE}) - "
+            + ", ".join(f"{phase}: {ms:.0f}" for phase, ms in self.phases_ms.items()),
+            extra={"event": "startup", **self.report()}
+        )
+
+    def mark_failed(self, error: Exception):
+        """
+        Falha no carregamento do modelo: o serviço permanece não pronto
+        """
+        with self._lock:
+            self.status = "failed"
+            self.error = str(error)
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Relatório de startup: status, modo e tempos por fase
+        """
+        return {
+            "status": self.status,
+            "mode": STARTUP_MODE,
+            "model_version": self.model_version,
+            "phases_ms": dict(self.phases_ms),
+            "time_to_ready_ms": self.time_to_ready_ms,
+            "error": self.error
+        }
+
+# Instância global
+startup_state = StartupState()
+
+def get_startup_state() -> StartupState:
+    """
+    Dependency injection para o estado de startup
+    """
+    return startup_state
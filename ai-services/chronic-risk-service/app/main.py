@@ -1,28 +1,85 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 import logging
 from fastapi import FastAPI
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
+from app.core.config import MODEL_WATCH_INTERVAL, STARTUP_MODE
 from app.core.model_manager import get_model_manager
+from app.core.batcher import get_prediction_batcher
+from app.core.executor import get_inference_executor
+from app.core.metrics import register_runtime_stats
+from app.core.logging_config import start_structured_logging, stop_structured_logging
+from app.core.model_watcher import watch_model_artifacts
+from app.core.startup import get_startup_state
 from app.routers.prediction import router as prediction_router
+from app.routers.admin import router as admin_router
 
 logger = logging.getLogger(__name__)
 
+get_startup_state().record_import(_IMPORT_STARTED)
+
+async def load_model_in_background():
+    """
+    Carrega e aquece o modelo fora do event loop; /ready passa a 200 ao final
+    """
+    startup = get_startup_state()
+    try:
+        await asyncio.to_thread(get_model_manager().load_model)
+    except Exception as e:
+        logger.error(f"Erro ao carregar modelo aprimorado em background: {e}")
+        startup.mark_failed(e)
+        return
+    snapshot = get_model_manager().get_snapshot()
+    startup.mark_ready(snapshot.version, snapshot.load_timings)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Gerencia o ciclo de vida da aplicação: carrega modelo na inicialização e loga no shutdown
     """
+    start_structured_logging()
     logger.info("Iniciando API com modelo aprimorado...")
-    try:
-        get_model_manager().load_model()
-        logger.info("Modelo aprimorado carregado com sucesso!")
-    except Exception as e:
-        logger.error(f"Erro ao carregar modelo aprimorado: {e}")
-        raise
+    get_inference_executor().start()
+    await get_prediction_batcher().start()
+
+    loader = None
+    if STARTUP_MODE == "background":
+        # O socket já aceita conexões; o tráfego é liberado por /ready
+        loader = asyncio.create_task(load_model_in_background())
+    else:
+        try:
+            get_model_manager().load_model()
+            logger.info("Modelo aprimorado carregado com sucesso!")
+        except Exception as e:
+            logger.error(f"Erro ao carregar modelo aprimorado: {e}")
+            get_startup_state().mark_failed(e)
+            raise
+        snapshot = get_model_manager().get_snapshot()
+        get_startup_state().mark_ready(snapshot.version, snapshot.load_timings)
+
+    watcher = None
+    if MODEL_WATCH_INTERVAL > 0:
+        watcher = asyncio.create_task(
+            watch_model_artifacts(get_model_manager(), MODEL_WATCH_INTERVAL)
+        )
 
     yield
 
     logger.info("Finalizando API...")
+    if loader is not None and not loader.done():
+        loader.cancel()
+        with suppress(asyncio.CancelledError):
+            await loader
+    if watcher is not None:
+        watcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await watcher
+    await get_prediction_batcher().stop()
+    get_inference_executor().shutdown()
+    stop_structured_logging()
 
 # Instância da aplicação FastAPI
 title = "Enhanced Cardiac Risk Prediction API"
@@ -37,8 +94,16 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Estatísticas de runtime (as mesmas de /stats) expostas em /metrics
+register_runtime_stats(lambda: {
+    "batcher": get_prediction_batcher().get_stats(),
+    "executor": get_inference_executor().get_stats(),
+    "cache": get_model_manager().get_cache_stats()
+})
+
 # Registrar rotas
 app.include_router(prediction_router)
+app.include_router(admin_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,183 @@
+"""
+Modo de serviço pre-fork: o processo master carrega o modelo uma única vez e
+então cria N workers uvicorn com fork(), que herdam o modelo já desserializado
+compartilhando suas páginas de memória (copy-on-write) e o socket de escuta.
+
+Uso:
+    python -m app.prefork --workers 4 [--host 127.0.0.1] [--port 8002]
+
+Cada worker tem seu próprio snapshot a partir do fork: /admin/reload_model
+atinge apenas o worker que atendeu a requisição. Para atualizar todos, use
+MODEL_WATCH_INTERVAL (cada worker monitora os artefatos) ou reinicie o master.
+
+As métricas Prometheus são agregadas entre os workers em PROMETHEUS_MULTIPROC_DIR
+(um diretório temporário quando não definido), limpo pelo master antes do fork.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import sys
+import tempfile
+import time
+from typing import Dict
+
+logger = logging.getLogger("app.prefork")
+
+# Worker que morre antes disso após o fork é considerado em crash-loop
+MIN_WORKER_UPTIME = 5.0
+
+def _configure_thread_env(workers: int):
+    """
+    Define os limites de threads antes de importar a aplicação (lidos na importação)
+    """
+    cpus = os.cpu_count() or 1
+    os.environ.setdefault("INFERENCE_THREADS", str(max(1, cpus // workers)))
+    # Uma thread de modelo por chamada: o warm-up no master não inicializa um
+    # pool OpenMP (inseguro após fork) e N workers não competem por CPU
+    os.environ.setdefault("MODEL_NUM_THREADS", "1")
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+def _configure_metrics_dir() -> str:
+    """
+    Prepara PROMETHEUS_MULTIPROC_DIR antes de importar a aplicação (o
+    prometheus_client escolhe o armazenamento das métricas na importação),
+    removendo os arquivos de execuções anteriores
+    """
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or tempfile.mkdtemp(prefix="chronic-risk-metrics-")
+    os.makedirs(metrics_dir, exist_ok=True)
+    for name in os.listdir(metrics_dir):
+        if name.endswith(".db"):
+            os.remove(os.path.join(metrics_dir, name))
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+    return metrics_dir
+
+class PreforkMaster:
+    """
+    Supervisiona os workers: recria os que morrem e repassa SIGINT/SIGTERM
+    """
+
+    def __init__(self, config, sock, workers: int):
+        self.config = config
+        self.sock = sock
+        self.num_workers = workers
+        self.workers: Dict[int, float] = {}
+        self.stopping = False
+
+    def spawn_worker(self):
+        """
+        Cria um worker com fork(); o filho roda o servidor uvicorn no socket herdado
+        """
+        pid = os.fork()
+        if pid == 0:
+            for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGCHLD):
+                signal.signal(sig, signal.SIG_DFL)
+            gc.enable()
+            exit_code = 0
+            try:
+                import uvicorn
+                uvicorn.Server(self.config).run(sockets=[self.sock])
+            except BaseException:
+                logger.exception("Worker encerrado com erro")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.workers[pid] = time.monotonic()
+        logger.info(f"Worker iniciado (pid {pid})")
+
+    def _handle_stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info(f"Sinal {signal.Signals(signum).name} recebido, encerrando workers...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _mark_dead(self, pid: int):
+        """
+        Remove os gauges do worker encerrado das métricas agregadas
+        """
+        # Importado aqui: só depois de _configure_metrics_dir
+        from prometheus_client import multiprocess
+        try:
+            multiprocess.mark_process_dead(pid)
+        except OSError as e:
+            logger.warning(f"Falha ao limpar as métricas do worker {pid}: {e}")
+
+    def run(self) -> int:
+        """
+        Cria os workers e os supervisiona até receber sinal de parada
+        """
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        for _ in range(self.num_workers):
+            self.spawn_worker()
+
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            self._mark_dead(pid)
+            if self.stopping:
+                continue
+            logger.warning(
+                f"Worker {pid} terminou inesperadamente "
+                f"(código {os.waitstatus_to_exitcode(status)}); recriando"
+            )
+            if time.monotonic() - started < MIN_WORKER_UPTIME:
+                time.sleep(1.0)
+            self.spawn_worker()
+        logger.info("Master finalizado")
+        return 0
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Serviço pre-fork com modelo compartilhado")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8002)
+    parser.add_argument('--log-level', default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s"
+    )
+    _configure_thread_env(args.workers)
+    metrics_dir = _configure_metrics_dir()
+    logger.info(f"Métricas multiprocesso em {metrics_dir}")
+
+    # Importa a aplicação e carrega o modelo no master, antes do fork
+    import uvicorn
+    from app.main import app
+    from app.core.model_manager import get_model_manager
+
+    start_time = time.time()
+    get_model_manager().load_model()
+    logger.info(f"Modelo carregado no master em {(time.time() - start_time) * 1000:.0f}ms")
+
+    config = uvicorn.Config(app, host=args.host, port=args.port, log_level=args.log_level)
+    sock = config.bind_socket()
+
+    # Objetos já existentes vão para a geração permanente: a coleta de lixo
+    # nos workers não toca (e não copia) as páginas herdadas
+    gc.disable()
+    gc.freeze()
+
+    master = PreforkMaster(config, sock, args.workers)
+    sys.exit(master.run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import asyncio
+import hmac
+import logging
+import os
+import time
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Header
+
+from app.schemas import ReloadModelRequest
+from app.core.config import ADMIN_TOKEN, MODEL_DIR
+from app.core.model_manager import get_model_manager, ModelManager
+
+logger = logging.getLogger(__name__)
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """
+    Exige o token de administração configurado em ADMIN_TOKEN
+    """
+    if ADMIN_TOKEN is None:
+        raise HTTPException(
+            status_code=403,
+            detail="Endpoints de administração desativados (ADMIN_TOKEN não configurado)"
+        )
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Token de administração inválido")
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin_token)])
+
+def _resolve_artifact_path(path: Optional[str]) -> Optional[str]:
+    """
+    Caminho absoluto do artefato, recusando o que estiver fora de MODEL_DIR
+    (inclusive via symlink ou ..)
+    """
+    if path is None:
+        return None
+    model_dir = os.path.realpath(MODEL_DIR)
+    resolved = os.path.realpath(path)
+    if os.path.commonpath([resolved, model_dir]) != model_dir:
+        logger.warning(f"Recarga recusada: {path} está fora de {model_dir}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Caminho fora do diretório de modelos permitido: {path}"
+        )
+    return resolved
+
+@router.post("/reload_model")
+async def reload_model(
+    request: Optional[ReloadModelRequest] = None,
+    manager: ModelManager = Depends(get_model_manager)
+):
+    """
+    Carrega, aquece e troca atomicamente o modelo sem reiniciar o serviço
+    """
+    previous_version = manager.get_snapshot().version if manager.is_loaded() else None
+    model_path = _resolve_artifact_path(request.model_path if request else None)
+    metadata_path = _resolve_artifact_path(request.metadata_path if request else None)
+    start_time = time.time()
+    try:
+        # Desserialização e warm-up rodam fora do event loop
+        snapshot = await asyncio.to_thread(manager.reload_model, model_path, metadata_path)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro ao recarregar modelo: {e}")
+        raise HTTPException(status_code=500, detail=f"Erro ao recarregar modelo: {str(e)}")
+    return {
+        "status": "reloaded",
+        "previous_version": previous_version,
+        "model_version": snapshot.version,
+        "model_path": snapshot.model_path,
+        "metadata_path": snapshot.metadata_path,
+        "reload_time_ms": round((time.time() - start_time) * 1000, 2)
+    }
@@ -1,17 +1,99 @@
 import logging
 import time
-import pandas as pd
-from fastapi import APIRouter, HTTPException, Depends, Request
-from typing import Dict, Any
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import JSONResponse
+from typing import Dict, Any, List, Optional
 
-from app.schemas import PatientData, EnhancedPredictionResponse
+from app.schemas import (
+    PatientData,
+    EnhancedPredictionResponse,
+    BatchPredictionRequest,
+    BatchPredictionItem,
+    BatchPredictionResponse
+)
 from app.core.model_manager import model_manager, get_model_manager, ModelManager
-from app.validation import validate_patient_data
+from app.core.batcher import get_prediction_batcher, PredictionBatcher
+from app.core.executor import get_inference_executor, InferenceExecutor
+from app.validation import validate_patient_data, validate_patient_batch
 from app.services import get_risk_level, get_clinical_interpretation
+from app.core.startup import get_startup_state, StartupState
+from app.core.logging_config import should_log_request_detail, get_logging_stats
+from app.core.config import LOG_VERBOSE_REQUESTS
+from app.core.metrics import (
+    VALIDATION_SECONDS, INTERPRETATION_SECONDS, SERIALIZATION_SECONDS,
+    REQUEST_SECONDS, PREDICTIONS, RISK_LEVELS, ERRORS,
+    METRICS_CONTENT_TYPE, render_metrics
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def build_prediction_response(
+    user_id: str,
+    prediction_result: Dict[str, Any],
+    model_info: Dict[str, Any],
+    processing_time: float,
+    request_id: Optional[str] = None
+) -> EnhancedPredictionResponse:
+    """
+    Monta a resposta de previsão a partir do resultado do ModelManager
+    """
+    risk_score = prediction_result['risk_probability']
+    processed_features = prediction_result['processed_features']
+    clinical_features: Dict[str, Any] = {
+        "bmi": round(processed_features['bmi'], 2),
+        "bmi_category": processed_features['bmi_category'],
+        "blood_pressure_category": processed_features['bp_category'],
+        "age_category": processed_features['age_category'],
+        "lifestyle_score": processed_features['lifestyle_score'],
+        "pressure_pulse": processed_features['pressure_pulse']
+    }
+    with INTERPRETATION_SECONDS.time():
+        interpretation = get_clinical_interpretation(processed_features, risk_score)
+    return EnhancedPredictionResponse(
+        user_id=user_id,
+        request_id=request_id,
+        chronic_risk_score=round(risk_score, 4),
+        risk_prediction=prediction_result['risk_prediction'],
+        risk_level=get_risk_level(risk_score),
+        processing_time_ms=round(processing_time, 2),
+        model_info={
+            "model_name": model_info.get('model_name', 'Enhanced LightGBM'),
+            "version": model_info.get('version', '2.0'),
+            "model_version": prediction_result.get('model_version', model_info.get('model_version')),
+            "roc_auc": model_info.get('final_metrics', {}).get('roc_auc', 0),
+            "training_date": model_info.get('training_date', 'Unknown')
+        },
+        clinical_features=clinical_features,
+        interpretation=interpretation
+    )
+
+def _ensure_model_loaded(manager: ModelManager):
+    """
+    503 enquanto o modelo carrega em background; 500 se não carregado por falha
+    """
+    if manager.is_loaded():
+        return
+    if get_startup_state().status == "starting":
+        raise HTTPException(
+            status_code=503,
+            detail="Modelo em carregamento. Tente novamente em instantes.",
+            headers={"Retry-After": "1"}
+        )
+    raise HTTPException(
+        status_code=500,
+        detail="Modelo aprimorado não carregado. Verifique os logs do servidor."
+    )
+
+def _json_response(model: Any) -> Response:
+    """
+    Serializa o modelo de resposta diretamente em JSON, medindo a etapa de serialização
+    """
+    with SERIALIZATION_SECONDS.time():
+        body = model.model_dump_json()
+    return Response(content=body, media_type="application/json")
+
 @router.get("/")
 async def root():
     """
@@ -39,10 +121,43 @@ async def health_check():
     return {
         "status": "healthy",
         "model_loaded": model_manager.is_loaded(),
-        "timestamp": pd.Timestamp.now().isoformat(),
+        "timestamp": datetime.now().isoformat(),
         "model_info": model_info
     }
 
+@router.get("/ready")
+async def readiness_check(startup: StartupState = Depends(get_startup_state)):
+    """
+    Readiness: 200 apenas com o modelo carregado e aquecido; inclui o relatório de startup
+    """
+    report = startup.report()
+    if not startup.ready:
+        return JSONResponse(status_code=503, content=report)
+    return report
+
+@router.get("/stats")
+async def stats(
+    manager: ModelManager = Depends(get_model_manager),
+    batcher: PredictionBatcher = Depends(get_prediction_batcher),
+    executor: InferenceExecutor = Depends(get_inference_executor)
+):
+    """
+    Estatísticas de runtime do serviço (micro-batching, pool de inferência, cache e logging)
+    """
+    return {
+        "batcher": batcher.get_stats(),
+        "executor": executor.get_stats(),
+        "cache": manager.get_cache_stats(),
+        "logging": get_logging_stats()
+    }
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Métricas no formato Prometheus (latência por etapa, resultados e runtime)
+    """
+    return Response(content=render_metrics(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
 @router.post("/debug_predict")
 async def debug_predict(request: Request):
     """
@@ -50,13 +165,17 @@ async def debug_predict(request: Request):
     """
     try:
         body = await request.body()
-        logger.info("=== DEBUG RAW REQUEST ===")
-        logger.info(f"Method: {request.method}")
-        logger.info(f"URL: {request.url}")
-        logger.info(f"Headers: {dict(request.headers)}")
-        logger.info(f"Raw Body: {body}")
-        logger.info(f"Body as string: {body.decode('utf-8') if body else 'Empty'}")
-        logger.info("========================")
+        # Headers e corpo completos apenas com LOG_VERBOSE_REQUESTS
+        if LOG_VERBOSE_REQUESTS:
+            logger.info("=== DEBUG RAW REQUEST ===")
+            logger.info(f"Method: {request.method}")
+            logger.info(f"URL: {request.url}")
+            logger.info(f"Headers: {dict(request.headers)}")
+            logger.info(f"Raw Body: {body}")
+            logger.info(f"Body as string: {body.decode('utf-8') if body else 'Empty'}")
+            logger.info("========================")
+        else:
+            logger.info(f"Debug request recebida: {request.method} {request.url.path} ({len(body)} bytes)")
         return {
             "status": "debug_received",
             "method": request.method,
@@ -71,71 +190,160 @@ async def debug_predict(request: Request):
 @router.post("/predict_risk", response_model=EnhancedPredictionResponse)
 async def predict_risk(
     patient: PatientData,
-    manager: ModelManager = Depends(get_model_manager)
+    manager: ModelManager = Depends(get_model_manager),
+    batcher: PredictionBatcher = Depends(get_prediction_batcher)
 ):
     """
     Endpoint principal para previsão de risco cardíaco aprimorado
     """
     start_time = time.time()
     try:
-        logger.info("=========================")
-        logger.info("=== DADOS RECEBIDOS ===")
-        logger.info(f"User ID: {patient.user_id}")
-        logger.info(f"Age: {patient.age} (type: {type(patient.age)})")
-        logger.info(f"Gender: {patient.gender} (type: {type(patient.gender)})")
-        logger.info(f"Height: {patient.height} (type: {type(patient.height)})")
-        logger.info(f"Weight: {patient.weight} (type: {type(patient.weight)})")
-        logger.info(f"AP Hi: {patient.ap_hi} (type: {type(patient.ap_hi)})")
-        logger.info(f"AP Lo: {patient.ap_lo} (type: {type(patient.ap_lo)})")
-        logger.info("========================")
-        if not manager.is_loaded():
-            raise HTTPException(
-                status_code=500, 
-                detail="Modelo aprimorado não carregado. Verifique os logs do servidor."
-            )
-        validate_patient_data(patient)
+        # Dump completo apenas com LOG_VERBOSE_REQUESTS ou na amostragem
+        if should_log_request_detail():
+            logger.info("=========================")
+            logger.info("=== DADOS RECEBIDOS ===")
+            logger.info(f"User ID: {patient.user_id}")
+            logger.info(f"Age: {patient.age} (type: {type(patient.age)})")
+            logger.info(f"Gender: {patient.gender} (type: {type(patient.gender)})")
+            logger.info(f"Height: {patient.height} (type: {type(patient.height)})")
+            logger.info(f"Weight: {patient.weight} (type: {type(patient.weight)})")
+            logger.info(f"AP Hi: {patient.ap_hi} (type: {type(patient.ap_hi)})")
+            logger.info(f"AP Lo: {patient.ap_lo} (type: {type(patient.ap_lo)})")
+            logger.info("========================")
+        _ensure_model_loaded(manager)
+        with VALIDATION_SECONDS.time():
+            validate_patient_data(patient)
         patient_dict = patient.model_dump()
-        prediction_result = manager.predict(patient_dict)
+        # Agrupada com as requisições concorrentes em uma única chamada ao modelo
+        prediction_result = await batcher.predict(patient_dict)
         risk_score = prediction_result['risk_probability']
-        risk_prediction = prediction_result['risk_prediction']
-        processed_features = prediction_result['processed_features']
         risk_level = get_risk_level(risk_score)
         processing_time = (time.time() - start_time) * 1000
         model_info = manager.get_model_info()
-        clinical_features: Dict[str, Any] = {
-            "bmi": round(processed_features['bmi'], 2),
-            "bmi_category": processed_features['bmi_category'],
-            "blood_pressure_category": processed_features['bp_category'],
-            "age_category": processed_features['age_category'],
-            "lifestyle_score": processed_features['lifestyle_score'],
-            "pressure_pulse": processed_features['pressure_pulse']
-        }
-        interpretation = get_clinical_interpretation(processed_features, risk_score)
-        response = EnhancedPredictionResponse(
-            user_id=patient.user_id,
-            chronic_risk_score=round(risk_score, 4),
-            risk_prediction=risk_prediction,
-            risk_level=risk_level,
-            processing_time_ms=round(processing_time, 2),
-            model_info={
-                "model_name": model_info.get('model_name', 'Enhanced LightGBM'),
-                "version": model_info.get('version', '2.0'),
-                "roc_auc": model_info.get('final_metrics', {}).get('roc_auc', 0),
-                "training_date": model_info.get('training_date', 'Unknown')
-            },
-            clinical_features=clinical_features,
-            interpretation=interpretation
+        response = build_prediction_response(
+            patient.user_id, prediction_result, model_info, processing_time, patient.request_id
+        )
+        # Linha única de resumo por predição (campos estruturados no modo structured)
+        logger.info(
+            f"Previsão calculada - Usuário: {patient.user_id}, Risco: {risk_score:.4f}, Nível: {risk_level}",
+            extra={
+                "event": "prediction",
+                "user_id": patient.user_id,
+                "request_id": patient.request_id,
+                "risk_score": round(risk_score, 4),
+                "risk_level": risk_level,
+                "processing_time_ms": round(processing_time, 2),
+                "model_version": prediction_result.get('model_version')
+            }
         )
-        logger.info(f"Previsão calculada - Usuário: {patient.user_id}, Risco: {risk_score:.4f}, Nível: {risk_level}")
-        return response
-    except HTTPException:
+        PREDICTIONS.labels("predict_risk", "success").inc()
+        RISK_LEVELS.labels(risk_level).inc()
+        return _json_response(response)
+    except HTTPException as e:
+        PREDICTIONS.labels("predict_risk", "invalid" if e.status_code < 500 else "error").inc()
+        if e.status_code >= 500:
+            ERRORS.labels("predict_risk", "HTTPException").inc()
         raise
     except Exception as e:
+        PREDICTIONS.labels("predict_risk", "error").inc()
+        ERRORS.labels("predict_risk", type(e).__name__).inc()
         logger.error(f"Erro durante previsão para usuário {patient.user_id}: {e}")
         raise HTTPException(
             status_code=500, 
             detail=f"Erro interno do servidor durante a previsão: {str(e)}"
         )
+    finally:
+        REQUEST_SECONDS.labels("predict_risk").observe(time.time() - start_time)
+
+@router.post("/predict_risk_batch", response_model=BatchPredictionResponse)
+async def predict_risk_batch(
+    batch: BatchPredictionRequest,
+    manager: ModelManager = Depends(get_model_manager),
+    executor: InferenceExecutor = Depends(get_inference_executor)
+):
+    """
+    Previsão de risco em lote: valida todos os pacientes, executa uma única
+    chamada ao pipeline e reporta erros por linha
+    """
+    start_time = time.time()
+    _ensure_model_loaded(manager)
+
+    with VALIDATION_SECONDS.time():
+        valid, errors = validate_patient_batch(batch.patients)
+    if errors:
+        PREDICTIONS.labels("predict_risk_batch", "invalid").inc(len(errors))
+    results: List[BatchPredictionItem] = [
+        BatchPredictionItem(
+            index=index,
+            user_id=_raw_user_id(batch.patients[index]),
+            success=False,
+            error=error
+        )
+        for index, error in errors.items()
+    ]
+
+    if valid:
+        try:
+            predictions = await executor.run(
+                manager.predict_batch, [patient.model_dump() for _, patient in valid]
+            )
+        except Exception as e:
+            PREDICTIONS.labels("predict_risk_batch", "error").inc(len(valid))
+            ERRORS.labels("predict_risk_batch", type(e).__name__).inc()
+            logger.error(f"Erro durante previsão em lote ({len(valid)} pacientes): {e}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Erro interno do servidor durante a previsão: {str(e)}"
+            )
+        processing_time = (time.time() - start_time) * 1000
+        model_info = manager.get_model_info()
+        for (index, patient), prediction_result in zip(valid, predictions):
+            try:
+                prediction = build_prediction_response(
+                    patient.user_id, prediction_result, model_info, processing_time, patient.request_id
+                )
+            except Exception as e:
+                PREDICTIONS.labels("predict_risk_batch", "error").inc()
+                ERRORS.labels("predict_risk_batch", type(e).__name__).inc()
+                results.append(BatchPredictionItem(
+                    index=index, user_id=patient.user_id, success=False, error=str(e)
+                ))
+                continue
+            PREDICTIONS.labels("predict_risk_batch", "success").inc()
+            RISK_LEVELS.labels(prediction.risk_level).inc()
+            results.append(BatchPredictionItem(
+                index=index, user_id=patient.user_id, success=True, prediction=prediction
+            ))
+
+    results.sort(key=lambda item: item.index)
+    succeeded = sum(1 for item in results if item.success)
+    processing_time = (time.time() - start_time) * 1000
+    logger.info(
+        f"Previsão em lote concluída - Total: {len(results)}, Sucesso: {succeeded}, "
+        f"Falhas: {len(results) - succeeded}, Tempo: {processing_time:.2f}ms",
+        extra={
+            "event": "batch_prediction",
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "processing_time_ms": round(processing_time, 2)
+        }
+    )
+    REQUEST_SECONDS.labels("predict_risk_batch").observe(processing_time / 1000)
+    return _json_response(BatchPredictionResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        processing_time_ms=round(processing_time, 2),
+        results=results
+    ))
+
+def _raw_user_id(raw: Dict[str, Any]) -> Optional[str]:
+    """
+    Extrai o user_id de um registro bruto (possivelmente inválido) do lote
+    """
+    user_id = raw.get('user_id')
+    return str(user_id) if user_id is not None else None
 
 @router.get("/model_info")
 async def get_model_info(manager: ModelManager = Depends(get_model_manager)):
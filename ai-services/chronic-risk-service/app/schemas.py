@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 class PatientData(BaseModel):
     user_id: str = Field(..., description="ID único do usuário")
@@ -14,6 +14,7 @@ class PatientData(BaseModel):
     smoke: int = Field(..., description="Fumante (0: não, 1: sim)", ge=0, le=1)
     alco: int = Field(..., description="Consumo álcool (0: não, 1: sim)", ge=0, le=1)
     active: int = Field(..., description="Atividade física (0: não, 1: sim)", ge=0, le=1)
+    request_id: Optional[str] = Field(None, description="ID de correlação da requisição (gateway), devolvido na resposta")
 
     class Config:
         json_schema_extra = {
@@ -36,6 +37,7 @@ class PatientData(BaseModel):
 class EnhancedPredictionResponse(BaseModel):
 
     user_id: str
+    request_id: Optional[str] = None
     chronic_risk_score: float
     risk_prediction: int
     risk_level: str
@@ -45,3 +47,37 @@ class EnhancedPredictionResponse(BaseModel):
     interpretation: Dict[str, str]
 
     model_config = {"protected_namespaces": ()}
+
+
+class BatchPredictionRequest(BaseModel):
+    patients: List[Dict[str, Any]] = Field(
+        ...,
+        description="Lista de pacientes no mesmo formato de PatientData",
+        min_length=1,
+        max_length=5000
+    )
+
+
+class BatchPredictionItem(BaseModel):
+
+    index: int
+    user_id: Optional[str] = None
+    success: bool
+    prediction: Optional[EnhancedPredictionResponse] = None
+    error: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+
+    total: int
+    succeeded: int
+    failed: int
+    processing_time_ms: float
+    results: List[BatchPredictionItem]
+
+
+class ReloadModelRequest(BaseModel):
+    model_path: Optional[str] = Field(None, description="Caminho do novo artefato (joblib ou diretório .mmap; padrão: o atual)")
+    metadata_path: Optional[str] = Field(None, description="Caminho do model_metadata.joblib correspondente")
+
+    model_config = {"protected_namespaces": ()}
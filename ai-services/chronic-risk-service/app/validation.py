@@ -1,4 +1,6 @@
 from fastapi import HTTPException
+from pydantic import ValidationError
+from typing import Any, Dict, List, Tuple
 from app.schemas import PatientData
 import logging
 
@@ -30,3 +32,26 @@ def validate_patient_data(patient: PatientData):
             status_code=400,
             detail="Pressão diastólica fora da faixa plausível (40-150 mmHg)"
         )
+
+
+def validate_patient_batch(patients: List[Dict[str, Any]]) -> Tuple[List[Tuple[int, PatientData]], Dict[int, str]]:
+    """
+    Valida um lote de pacientes, separando registros válidos dos erros por linha
+    """
+    valid: List[Tuple[int, PatientData]] = []
+    errors: Dict[int, str] = {}
+    for index, raw in enumerate(patients):
+        try:
+            patient = PatientData.model_validate(raw)
+            validate_patient_data(patient)
+        except ValidationError as e:
+            errors[index] = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                for err in e.errors()
+            )
+            continue
+        except HTTPException as e:
+            errors[index] = str(e.detail)
+            continue
+        valid.append((index, patient))
+    return valid, errors
@@ -0,0 +1,156 @@
+"""
+Benchmark de inicialização e memória: pre-fork (app.prefork) vs uvicorn --workers.
+
+Para cada número de workers, inicia o servidor, mede o tempo até todos os
+workers reportarem "Application startup complete" e lê RSS, PSS e USS de cada
+processo em /proc/<pid>/smaps_rollup (Linux). PSS divide as páginas
+compartilhadas entre os processos que as usam, então a soma de PSS é o
+consumo real de memória do serviço.
+
+Uso (a partir de ai-services/chronic-risk-service):
+    python benchmarks/prefork_startup.py [--workers 1 4 16] [--modes prefork uvicorn] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY_MARKER = "Application startup complete"
+
+def _command(mode: str, workers: int, port: int) -> List[str]:
+    if mode == "prefork":
+        return [sys.executable, "-m", "app.prefork", "--workers", str(workers),
+                "--port", str(port), "--log-level", "info"]
+    return [sys.executable, "-m", "uvicorn", "app.main:app", "--workers", str(workers),
+            "--port", str(port), "--log-level", "info"]
+
+def _memory_kb(pid: int) -> Optional[Dict[str, int]]:
+    """
+    Rss, Pss e USS (Private_Clean + Private_Dirty) de um processo, em kB
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "uss_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    }
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        # Campo 4 (após o nome entre parênteses) é o ppid
+        ppid = int(stat.rsplit(')', 1)[1].split()[1])
+        if ppid == pid and b"resource_tracker" not in cmdline:
+            children.append(int(entry))
+    return children
+
+def run_case(mode: str, workers: int, port: int, timeout: float) -> Dict:
+    """
+    Inicia o servidor, aguarda todos os workers e coleta tempo de startup e memória
+    """
+    env = dict(os.environ, PYTHONPATH=SERVICE_DIR)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        _command(mode, workers, port), cwd=SERVICE_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    ready = threading.Event()
+    ready_count = [0]
+
+    def read_output():
+        for line in process.stdout:
+            if READY_MARKER in line:
+                ready_count[0] += 1
+                if ready_count[0] >= workers:
+                    ready.set()
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    reader.start()
+    try:
+        if not ready.wait(timeout):
+            raise TimeoutError(f"{mode} com {workers} workers não ficou pronto em {timeout}s")
+        startup_s = time.perf_counter() - start
+        time.sleep(1.0)  # estabiliza a memória após o startup
+
+        worker_pids = _children(process.pid)
+        # uvicorn com 1 worker atende no próprio processo, sem master
+        master_memory = _memory_kb(process.pid) if worker_pids else None
+        workers_memory = [m for m in (_memory_kb(pid) for pid in worker_pids or [process.pid]) if m]
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    def avg(key: str) -> float:
+        return round(sum(m[key] for m in workers_memory) / len(workers_memory) / 1024, 1) if workers_memory else 0.0
+
+    total_pss = sum(m["pss_kb"] for m in workers_memory) + (master_memory or {}).get("pss_kb", 0)
+    return {
+        "mode": mode,
+        "workers": workers,
+        "startup_s": round(startup_s, 2),
+        "worker_rss_mb": avg("rss_kb"),
+        "worker_pss_mb": avg("pss_kb"),
+        "worker_uss_mb": avg("uss_kb"),
+        "master_rss_mb": round((master_memory or {}).get("rss_kb", 0) / 1024, 1),
+        "total_pss_mb": round(total_pss / 1024, 1)
+    }
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Startup e memória: pre-fork vs uvicorn --workers")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--modes', nargs='+', default=["prefork", "uvicorn"], choices=["prefork", "uvicorn"])
+    parser.add_argument('--port', type=int, default=8102)
+    parser.add_argument('--timeout', type=float, default=600.0)
+    parser.add_argument('--json', default=None, help="Salva os resultados em JSON")
+    args = parser.parse_args()
+
+    results = []
+    header = f"{'modo':<8} {'workers':>7} {'startup(s)':>10} {'RSS/w(MB)':>10} {'PSS/w(MB)':>10} {'USS/w(MB)':>10} {'PSS total(MB)':>14}"
+    print(header)
+    print("-" * len(header))
+    for workers in args.workers:
+        for mode in args.modes:
+            result = run_case(mode, workers, args.port, args.timeout)
+            results.append(result)
+            print(
+                f"{mode:<8} {workers:>7} {result['startup_s']:>10} {result['worker_rss_mb']:>10} "
+                f"{result['worker_pss_mb']:>10} {result['worker_uss_mb']:>10} {result['total_pss_mb']:>14}"
+            )
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Resultados salvos em: {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+Suíte de benchmarks offline do chronic-risk-service.
+
+Roda no próprio processo, sem servidor nem rede: micro-benchmarks de
+construção de features, ModelManager.predict/predict_batch, scoring unitário
+vs em lote (scorer compilado e pipeline sklearn) e requisições ASGI ponta a
+ponta (httpx.ASGITransport com o lifespan da aplicação).
+
+Cada benchmark roda em --repeat rodadas e vale a de menor mediana, o que
+reduz o ruído de outros processos na máquina; uma carga de calibração medida
+em volta de cada grupo normaliza a comparação quando a própria velocidade da
+máquina muda entre execuções (--no-normalize compara tempos brutos). Os
+resultados são salvos em JSON e comparados com uma baseline salva: um
+benchmark regride quando a mediana passa da baseline em mais que o limiar
+(--threshold, padrão 25%); nesse caso o processo termina com código 1.
+Baselines dependem da máquina e não são versionadas: gere a sua com
+--save-baseline antes de comparar. A comparação é recusada quando a baseline
+vem de outro host ou de outro número de CPUs.
+
+O cache de predições é desativado (PREDICTION_CACHE_SIZE=0, se não definido)
+para que cada iteração execute o modelo.
+
+Uso (a partir de ai-services/chronic-risk-service):
+    python benchmarks/suite.py [--quick] [--only features predict scoring asgi] [--repeat 3]
+                               [--json results.json] [--baseline benchmarks/baseline.json]
+                               [--threshold 0.25] [--no-normalize] [--save-baseline]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(SERVICE_DIR, "benchmarks", "baseline.json")
+GROUPS = ("features", "predict", "scoring", "asgi")
+
+# Benchmarks com mais variação entre execuções (event loop, threads do executor)
+NOISY_THRESHOLD = {"asgi.predict_risk.concurrent[32]": 0.5}
+
+# Rodadas por benchmark (--repeat)
+REPEATS = 3
+
+# Campos do ambiente que precisam coincidir para comparar com a baseline
+REQUIRED_ENVIRONMENT = ("host", "cpu_count")
+
+os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+os.environ.setdefault("MODEL_WATCH_INTERVAL", "0")
+os.environ.setdefault("STARTUP_MODE", "blocking")
+sys.path.insert(0, SERVICE_DIR)
+os.chdir(SERVICE_DIR)
+
+import numpy as np
+
+def benchmark_patients(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Pacientes sintéticos clinicamente plausíveis (passam pela validação da API)
+    """
+    rng = np.random.default_rng(seed)
+    patients = []
+    for i in range(n):
+        ap_hi = int(rng.integers(100, 181))
+        height = int(rng.integers(150, 191))
+        bmi = float(rng.uniform(19, 38))
+        patients.append({
+            'user_id': f"bench_{i}",
+            'age': int(rng.integers(30, 71)),
+            'gender': int(rng.integers(1, 3)),
+            'height': height,
+            'weight': round(bmi * (height / 100) ** 2, 1),
+            'ap_hi': ap_hi,
+            'ap_lo': int(rng.integers(60, min(ap_hi - 19, 111))),
+            'cholesterol': int(rng.integers(1, 4)),
+            'gluc': int(rng.integers(1, 4)),
+            'smoke': int(rng.integers(0, 2)),
+            'alco': int(rng.integers(0, 2)),
+            'active': int(rng.integers(0, 2))
+        })
+    return patients
+
+def _summarize(samples_ns: List[int], rows: int) -> Dict[str, Any]:
+    samples_us = sorted(ns / 1000 for ns in samples_ns)
+    median_us = statistics.median(samples_us)
+    return {
+        "iterations": len(samples_us),
+        "rows_per_call": rows,
+        "median_us": round(median_us, 2),
+        "mean_us": round(statistics.fmean(samples_us), 2),
+        "p95_us": round(samples_us[min(len(samples_us) - 1, int(len(samples_us) * 0.95))], 2),
+        "min_us": round(samples_us[0], 2),
+        "stdev_us": round(statistics.pstdev(samples_us), 2),
+        "rows_per_s": round(rows / (median_us / 1e6), 1) if median_us else None
+    }
+
+def _best_round(rounds: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Rodada com a menor mediana (as demais só acrescentam ruído da máquina)
+    """
+    best = min(rounds, key=lambda stats: stats["median_us"])
+    return {**best, "rounds": len(rounds)}
+
+def measure(fn: Callable[[int], Any], iterations: int, rows: int = 1, warmup: int = 5) -> Dict[str, Any]:
+    """
+    Executa fn(i) warmup vezes e depois REPEATS rodadas de iterations chamadas,
+    resumindo o tempo por chamada da melhor rodada
+    """
+    iterations = max(iterations, 5)
+    for i in range(warmup):
+        fn(i)
+    rounds = []
+    for _ in range(REPEATS):
+        samples = []
+        for i in range(iterations):
+            start = time.perf_counter_ns()
+            fn(i)
+            samples.append(time.perf_counter_ns() - start)
+        rounds.append(_summarize(samples, rows))
+    return _best_round(rounds)
+
+async def measure_async(fn: Callable[[int], Any], iterations: int, rows: int = 1, warmup: int = 5) -> Dict[str, Any]:
+    """
+    Versão assíncrona de measure (fn retorna uma corrotina)
+    """
+    iterations = max(iterations, 5)
+    for i in range(warmup):
+        await fn(i)
+    rounds = []
+    for _ in range(REPEATS):
+        samples = []
+        for i in range(iterations):
+            start = time.perf_counter_ns()
+            await fn(i)
+            samples.append(time.perf_counter_ns() - start)
+        rounds.append(_summarize(samples, rows))
+    return _best_round(rounds)
+
+def _chunks(patients: List[Dict[str, Any]], size: int) -> Callable[[int], List[Dict[str, Any]]]:
+    """
+    Seleciona o i-ésimo lote de tamanho size, circulando pelo conjunto de pacientes
+    """
+    def chunk(i: int) -> List[Dict[str, Any]]:
+        start = (i * size) % (len(patients) - size + 1)
+        return patients[start:start + size]
+    return chunk
+
+def calibrate() -> float:
+    """
+    Mediana (µs) de uma carga fixa de Python + NumPy, medida em volta de cada grupo;
+    normaliza a comparação quando a velocidade da máquina varia entre execuções
+    """
+    data = np.random.default_rng(0).random(20000)
+
+    def workload(_: int):
+        np.sort(data)
+        sum(i * i for i in range(5000))
+
+    return measure(workload, 50)["median_us"]
+
+def _calibrated(run: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Executa um grupo e anota em cada benchmark a calibração média (antes e depois do grupo)
+    """
+    before = calibrate()
+    results = run()
+    calibration_us = round((before + calibrate()) / 2, 2)
+    return {name: {**stats, "calibration_us": calibration_us} for name, stats in results.items()}
+
+def bench_features(patients: List[Dict[str, Any]], scale: float) -> Dict[str, Any]:
+    from app.core.features import build_feature_arrays, build_patient_frame
+
+    results = {}
+    for size, iterations in ((1, 2000), (64, 500)):
+        chunk = _chunks(patients, size)
+        results[f"features.build_feature_arrays[{size}]"] = measure(
+            lambda i: build_feature_arrays(chunk(i)), int(iterations * scale), rows=size
+        )
+        results[f"features.build_patient_frame[{size}]"] = measure(
+            lambda i: build_patient_frame(chunk(i)), int(iterations * scale / 4), rows=size
+        )
+    return results
+
+def bench_predict(manager, patients: List[Dict[str, Any]], scale: float) -> Dict[str, Any]:
+    results = {
+        "model_manager.predict": measure(
+            lambda i: manager.predict(patients[i % len(patients)]), int(2000 * scale)
+        )
+    }
+    for size, iterations in ((64, 300), (512, 60)):
+        chunk = _chunks(patients, size)
+        results[f"model_manager.predict_batch[{size}]"] = measure(
+            lambda i: manager.predict_batch(chunk(i)), int(iterations * scale), rows=size
+        )
+    return results
+
+def bench_scoring(manager, patients: List[Dict[str, Any]], scale: float) -> Dict[str, Any]:
+    """
+    Scoring unitário vs em lote: scorer compilado e pipeline sklearn (se houver o joblib)
+    """
+    from app.core.config import MODEL_PATH
+    from app.core.features import build_feature_arrays, build_patient_frame
+
+    results = {}
+    scorer = manager.get_snapshot().scorer
+    pipeline = None
+    if os.path.isfile(MODEL_PATH):
+        import joblib
+        pipeline = joblib.load(MODEL_PATH)
+
+    for size, iterations in ((1, 2000), (64, 300), (512, 60)):
+        chunk = _chunks(patients, size)
+        if scorer is not None:
+            results[f"scoring.compiled[{size}]"] = measure(
+                lambda i: scorer.predict_proba_arrays(*build_feature_arrays(chunk(i))),
+                int(iterations * scale), rows=size
+            )
+        if pipeline is not None:
+            results[f"scoring.sklearn[{size}]"] = measure(
+                lambda i: pipeline.predict_proba(build_patient_frame(chunk(i))),
+                int(iterations * scale / 10), rows=size
+            )
+    return results
+
+async def bench_asgi(patients: List[Dict[str, Any]], scale: float) -> Dict[str, Any]:
+    """
+    Requisições ponta a ponta pela aplicação FastAPI (lifespan, batcher, executor)
+    """
+    import httpx
+    from app.main import app, lifespan
+
+    results = {}
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def predict_risk(i: int):
+                response = await client.post("/predict_risk", json=patients[i % len(patients)])
+                response.raise_for_status()
+
+            results["asgi.predict_risk"] = await measure_async(predict_risk, int(500 * scale))
+
+            async def concurrent(i: int):
+                await asyncio.gather(*(predict_risk(i * 32 + j) for j in range(32)))
+
+            results["asgi.predict_risk.concurrent[32]"] = await measure_async(
+                concurrent, int(60 * scale), rows=32
+            )
+
+            chunk = _chunks(patients, 64)
+
+            async def predict_risk_batch(i: int):
+                response = await client.post("/predict_risk_batch", json={"patients": chunk(i)})
+                response.raise_for_status()
+
+            results["asgi.predict_risk_batch[64]"] = await measure_async(
+                predict_risk_batch, int(100 * scale), rows=64
+            )
+    return results
+
+def environment(manager) -> Dict[str, Any]:
+    """
+    Ambiente da execução (baselines só são comparáveis no mesmo ambiente)
+    """
+    snapshot = manager.get_snapshot()
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "model_version": snapshot.version,
+        "artifact_format": snapshot.artifact_format,
+        "compiled_scorer": snapshot.scorer is not None,
+        "prediction_cache_size": int(os.environ["PREDICTION_CACHE_SIZE"])
+    }
+
+def run_suite(groups: List[str], quick: bool) -> Dict[str, Any]:
+    """
+    Executa os grupos de benchmarks selecionados
+    """
+    from app.core.model_manager import ModelManager
+
+    scale = 0.2 if quick else 1.0
+    patients = benchmark_patients(4096)
+    manager = ModelManager()
+    manager.load_model()
+
+    benchmarks: Dict[str, Any] = {}
+    if "features" in groups:
+        benchmarks.update(_calibrated(lambda: bench_features(patients, scale)))
+    if "predict" in groups:
+        benchmarks.update(_calibrated(lambda: bench_predict(manager, patients, scale)))
+    if "scoring" in groups:
+        benchmarks.update(_calibrated(lambda: bench_scoring(manager, patients, scale)))
+    if "asgi" in groups:
+        benchmarks.update(_calibrated(lambda: asyncio.run(bench_asgi(patients, scale))))
+    return {
+        "created_at": datetime.now().isoformat(),
+        "quick": quick,
+        "repeat": REPEATS,
+        "environment": environment(manager),
+        "benchmarks": benchmarks
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float,
+            normalize: bool = True) -> List[Dict[str, Any]]:
+    """
+    Compara as medianas com a baseline; ratio > 1 + limiar é regressão.
+    Com normalize, o ratio é dividido pela variação da calibração do grupo
+    """
+    rows = []
+    for name, current in results["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if reference is None:
+            rows.append({"name": name, "status": "new", "ratio": None})
+            continue
+        limit = NOISY_THRESHOLD.get(name, threshold)
+        ratio = current["median_us"] / reference["median_us"]
+        if normalize and current.get("calibration_us") and reference.get("calibration_us"):
+            ratio /= current["calibration_us"] / reference["calibration_us"]
+        if ratio > 1 + limit:
+            status = "regression"
+        elif ratio < 1 / (1 + limit):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"name": name, "status": status, "ratio": round(ratio, 3), "threshold": limit})
+    return rows
+
+def print_results(results: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]]):
+    by_name = {row["name"]: row for row in comparison or []}
+    print(f"\n{'benchmark':<42} {'mediana (µs)':>13} {'p95 (µs)':>11} {'linhas/s':>11}  vs baseline")
+    print("-" * 96)
+    for name, stats in results["benchmarks"].items():
+        row = by_name.get(name)
+        versus = ""
+        if row is not None:
+            versus = row["status"] if row["ratio"] is None else f"{row['ratio']:.2f}x {row['status']}"
+        print(
+            f"{name:<42} {stats['median_us']:>13.1f} {stats['p95_us']:>11.1f} "
+            f"{stats['rows_per_s'] or 0:>11.0f}  {versus}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline do chronic-risk-service")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--quick", action="store_true", help="Menos iterações (smoke test)")
+    parser.add_argument("--repeat", type=int, default=3, help="Rodadas por benchmark (vale a de menor mediana)")
+    parser.add_argument("--json", default=None, help="Arquivo de saída com os resultados")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline para comparação")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Regressão tolerada na mediana (fração)")
+    parser.add_argument("--no-normalize", action="store_true", help="Compara tempos brutos, sem a calibração")
+    parser.add_argument("--save-baseline", action="store_true", help="Salva os resultados como nova baseline")
+    args = parser.parse_args()
+
+    global REPEATS
+    REPEATS = max(1, args.repeat)
+    results = run_suite(args.only, args.quick)
+
+    comparison = None
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        print(f"Nenhuma baseline em {args.baseline}; gere uma nesta máquina com --save-baseline")
+    elif not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        reference_env = baseline.get("environment", {})
+        mismatched = [
+            key for key in REQUIRED_ENVIRONMENT
+            if reference_env.get(key) != results["environment"].get(key)
+        ]
+        if mismatched:
+            print(
+                f"⚠️  Baseline gerada em outra máquina ({', '.join(mismatched)} diferente); "
+                "comparação ignorada. Gere uma nesta máquina com --save-baseline"
+            )
+        else:
+            differing = [
+                key for key, value in reference_env.items()
+                if results["environment"].get(key) != value
+            ]
+            if differing:
+                print(f"⚠️  Ambiente difere da baseline em: {', '.join(differing)}")
+            comparison = compare(results, baseline, args.threshold, normalize=not args.no_normalize)
+            results["comparison"] = comparison
+
+    print_results(results, comparison)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados salvos em: {args.json}")
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline salva em: {args.baseline}")
+
+    regressions = [row["name"] for row in comparison or [] if row["status"] == "regression"]
+    if regressions:
+        print(f"\n❌ Regressões: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compila o pipeline LightGBM salvo em um scorer NumPy (.npz) e no artefato
+mapeável em memória (<modelo>.mmap/), verificando a paridade das predições
+de ambos com o pipeline sklearn original.
+
+Uso:
+    python compile_model.py [--model models/cardiac_risck_model_v2.joblib]
+                            [--output models/cardiac_risck_model_v2.compiled.npz]
+                            [--mmap-output models/cardiac_risck_model_v2.mmap]
+                            [--check data/cardio_train.csv]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.core.config import MODEL_PATH
+from app.core.features import RAW_FEATURES, age_in_years, build_patient_frame
+from app.core.compiled_scorer import (
+    CompiledScorer, export_compiled_model, sample_patients, verify_against_pipeline
+)
+from app.core.artifact import export_model_artifact, load_model_artifact, verify_model_artifact
+
+
+def load_dataset_patients(data_path: str):
+    """
+    Registros de pacientes do dataset de treino (idade convertida para anos)
+    """
+    df = pd.read_csv(data_path, sep=';')
+    df['age'] = age_in_years(df['age'])
+    return df[RAW_FEATURES].to_dict('records')
+
+
+def load_metadata(model_path: str) -> dict:
+    """
+    Metadados de treinamento ao lado do modelo, com a mesma model_version que o
+    serviço atribui ao joblib (hash do arquivo quando ausente)
+    """
+    metadata_path = os.path.join(os.path.dirname(model_path), 'model_metadata.joblib')
+    metadata = joblib.load(metadata_path) if os.path.exists(metadata_path) else {}
+    if not metadata.get('model_version'):
+        with open(model_path, 'rb') as f:
+            metadata['model_version'] = hashlib.sha256(f.read()).hexdigest()[:12]
+    return metadata
+
+
+def report_parity(label: str, parity: dict, elapsed: float) -> bool:
+    """
+    Imprime o resultado de uma checagem de paridade
+    """
+    print(
+        f"  {label}: {parity['rows']} pacientes, max_abs_diff={parity['max_abs_diff']:.3g}, "
+        f"divergências de classe={parity['prediction_mismatches']} ({elapsed:.2f}s)"
+    )
+    return parity['ok']
+
+
+def main():
+    """
+    Função principal
+    """
+    parser = argparse.ArgumentParser(description="Compila o modelo para o scorer NumPy")
+    parser.add_argument('--model', default=MODEL_PATH, help="Pipeline joblib treinado")
+    parser.add_argument('--output', default=None, help="Arquivo .npz de saída (padrão: ao lado do modelo)")
+    parser.add_argument('--mmap-output', default=None, help="Diretório do artefato mapeável (padrão: <modelo>.mmap)")
+    parser.add_argument('--check', default=None, help="CSV (cardio_train) para checar a paridade em todas as linhas")
+    parser.add_argument('--samples', type=int, default=10000, help="Pacientes sintéticos na checagem de paridade")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.model)[0] + '.compiled.npz'
+    mmap_output = args.mmap_output or os.path.splitext(args.model)[0] + '.mmap'
+
+    pipeline = joblib.load(args.model)
+    export_compiled_model(pipeline, output)
+    print(f"✓ Scorer compilado salvo em: {output}")
+    export_model_artifact(pipeline, mmap_output, load_metadata(args.model))
+    print(f"✓ Artefato mapeável salvo em: {mmap_output}")
+
+    patients = load_dataset_patients(args.check) if args.check else sample_patients(args.samples)
+    ok = True
+
+    start = time.perf_counter()
+    parity = verify_against_pipeline(CompiledScorer.load(output), pipeline, patients)
+    ok &= report_parity("Scorer compilado (.npz)", parity, time.perf_counter() - start)
+
+    artifact_model, _ = load_model_artifact(mmap_output)
+    start = time.perf_counter()
+    parity = verify_against_pipeline(artifact_model.scorer, pipeline, patients)
+    ok &= report_parity("Artefato mapeável (scorer)", parity, time.perf_counter() - start)
+
+    # Booster nativo do artefato (booster.txt) contra o pipeline
+    start = time.perf_counter()
+    frame = build_patient_frame(patients)
+    diff = np.abs(artifact_model.predict_proba(frame)[:, 1] - pipeline.predict_proba(frame)[:, 1])
+    booster_ok = bool(diff.max() <= 1e-9)
+    print(f"  Artefato mapeável (booster.txt): max_abs_diff={diff.max():.3g} ({time.perf_counter() - start:.2f}s)")
+    ok &= booster_ok
+
+    hashes = verify_model_artifact(mmap_output)
+    ok &= all(hashes.values())
+    print(f"  Checksums do artefato: {sum(hashes.values())}/{len(hashes)} válidos")
+
+    if not ok:
+        print("❌ Artefato compilado diverge do pipeline")
+        sys.exit(1)
+    print("✅ Artefatos compilados equivalentes ao pipeline")
+
+
+if __name__ == "__main__":
+    main()
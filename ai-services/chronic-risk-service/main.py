@@ -16,6 +16,8 @@ import threading
 import time
 from contextlib import asynccontextmanager
 
+from app.core.features import build_patient_frame
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -112,60 +114,8 @@ class ModelManager:
         """
         Preprocessa dados do paciente usando as mesmas transformações do treinamento
         """
-        # Converter para DataFrame
-        df = pd.DataFrame([patient_data])
-        
-        # Calcular BMI
-        df['bmi'] = df['weight'] / ((df['height'] / 100) ** 2)
-        
-        # Categorias de BMI
-        def categorize_bmi(bmi):
-            if bmi < 18.5:
-                return 'Underweight'
-            elif bmi < 25:
-                return 'Normal'
-            elif bmi < 30:
-                return 'Overweight'
-            else:
-                return 'Obese'
-        
-        df['bmi_category'] = df['bmi'].apply(categorize_bmi)
-        
-        # Categorias de Pressão Arterial
-        def categorize_blood_pressure(systolic, diastolic):
-            if systolic < 120 and diastolic < 80:
-                return 'Normal'
-            elif systolic < 130 and diastolic < 80:
-                return 'Elevated'
-            elif (systolic >= 130 and systolic < 140) or (diastolic >= 80 and diastolic < 90):
-                return 'Stage1_Hypertension'
-            elif systolic >= 140 or diastolic >= 90:
-                return 'Stage2_Hypertension'
-            else:
-                return 'Hypertensive_Crisis'
-        
-        df['bp_category'] = df.apply(lambda x: categorize_blood_pressure(x['ap_hi'], x['ap_lo']), axis=1)
-        
-        # Features de interação
-        df['age_cholesterol_interaction'] = df['age'] * df['cholesterol']
-        df['bmi_age_interaction'] = df['bmi'] * df['age']
-        df['pressure_pulse'] = df['ap_hi'] - df['ap_lo']
-        
-        # Lifestyle score
-        df['lifestyle_score'] = df['smoke'] + df['alco'] - df['active']
-        
-        # Categorização de idade
-        def categorize_age(age):
-            if age < 40:
-                return 'Young'
-            elif age < 55:
-                return 'Middle_aged'
-            else:
-                return 'Senior'
-        
-        df['age_category'] = df['age'].apply(categorize_age)
-        
-        return df
+        # Engenharia de features vetorizada compartilhada (app/core/features.py)
+        return build_patient_frame([patient_data])
     
     def predict(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
         """
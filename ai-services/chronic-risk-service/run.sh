@@ -1,2 +1,5 @@
 # Executa o servidor
-uvicorn app.main:app --host 127.0.0.1 --port 8002 --reload
\ No newline at end of file
+uvicorn app.main:app --host 127.0.0.1 --port 8002 --reload
+
+# Modo pre-fork: modelo carregado uma vez no master e compartilhado (copy-on-write) pelos workers
+# python -m app.prefork --workers 4 --host 127.0.0.1 --port 8002
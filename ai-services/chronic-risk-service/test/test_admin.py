@@ -0,0 +1,51 @@
+"""
+Testes do /admin/reload_model: token de administração e diretório de modelos
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import MODEL_PATH
+from app.routers import admin
+
+TOKEN = "test-admin-token"
+
+@pytest.fixture(scope="module")
+def client():
+    """Cliente com o ciclo de vida completo da aplicação (modelo carregado)"""
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", TOKEN)
+    return {"X-Admin-Token": TOKEN}
+
+def test_reload_disabled_without_configured_token(client, monkeypatch):
+    """Sem ADMIN_TOKEN o endpoint fica desativado"""
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", None)
+    response = client.post("/admin/reload_model", headers={"X-Admin-Token": "qualquer"})
+    assert response.status_code == 403
+
+def test_reload_requires_valid_token(client, admin_token):
+    """Token ausente ou incorreto é recusado"""
+    assert client.post("/admin/reload_model").status_code == 401
+    response = client.post("/admin/reload_model", headers={"X-Admin-Token": "errado"})
+    assert response.status_code == 401
+
+@pytest.mark.parametrize("path", ["/etc/passwd", "models/../main.py", "../chronic-risk-service/main.py"])
+def test_reload_rejects_paths_outside_model_dir(client, admin_token, path):
+    """Caminhos fora de MODEL_DIR não chegam ao joblib.load"""
+    version = client.get("/model_info").json()["model_version"]
+    response = client.post("/admin/reload_model", headers=admin_token, json={"model_path": path})
+    assert response.status_code == 400
+    response = client.post("/admin/reload_model", headers=admin_token, json={"metadata_path": path})
+    assert response.status_code == 400
+    assert client.get("/model_info").json()["model_version"] == version
+
+def test_reload_within_model_dir(client, admin_token):
+    """Recarga do artefato atual, dentro de MODEL_DIR"""
+    response = client.post("/admin/reload_model", headers=admin_token, json={"model_path": MODEL_PATH})
+    assert response.status_code == 200
+    assert response.json()["status"] == "reloaded"
@@ -0,0 +1,56 @@
+"""
+Testes do micro-batching: falha do lote e do fallback item a item
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.batcher import PredictionBatcher
+
+class BrokenBatchManager:
+    """Modelo cujo predict_batch sempre falha; predict falha só para o paciente 'bad'"""
+
+    def cached_prediction(self, patient):
+        return None
+
+    def predict_batch(self, patients):
+        raise ValueError("lote inválido")
+
+    def predict(self, patient):
+        if patient["user_id"] == "bad":
+            raise ValueError("paciente inválido")
+        return {"user_id": patient["user_id"]}
+
+class InlineExecutor:
+    """Executa no próprio event loop; failing=True simula o pool recusando tarefas"""
+
+    def __init__(self, failing: bool = False):
+        self.failing = failing
+
+    async def run(self, func, *args):
+        if self.failing:
+            raise RuntimeError("pool de inferência encerrado")
+        return func(*args)
+
+async def predict_all(executor, user_ids):
+    batcher = PredictionBatcher(BrokenBatchManager(), executor, max_batch_size=8, max_wait_ms=20)
+    await batcher.start()
+    try:
+        calls = [batcher.predict({"user_id": user_id}) for user_id in user_ids]
+        return await asyncio.wait_for(asyncio.gather(*calls, return_exceptions=True), 2)
+    finally:
+        await batcher.stop()
+
+@pytest.mark.asyncio
+async def test_fallback_isolates_failing_item():
+    """Lote com erro é pontuado item a item; só o item inválido falha"""
+    results = await predict_all(InlineExecutor(), ["a", "bad", "c"])
+    assert results[0] == {"user_id": "a"} and results[2] == {"user_id": "c"}
+    assert isinstance(results[1], ValueError)
+
+@pytest.mark.asyncio
+async def test_failed_fallback_fails_every_caller():
+    """Se o fallback também falha, nenhum chamador fica esperando"""
+    results = await predict_all(InlineExecutor(failing=True), ["a", "b", "c"])
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,49 @@
+"""
+Paridade do scorer compilado com o pipeline sklearn em todo o cardio_train.csv
+"""
+
+import os
+
+import joblib
+import pytest
+
+from app.core.config import MODEL_PATH
+from app.core.compiled_scorer import CompiledScorer, export_compiled_model, verify_against_pipeline
+from app.core.artifact import export_model_artifact, load_model_artifact
+from compile_model import load_dataset_patients, load_metadata
+
+DATA_PATH = "data/cardio_train.csv"
+
+pytestmark = pytest.mark.skipif(
+    not (os.path.exists(DATA_PATH) and os.path.exists(MODEL_PATH)),
+    reason="cardio_train.csv ou modelo treinado ausente"
+)
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return joblib.load(MODEL_PATH)
+
+@pytest.fixture(scope="module")
+def patients():
+    """Pacientes do dataset com a idade convertida como no treinamento"""
+    return load_dataset_patients(DATA_PATH)
+
+def assert_parity(parity, rows):
+    assert parity["rows"] == rows
+    assert parity["max_abs_diff"] <= 1e-9
+    assert parity["prediction_mismatches"] == 0
+    assert parity["ok"]
+
+def test_compiled_scorer_parity(pipeline, patients, tmp_path):
+    """Scorer .npz compilado do modelo distribuído"""
+    output = export_compiled_model(pipeline, str(tmp_path / "model.compiled.npz"))
+    parity = verify_against_pipeline(CompiledScorer.load(output), pipeline, patients)
+    assert_parity(parity, len(patients))
+
+def test_artifact_scorer_parity(pipeline, patients, tmp_path):
+    """Scorer do artefato mapeável (.mmap) compilado do modelo distribuído"""
+    output = str(tmp_path / "model.mmap")
+    export_model_artifact(pipeline, output, load_metadata(MODEL_PATH))
+    model, _ = load_model_artifact(output)
+    parity = verify_against_pipeline(model.scorer, pipeline, patients)
+    assert_parity(parity, len(patients))
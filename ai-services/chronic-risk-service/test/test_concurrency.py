@@ -1,261 +1,468 @@
 """
-Script para testar concorrência da API de previsão de risco cardíaco
+Gerador de carga em malha aberta para a API de previsão de risco cardíaco.
+
+As requisições são disparadas em instantes agendados pela taxa alvo (RPS),
+independentemente das respostas anteriores: se o servidor fica lento, a fila
+cresce e aparece na latência, em vez de o cliente simplesmente desacelerar
+(o que um teste em malha fechada com semáforo/pool de threads esconde).
+
+Correção de coordinated omission: a latência é medida a partir do instante
+agendado de envio, não do envio efetivo. O atraso do próprio gerador e a fila
+do servidor entram no resultado; o tempo a partir do envio efetivo é
+reportado à parte como tempo de serviço.
+
+As latências vão para um histograma no estilo HdrHistogram (buckets
+log-lineares, precisão relativa fixa, memória constante), com p50/p90/p99/p99.9
+por estágio e no total. O histograma principal registra todas as tentativas:
+erros pelo tempo até a falha e timeouts (ou requisições descartadas pelo
+gerador) por pelo menos o timeout configurado; a visão só com respostas 2xx
+é reportada à parte.
+
+Uso:
+    python test/test_concurrency.py --target chronic --rps 50 --duration 60
+    python test/test_concurrency.py --target gateway --url http://127.0.0.1:8000 \\
+        --stages "10-100:60,100:120" --warmup 10 --json capacidade.json
+
+Estágios: "RPS:segundos" (taxa constante) ou "INICIAL-FINAL:segundos" (rampa linear).
 """
 
+import argparse
 import asyncio
-import aiohttp
+import json
+import math
+import random
+import sys
 import time
-import statistics
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import requests
-
-# Configurações
-API_URL = "http://127.0.0.1:8001"  # Versão concorrente
-MOCK_API_URL = "http://127.0.0.1:8000"  # Versão original
-NUM_REQUESTS = 500
-CONCURRENT_REQUESTS = 10
-
-# Dados de teste
-TEST_PATIENTS = [
-    {
-        "user_id": f"patient_{i}",
-        "age": 30 + (i % 40),
-        "gender": 1 + (i % 2),
-        "height": 160 + (i % 25),
-        "weight": 60.0 + (i % 40),
-        "ap_hi": 110 + (i % 50),
-        "ap_lo": 70 + (i % 30),
-        "cholesterol": 1 + (i % 3),
-        "gluc": 1 + (i % 3),
-        "smoke": i % 2,
-        "alco": i % 2,
-        "active": 1 - (i % 2)
-    }
-    for i in range(NUM_REQUESTS)
-]
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-async def make_async_request(session, url, data):
+import httpx
+
+TARGETS = {
+    "chronic": {"url": "http://127.0.0.1:8002", "endpoint": "/predict_risk"},
+    "gateway": {"url": "http://127.0.0.1:8000", "endpoint": "/predict"}
+}
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+class LatencyHistogram:
     """
-    Faz uma requisição assíncrona
+    Histograma log-linear no estilo HdrHistogram para valores inteiros (µs).
+    Cada potência de 2 é dividida em sub-buckets lineares, garantindo precisão
+    relativa de 10^-significant_digits em toda a faixa [1, highest].
     """
-    start_time = time.time()
-    try:
-        async with session.post(f"{url}/predict_risk", json=data) as response:
-            result = await response.json()
-            end_time = time.time()
-            
-            return {
-                "success": True,
-                "response_time": (end_time - start_time) * 1000,
-                "status_code": response.status,
-                "user_id": data["user_id"],
-                "risk_score": result.get("chronic_risk_score", 0),
-                "processing_time": result.get("processing_time_ms", 0)
-            }
-    except Exception as e:
-        end_time = time.time()
-        return {
-            "success": False,
-            "response_time": (end_time - start_time) * 1000,
-            "error": str(e),
-            "user_id": data["user_id"]
+
+    def __init__(self, highest: int = 3_600_000_000, significant_digits: int = 3):
+        largest_single_unit = 2 * 10 ** significant_digits
+        self.sub_bucket_count_magnitude = math.ceil(math.log2(largest_single_unit))
+        self.sub_bucket_half_count_magnitude = self.sub_bucket_count_magnitude - 1
+        self.sub_bucket_count = 1 << self.sub_bucket_count_magnitude
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_mask = self.sub_bucket_count - 1
+        self.highest = highest
+
+        bucket_count = 1
+        smallest_untrackable = self.sub_bucket_count
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.counts = [0] * ((bucket_count + 1) * self.sub_bucket_half_count)
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+
+    def _bucket_index(self, value: int) -> int:
+        return (value | self.sub_bucket_mask).bit_length() - self.sub_bucket_count_magnitude
+
+    def _counts_index(self, value: int) -> int:
+        bucket_index = self._bucket_index(value)
+        sub_bucket_index = value >> bucket_index
+        return ((bucket_index + 1) << self.sub_bucket_half_count_magnitude) + (
+            sub_bucket_index - self.sub_bucket_half_count
+        )
+
+    def _value_from_index(self, index: int) -> Tuple[int, int]:
+        """
+        Menor valor equivalente do índice e o tamanho da faixa de valores equivalentes
+        """
+        bucket_index = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        return sub_bucket_index << bucket_index, 1 << bucket_index
+
+    def record(self, value: int, count: int = 1):
+        value = min(max(int(value), 0), self.highest)
+        self.counts[self._counts_index(value)] += count
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percentile: float) -> int:
+        """
+        Maior valor equivalente ao percentil (mesma convenção do HdrHistogram)
+        """
+        if self.total == 0:
+            return 0
+        target = max(1, math.ceil(percentile / 100.0 * self.total))
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                lowest, size = self._value_from_index(index)
+                return min(lowest + size - 1, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Contagem, média, mínimo/máximo e percentis, em milissegundos
+        """
+        result = {
+            "count": self.total,
+            "mean_ms": round(self.sum / self.total / 1000, 3) if self.total else 0.0,
+            "min_ms": round((self.min or 0) / 1000, 3),
+            "max_ms": round(self.max / 1000, 3)
         }
+        for percentile in PERCENTILES:
+            result[f"p{percentile:g}_ms"] = round(self.percentile(percentile) / 1000, 3)
+        return result
 
-def make_sync_request(url, data):
+class Stage:
     """
-    Faz uma requisição síncrona
+    Trecho do agendamento: taxa constante ou rampa linear de start_rps a end_rps
     """
-    start_time = time.time()
-    try:
-        response = requests.post(f"{url}/predict_risk", json=data)
-        result = response.json()
-        end_time = time.time()
-        
-        return {
-            "success": True,
-            "response_time": (end_time - start_time) * 1000,
-            "status_code": response.status_code,
-            "user_id": data["user_id"],
-            "risk_score": result.get("chronic_risk_score", 0),
-            "processing_time": result.get("processing_time_ms", 0)
-        }
-    except Exception as e:
-        end_time = time.time()
-        return {
-            "success": False,
-            "response_time": (end_time - start_time) * 1000,
-            "error": str(e),
-            "user_id": data["user_id"]
-        }
 
-async def test_async_concurrent_requests():
+    def __init__(self, start_rps: float, end_rps: float, duration: float):
+        self.start_rps = start_rps
+        self.end_rps = end_rps
+        self.duration = duration
+        # Todas as tentativas (corrigida), só respostas 2xx (corrigida) e
+        # tempo de serviço das respostas 2xx
+        self.latency = LatencyHistogram()
+        self.success_latency = LatencyHistogram()
+        self.service_time = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self.scheduled = 0
+
+    @property
+    def label(self) -> str:
+        if self.start_rps == self.end_rps:
+            return f"{self.start_rps:g} rps x {self.duration:g}s"
+        return f"{self.start_rps:g}->{self.end_rps:g} rps x {self.duration:g}s"
+
+    def time_at(self, arrivals: float) -> float:
+        """
+        Instante em que a taxa acumulada Λ(t) = a*t + (b-a)*t²/(2d) atinge arrivals
+        """
+        a = self.start_rps
+        slope = (self.end_rps - self.start_rps) / self.duration
+        if slope == 0:
+            return arrivals / a if a > 0 else math.inf
+        discriminant = a * a + 2 * slope * arrivals
+        if discriminant < 0:
+            return math.inf  # rampa descendente: Λ(t) não chega a arrivals
+        return (-a + math.sqrt(discriminant)) / slope
+
+    def arrival_offsets(self, poisson: bool, rng: random.Random) -> Iterator[float]:
+        """
+        Instantes (s, relativos ao início do estágio) de cada requisição.
+        Determinístico: a k-ésima chegada em Λ(t) = k. Poisson (não homogêneo):
+        incrementos exponenciais unitários em Λ, invertidos para o tempo real,
+        o que vale também para rampas que partem de 0 rps.
+        """
+        arrivals = 0.0
+        while True:
+            arrivals += rng.expovariate(1.0) if poisson else 1.0
+            t = self.time_at(arrivals)
+            if t >= self.duration:
+                return
+            yield t
+
+def parse_stages(spec: str) -> List[Stage]:
     """
-    Testa requisições assíncronas concorrentes
+    "10:30,10-100:60" -> [10 rps por 30s, rampa de 10 a 100 rps em 60s]
     """
-    print(f"=== TESTE ASSÍNCRONO CONCORRENTE ===")
-    print(f"URL: {API_URL}")
-    print(f"Requisições: {NUM_REQUESTS}")
-    print(f"Concorrência: {CONCURRENT_REQUESTS}")
-    
-    connector = aiohttp.TCPConnector(limit=CONCURRENT_REQUESTS)
-    timeout = aiohttp.ClientTimeout(total=30)
-    
-    async with aiohttp.ClientSession(
-        connector=connector, 
-        timeout=timeout
-    ) as session:
-        
-        start_time = time.time()
-        
-        # Limitar concorrência usando semáforo
-        semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)
-        
-        async def bounded_request(data):
-            async with semaphore:
-                return await make_async_request(session, API_URL, data)
-        
-        # Executar todas as requisições
-        tasks = [bounded_request(patient) for patient in TEST_PATIENTS]
-        results = await asyncio.gather(*tasks)
-        
-        end_time = time.time()
-        
-        # Analisar resultados
-        analyze_results(results, end_time - start_time, "ASSÍNCRONO")
-
-def test_sync_concurrent_requests():
+    stages = []
+    for item in spec.split(","):
+        rates, duration = item.strip().split(":")
+        start, _, end = rates.partition("-")
+        stages.append(Stage(float(start), float(end or start), float(duration)))
+    return stages
+
+def build_patients(n: int) -> List[Dict[str, Any]]:
     """
-    Testa requisições síncronas concorrentes usando ThreadPoolExecutor
+    Pacientes de teste válidos (mesmo formato para o serviço e o gateway)
     """
-    print(f"\n=== TESTE SÍNCRONO CONCORRENTE ===")
-    print(f"URL: {API_URL}")
-    print(f"Requisições: {NUM_REQUESTS}")
-    print(f"Threads: {CONCURRENT_REQUESTS}")
-    
-    start_time = time.time()
-    
-    with ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as executor:
-        # Submeter todas as requisições
-        future_to_patient = {
-            executor.submit(make_sync_request, API_URL, patient): patient
-            for patient in TEST_PATIENTS
+    return [
+        {
+            "user_id": f"patient_{i}",
+            "age": 30 + (i % 40),
+            "gender": 1 + (i % 2),
+            "height": 160 + (i % 25),
+            "weight": 60.0 + (i % 40),
+            "ap_hi": 110 + (i % 50),
+            "ap_lo": 70 + (i % 30),
+            "cholesterol": 1 + (i % 3),
+            "gluc": 1 + (i % 3),
+            "smoke": i % 2,
+            "alco": i % 2,
+            "active": 1 - (i % 2)
         }
-        
-        results = []
-        for future in as_completed(future_to_patient):
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                patient = future_to_patient[future]
-                results.append({
-                    "success": False,
-                    "error": str(e),
-                    "user_id": patient["user_id"]
-                })
-    
-    end_time = time.time()
-    
-    # Analisar resultados
-    analyze_results(results, end_time - start_time, "SÍNCRONO")
-
-def test_sequential_requests():
+        for i in range(n)
+    ]
+
+class LoadGenerator:
     """
-    Testa requisições sequenciais para comparação
+    Dispara requisições nos instantes agendados e registra latência (desde o
+    instante agendado) e tempo de serviço (desde o envio efetivo)
     """
-    print(f"\n=== TESTE SEQUENCIAL ===")
-    print(f"URL: {API_URL}")
-    print(f"Requisições: {NUM_REQUESTS}")
-    
-    start_time = time.time()
-    
-    results = []
-    for patient in TEST_PATIENTS:
-        result = make_sync_request(API_URL, patient)
-        results.append(result)
-    
-    end_time = time.time()
-    
-    # Analisar resultados
-    analyze_results(results, end_time - start_time, "SEQUENCIAL")
-
-def analyze_results(results, total_time, test_type):
+
+    def __init__(self, args: argparse.Namespace, stages: List[Stage]):
+        self.args = args
+        self.stages = stages
+        self.url = args.url.rstrip("/") + args.endpoint
+        self.patients = build_patients(args.patients)
+        self.send_lag = LatencyHistogram()
+        self.inflight = 0
+        self.max_inflight_seen = 0
+        self.dropped = 0
+
+    async def _fire(self, client: httpx.AsyncClient, stage: Stage, intended: float, seq: int, record: bool):
+        patient = dict(self.patients[seq % len(self.patients)])
+        patient["user_id"] = f"{patient['user_id']}_{seq}"
+        sent = time.perf_counter()
+        try:
+            response = await client.post(self.url, json=patient)
+            status = str(response.status_code)
+        except httpx.TimeoutException:
+            status = "timeout"
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        finally:
+            self.inflight -= 1
+        done = time.perf_counter()
+        if not record:
+            return
+        stage.statuses[status] += 1
+        latency = done - intended
+        if status == "timeout":
+            latency = max(latency, self.args.timeout)
+        stage.latency.record(latency * 1e6)
+        if status.startswith("2"):
+            stage.success_latency.record(latency * 1e6)
+            stage.service_time.record((done - sent) * 1e6)
+
+    async def run(self):
+        limits = httpx.Limits(max_connections=self.args.max_connections, max_keepalive_connections=self.args.max_connections)
+        timeout = httpx.Timeout(self.args.timeout)
+        rng = random.Random(self.args.seed)
+        tasks = set()
+        seq = 0
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+            start = time.perf_counter() + 0.05
+            stage_start = start
+            for stage in self.stages:
+                for offset in stage.arrival_offsets(self.args.arrival == "poisson", rng):
+                    intended = stage_start + offset
+                    delay = intended - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    record = intended - start >= self.args.warmup
+                    if record:
+                        stage.scheduled += 1
+                        self.send_lag.record(max(0.0, time.perf_counter() - intended) * 1e6)
+                    if self.inflight >= self.args.max_inflight:
+                        # Proteção do cliente: a requisição conta como falha, não é adiada
+                        if record:
+                            stage.statuses["dropped"] += 1
+                            stage.latency.record(self.args.timeout * 1e6)
+                        self.dropped += 1
+                        continue
+                    self.inflight += 1
+                    self.max_inflight_seen = max(self.max_inflight_seen, self.inflight)
+                    task = asyncio.create_task(self._fire(client, stage, intended, seq, record))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    seq += 1
+                stage_start += stage.duration
+            if tasks:
+                await asyncio.gather(*tasks)
+
+def stage_report(stage: Stage, measured_seconds: float) -> Dict[str, Any]:
+    ok = sum(count for status, count in stage.statuses.items() if status.startswith("2"))
+    return {
+        "stage": stage.label,
+        "scheduled": stage.scheduled,
+        "succeeded": ok,
+        "failed": sum(stage.statuses.values()) - ok,
+        "achieved_rps": round(ok / measured_seconds, 2) if measured_seconds > 0 else 0.0,
+        "statuses": dict(stage.statuses),
+        "latency": stage.latency.summary(),
+        "latency_2xx": stage.success_latency.summary(),
+        "service_time": stage.service_time.summary()
+    }
+
+def build_report(generator: LoadGenerator) -> Dict[str, Any]:
     """
-    Analisa e exibe os resultados dos testes
+    Relatório por estágio e total: latência corrigida de todas as tentativas,
+    latência corrigida só das respostas 2xx e tempo de serviço
     """
-    successful_results = [r for r in results if r["success"]]
-    failed_results = [r for r in results if not r["success"]]
-    
-    print(f"\n--- RESULTADOS {test_type} ---")
-    print(f"Tempo total: {total_time:.2f}s")
-    print(f"Requisições bem-sucedidas: {len(successful_results)}")
-    print(f"Requisições falhadas: {len(failed_results)}")
-    
-    if successful_results:
-        response_times = [r["response_time"] for r in successful_results]
-        processing_times = [r.get("processing_time", 0) for r in successful_results]
-        
-        print(f"Throughput: {len(successful_results) / total_time:.2f} req/s")
-        print(f"Tempo de resposta médio: {statistics.mean(response_times):.2f}ms")
-        print(f"Tempo de resposta mediano: {statistics.median(response_times):.2f}ms")
-        print(f"Tempo de resposta mín/máx: {min(response_times):.2f}ms / {max(response_times):.2f}ms")
-        
-        if processing_times and any(pt > 0 for pt in processing_times):
-            print(f"Tempo de processamento médio: {statistics.mean(processing_times):.2f}ms")
-    
-    if failed_results:
-        print(f"Erros:")
-        for error in failed_results[:5]:  # Mostrar apenas os primeiros 5 erros
-            print(f"  - {error['user_id']}: {error.get('error', 'Unknown error')}")
-
-async def test_api_health():
+    warmup = generator.args.warmup
+    stages = []
+    total_latency, total_success, total_service = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    total_statuses: Counter = Counter()
+    elapsed = 0.0
+    for stage in generator.stages:
+        measured = max(0.0, min(stage.duration, elapsed + stage.duration - warmup))
+        elapsed += stage.duration
+        stages.append(stage_report(stage, measured))
+        total_latency.merge(stage.latency)
+        total_success.merge(stage.success_latency)
+        total_service.merge(stage.service_time)
+        total_statuses.update(stage.statuses)
+    measured_total = max(0.0, elapsed - warmup)
+    ok = sum(count for status, count in total_statuses.items() if status.startswith("2"))
+    return {
+        "config": {
+            "url": generator.url,
+            "stages": [stage.label for stage in generator.stages],
+            "arrival": generator.args.arrival,
+            "warmup_s": warmup,
+            "timeout_s": generator.args.timeout
+        },
+        "stages": stages,
+        "total": {
+            "scheduled": sum(stage.scheduled for stage in generator.stages),
+            "succeeded": ok,
+            "failed": sum(total_statuses.values()) - ok,
+            "achieved_rps": round(ok / measured_total, 2) if measured_total > 0 else 0.0,
+            "statuses": dict(total_statuses),
+            "latency": total_latency.summary(),
+            "latency_2xx": total_success.summary(),
+            "service_time": total_service.summary()
+        },
+        "generator": {
+            "send_lag": generator.send_lag.summary(),
+            "max_inflight": generator.max_inflight_seen,
+            "dropped": generator.dropped
+        }
+    }
+
+def print_report(report: Dict[str, Any]):
+    columns = ["p50_ms", "p90_ms", "p99_ms", "p99.9_ms", "max_ms"]
+    header = f"{'estágio':<26} {'ok':>7} {'falhas':>7} {'rps':>8}  " + " ".join(f"{c[:-3]:>9}" for c in columns)
+    print("\nLatência corrigida (desde o envio agendado, todas as tentativas), ms")
+    print(header)
+    print("-" * len(header))
+    for row in report["stages"] + [dict(report["total"], stage="TOTAL")]:
+        latency = row["latency"]
+        print(
+            f"{row['stage']:<26} {row['succeeded']:>7} {row['failed']:>7} {row['achieved_rps']:>8.1f}  "
+            + " ".join(f"{latency[c]:>9.2f}" for c in columns)
+        )
+    success = report["total"]["latency_2xx"]
+    print("\nLatência corrigida só das respostas 2xx, ms: "
+          + ", ".join(f"{c[:-3]}={success[c]:.2f}" for c in columns))
+    service = report["total"]["service_time"]
+    print("Tempo de serviço das respostas 2xx (desde o envio efetivo, sem correção), ms: "
+          + ", ".join(f"{c[:-3]}={service[c]:.2f}" for c in columns))
+    print(f"Status: {report['total']['statuses']}")
+
+    generator = report["generator"]
+    print(f"Gerador: atraso de envio p99={generator['send_lag']['p99_ms']:.2f}ms, "
+          f"em voo máx={generator['max_inflight']}, descartadas={generator['dropped']}")
+    if generator["send_lag"]["p99_ms"] > 10:
+        print("⚠️  O gerador não acompanhou a taxa agendada; os resultados incluem atraso do cliente")
+
+async def check_health(url: str) -> bool:
     """
-    Testa se a API está funcionando
+    Testa se o alvo está respondendo
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{API_URL}/health") as response:
-                if response.status == 200:
-                    result = await response.json()
-                    print(f"API Health Check: ✓ {result}")
-                    return True
-                else:
-                    print(f"API Health Check: ✗ Status {response.status}")
-                    return False
-    except Exception as e:
-        print(f"API Health Check: ✗ Erro: {e}")
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.get(f"{url.rstrip('/')}/health")
+        print(f"Health check: {'✓' if response.status_code == 200 else '✗'} status {response.status_code}")
+        return response.status_code == 200
+    except httpx.HTTPError as e:
+        print(f"Health check: ✗ erro: {e}")
         return False
 
-async def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gerador de carga em malha aberta")
+    parser.add_argument("--target", choices=TARGETS, default="chronic", help="Serviço alvo")
+    parser.add_argument("--url", default=None, help="URL base (padrão conforme o alvo)")
+    parser.add_argument("--endpoint", default=None, help="Endpoint (padrão conforme o alvo)")
+    parser.add_argument("--rps", type=float, default=20.0, help="Taxa alvo (sem --stages)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Duração em segundos (sem --stages)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Rampa linear até --rps antes da duração")
+    parser.add_argument("--stages", default=None, help='Agendamento, ex.: "10-100:60,100:120"')
+    parser.add_argument("--arrival", choices=("constant", "poisson"), default="constant",
+                        help="Intervalos constantes ou chegadas de Poisson")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Segundos iniciais fora das métricas")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por requisição (s)")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--max-inflight", type=int, default=10000, help="Acima disso a requisição é descartada")
+    parser.add_argument("--patients", type=int, default=500, help="Pacientes distintos no ciclo de payloads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Arquivo de saída com o relatório")
+    args = parser.parse_args(argv)
+    args.url = args.url or TARGETS[args.target]["url"]
+    args.endpoint = args.endpoint or TARGETS[args.target]["endpoint"]
+    return args
+
+async def main(argv: Optional[List[str]] = None):
     """
-    Função principal dos testes
+    Função principal do teste de carga
     """
-    print("INICIANDO TESTES DE CONCORRÊNCIA")
+    args = parse_args(argv)
+    if args.stages:
+        stages = parse_stages(args.stages)
+    else:
+        stages = ([Stage(0.0, args.rps, args.ramp_up)] if args.ramp_up > 0 else []) + [
+            Stage(args.rps, args.rps, args.duration)
+        ]
+
+    print("TESTE DE CARGA EM MALHA ABERTA")
     print("=" * 50)
-    
-    # Verificar se a API está funcionando
-    if not await test_api_health():
+    print(f"Alvo: {args.url}{args.endpoint}")
+    print(f"Estágios: {', '.join(stage.label for stage in stages)} ({args.arrival})")
+    if not await check_health(args.url):
         print("❌ API não está respondendo. Verifique se está rodando.")
-        return
-    
-    # Aguardar um pouco para a API estar pronta
-    await asyncio.sleep(2)
-    
-    # Executar testes
-    print(f"\nTestando com {NUM_REQUESTS} requisições...")
-    
-    # Teste sequencial (baseline)
-    test_sequential_requests()
-    
-    # Teste concorrente síncrono
-    test_sync_concurrent_requests()
-    
-    # Teste concorrente assíncrono
-    await test_async_concurrent_requests()
-    
-    print("\n" + "=" * 50)
-    print("TESTES CONCLUÍDOS")
-    print("=" * 50)
+        sys.exit(1)
+
+    generator = LoadGenerator(args, stages)
+    await generator.run()
+    report = build_report(generator)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRelatório salvo em: {args.json}")
+
+def test_ramp_arrival_count():
+    """Rampa 0->100 rps em 10s: ~500 chegadas (Λ(10)) nos dois modos, concentradas no fim"""
+    stage = Stage(0.0, 100.0, 10.0)
+    assert len(list(stage.arrival_offsets(False, random.Random(0)))) == 499
+    for seed in range(5):
+        offsets = list(stage.arrival_offsets(True, random.Random(seed)))
+        # Contagem de Poisson com média 500 (desvio padrão ~22)
+        assert abs(len(offsets) - 500) < 90
+        assert offsets == sorted(offsets) and offsets[-1] < stage.duration
+        # Λ(5)/Λ(10) = 1/4 das chegadas na primeira metade da rampa
+        assert abs(sum(t < 5.0 for t in offsets) / len(offsets) - 0.25) < 0.08
 
 if __name__ == "__main__":
     asyncio.run(main())
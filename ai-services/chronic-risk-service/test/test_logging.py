@@ -0,0 +1,50 @@
+"""
+Testes do modo structured: registros enviados pela fila e escritos em JSON
+"""
+
+import io
+import json
+import logging
+import logging.handlers
+import queue
+
+from app.core.logging_config import DroppingQueueHandler, JsonFormatter
+
+def log_through_queue(emit) -> dict:
+    """Registra pelo DroppingQueueHandler e devolve a linha JSON escrita pela thread de escrita"""
+    handler = DroppingQueueHandler(queue.Queue(maxsize=10))
+    output = io.StringIO()
+    stream_handler = logging.StreamHandler(output)
+    stream_handler.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(handler.queue, stream_handler)
+    logger = logging.getLogger("test.structured")
+    logger.addHandler(handler)
+    logger.propagate = False
+    listener.start()
+    try:
+        emit(logger)
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+    return json.loads(output.getvalue())
+
+def test_exception_traceback_in_queue_mode():
+    """logger.exception mantém o traceback no campo exc, fora da mensagem"""
+    def emit(logger):
+        try:
+            raise ValueError("falha no modelo")
+        except ValueError:
+            logger.exception("Erro na predição %s", "req-1", extra={"user_id": "u1"})
+
+    line = log_through_queue(emit)
+    assert line["msg"] == "Erro na predição req-1"
+    assert line["user_id"] == "u1"
+    assert line["exc"].startswith("Traceback")
+    assert "ValueError: falha no modelo" in line["exc"]
+
+def test_record_without_exception():
+    """Sem exceção, nenhum campo exc"""
+    line = log_through_queue(lambda logger: logger.warning("fila %d", 3))
+    assert line["msg"] == "fila 3"
+    assert line["level"] == "WARNING"
+    assert "exc" not in line
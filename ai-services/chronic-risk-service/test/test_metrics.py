@@ -0,0 +1,66 @@
+"""
+Testes das métricas de runtime e do diretório multiprocesso do modo pre-fork
+"""
+
+import os
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.config import MODEL_PATH
+from app.core.metrics import RuntimeStatsCollector
+from app.core.model_manager import model_manager
+from app.prefork import _configure_metrics_dir
+
+STATS = {"batcher": {"queue_depth": 3, "batches": 7}, "cache": {"hits": 2}}
+
+def samples(collector):
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in collector.collect() for sample in family.samples
+    }
+
+def model_counts():
+    return (
+        REGISTRY.get_sample_value("chronic_risk_model_batch_rows_count"),
+        REGISTRY.get_sample_value("chronic_risk_stage_duration_seconds_count", {"stage": "predict_proba"})
+    )
+
+def test_runtime_stats_without_worker_label():
+    """Processo único: métricas sem labels"""
+    collected = samples(RuntimeStatsCollector(lambda: STATS))
+    assert collected[("chronic_risk_batcher_queue_depth", ())] == 3
+    assert collected[("chronic_risk_batcher_batches_total", ())] == 7
+    assert collected[("chronic_risk_cache_hits_total", ())] == 2
+
+def test_runtime_stats_with_worker_label():
+    """Pre-fork: cada série leva o pid do worker que respondeu"""
+    collected = samples(RuntimeStatsCollector(lambda: STATS, worker="1234"))
+    assert collected[("chronic_risk_batcher_queue_depth", (("worker", "1234"),))] == 3
+    assert collected[("chronic_risk_cache_hits_total", (("worker", "1234"),))] == 2
+
+def test_metrics_dir_is_cleared(tmp_path, monkeypatch):
+    """Arquivos de execuções anteriores são removidos antes do fork"""
+    (tmp_path / "counter_1.db").write_bytes(b"stale")
+    (tmp_path / "notes.txt").write_text("mantido")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    assert _configure_metrics_dir() == str(tmp_path)
+    assert sorted(os.listdir(tmp_path)) == ["notes.txt"]
+
+def test_metrics_dir_created_when_unset(monkeypatch):
+    """Sem PROMETHEUS_MULTIPROC_DIR, um diretório temporário é criado"""
+    # Vazio equivale a ausente; setenv restaura o ambiente ao final do teste
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", "")
+    metrics_dir = _configure_metrics_dir()
+    assert os.path.isdir(metrics_dir)
+    assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == metrics_dir
+    os.rmdir(metrics_dir)
+
+@pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason="modelo treinado ausente")
+def test_reload_warm_up_is_not_recorded():
+    """O warm-up de um reload não entra nos histogramas de produção"""
+    model_manager.load_model()
+    before = model_counts()
+    model_manager.reload_model()
+    assert model_counts() == before
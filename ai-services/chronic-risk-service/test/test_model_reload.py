@@ -0,0 +1,62 @@
+"""
+Reloads sem caminho e monitoramento quando o .mmap ao lado do joblib é servido
+"""
+
+import os
+import shutil
+
+import joblib
+import pytest
+
+from app.core import model_manager as manager_module
+from app.core.artifact import export_model_artifact
+from app.core.config import MODEL_PATH
+from app.core.model_manager import model_manager
+from app.core.model_watcher import _artifact_mtimes
+
+pytestmark = pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason="modelo treinado ausente")
+
+@pytest.fixture
+def joblib_with_mmap(tmp_path, monkeypatch):
+    """Cópia do modelo com o artefato .mmap exportado ao lado; restaura o modelo padrão ao final"""
+    monkeypatch.setattr(manager_module, "MODEL_ARTIFACT_FORMAT", "auto")
+    model_path = str(tmp_path / "model.joblib")
+    shutil.copyfile(MODEL_PATH, model_path)
+    export_model_artifact(joblib.load(model_path), str(tmp_path / "model.mmap"))
+    # Exportado depois do treino, como faz o compile_model.py
+    stamp = os.path.getmtime(model_path)
+    os.utime(tmp_path / "model.mmap" / "manifest.json", (stamp + 10, stamp + 10))
+    yield model_path
+    model_manager.reload_model(MODEL_PATH)
+
+def retrain(model_path: str):
+    """Simula um novo treino: joblib mais recente que o .mmap exportado"""
+    stamp = os.path.getmtime(model_path) + 60
+    os.utime(model_path, (stamp, stamp))
+
+def test_reload_follows_source_joblib(joblib_with_mmap):
+    """Reload sem caminho parte do joblib e ignora o .mmap desatualizado"""
+    snapshot = model_manager.reload_model(joblib_with_mmap)
+    assert snapshot.artifact_format == "mmap"
+    assert snapshot.source_path == joblib_with_mmap
+
+    retrain(joblib_with_mmap)
+    snapshot = model_manager.reload_model()
+    assert snapshot.artifact_format == "joblib"
+    assert snapshot.model_path == snapshot.source_path == joblib_with_mmap
+
+def test_watcher_sees_retrained_joblib(joblib_with_mmap):
+    """O monitoramento detecta um joblib re-treinado mesmo servindo o .mmap"""
+    model_manager.reload_model(joblib_with_mmap)
+    before = _artifact_mtimes(model_manager)
+    retrain(joblib_with_mmap)
+    assert _artifact_mtimes(model_manager) != before
+
+def test_stale_mmap_rejected_in_mmap_mode(joblib_with_mmap, monkeypatch):
+    """Com MODEL_ARTIFACT_FORMAT=mmap um .mmap desatualizado é recusado e o modelo atual continua"""
+    current = model_manager.reload_model(joblib_with_mmap)
+    retrain(joblib_with_mmap)
+    monkeypatch.setattr(manager_module, "MODEL_ARTIFACT_FORMAT", "mmap")
+    with pytest.raises(ValueError):
+        model_manager.reload_model()
+    assert model_manager.get_snapshot() is current
@@ -0,0 +1,97 @@
+"""
+Testes do endpoint /predict_risk_batch e da validação em lote
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.validation import validate_patient_batch
+
+PATIENT = {
+    "user_id": "patient_ok",
+    "age": 50,
+    "gender": 2,
+    "height": 175,
+    "weight": 80.0,
+    "ap_hi": 130,
+    "ap_lo": 85,
+    "cholesterol": 2,
+    "gluc": 1,
+    "smoke": 0,
+    "alco": 0,
+    "active": 1
+}
+
+@pytest.fixture(scope="module")
+def client():
+    """Cliente com o ciclo de vida completo da aplicação (modelo carregado)"""
+    with TestClient(app) as client:
+        yield client
+
+def test_validate_patient_batch_separates_errors():
+    """Registros válidos e erros por linha, com o índice original"""
+    patients = [
+        PATIENT,
+        {**PATIENT, "user_id": "missing_age", "age": None},
+        {**PATIENT, "user_id": "bad_pressure", "ap_hi": 80, "ap_lo": 90},
+        {"user_id": "empty"},
+        {**PATIENT, "user_id": "second_ok"}
+    ]
+    valid, errors = validate_patient_batch(patients)
+
+    assert [index for index, _ in valid] == [0, 4]
+    assert [patient.user_id for _, patient in valid] == ["patient_ok", "second_ok"]
+    assert sorted(errors) == [1, 2, 3]
+    assert errors[1].startswith("age: ")
+    assert errors[2] == "Pressão sistólica deve ser maior que diastólica"
+    assert "height: Field required" in errors[3]
+
+def test_validate_patient_batch_all_valid():
+    """Lote sem erros"""
+    valid, errors = validate_patient_batch([PATIENT, PATIENT])
+    assert len(valid) == 2
+    assert errors == {}
+
+def test_batch_per_row_errors(client):
+    """Linhas inválidas viram itens com success=False; as demais são previstas"""
+    response = client.post("/predict_risk_batch", json={"patients": [
+        PATIENT,
+        {**PATIENT, "user_id": "too_young", "age": 10},
+        {**PATIENT, "user_id": "bad_pressure", "ap_hi": 80, "ap_lo": 90},
+        {"user_id": 42}
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert (body["total"], body["succeeded"], body["failed"]) == (4, 1, 3)
+    results = body["results"]
+    assert [item["index"] for item in results] == [0, 1, 2, 3]
+    assert [item["user_id"] for item in results] == ["patient_ok", "too_young", "bad_pressure", "42"]
+    assert results[0]["success"] and results[0]["prediction"]["user_id"] == "patient_ok"
+    # A mesma linha no /predict_risk seria um 422 (faixa do schema)
+    assert client.post("/predict_risk", json={**PATIENT, "age": 10}).status_code == 422
+    assert not results[1]["success"] and results[1]["error"].startswith("age: ")
+    assert results[2]["error"] == "Pressão sistólica deve ser maior que diastólica"
+    assert all(item["prediction"] is None for item in results[1:])
+
+def test_batch_matches_single_prediction(client):
+    """O lote produz o mesmo score que /predict_risk para o mesmo paciente"""
+    single = client.post("/predict_risk", json=PATIENT).json()
+    batch = client.post("/predict_risk_batch", json={"patients": [PATIENT]}).json()
+    prediction = batch["results"][0]["prediction"]
+
+    assert prediction["chronic_risk_score"] == pytest.approx(single["chronic_risk_score"])
+    assert prediction["risk_level"] == single["risk_level"]
+
+def test_batch_size_limits(client):
+    """Lote vazio ou acima de 5000 pacientes é recusado por inteiro"""
+    assert client.post("/predict_risk_batch", json={"patients": []}).status_code == 422
+    oversized = {"patients": [PATIENT] * 5001}
+    assert client.post("/predict_risk_batch", json=oversized).status_code == 422
+    assert client.post("/predict_risk_batch", json={"patients": [PATIENT] * 5000}).status_code == 200
+
+def test_batch_rejects_non_object_rows(client):
+    """Uma linha que não é objeto invalida o formato da requisição"""
+    response = client.post("/predict_risk_batch", json={"patients": [PATIENT, "not a patient"]})
+    assert response.status_code == 422
@@ -34,6 +34,13 @@ from sklearn.metrics import (
 import xgboost as xgb
 import lightgbm as lgb
 
+# Engenharia de features compartilhada com o serviço de predição
+from app.core.features import (
+    NUMERIC_FEATURES, CATEGORICAL_FEATURES, age_in_years, compute_bmi, engineer_features
+)
+from app.core.compiled_scorer import export_compiled_model
+from app.core.artifact import export_model_artifact
+
 # Interpretabilidade
 try:
     import shap
@@ -124,11 +131,11 @@ class CardiacRiskModelPipeline:
         print("✓ Coluna 'id' removida")
         
         # 2. Converter idade de dias para anos
-        df['age'] = (df['age'] / 365.25).astype(int)
+        df['age'] = age_in_years(df['age'])
         print("✓ Idade convertida para anos")
         
         # 3. Calcular BMI
-        df['bmi'] = df['weight'] / ((df['height'] / 100) ** 2)
+        df['bmi'] = compute_bmi(df['weight'], df['height'])
         print("✓ BMI calculado")
         
         # 4. Limpeza específica - Pressão arterial inválida
@@ -187,57 +194,10 @@ class CardiacRiskModelPipeline:
         
         df = self.df_clean.copy()
         
-        # 1. Categorias de BMI baseadas em padrões médicos
-        def categorize_bmi(bmi):
-            if bmi < 18.5:
-                return 'Underweight'
-            elif bmi < 25:
-                return 'Normal'
-            elif bmi < 30:
-                return 'Overweight'
-            else:
-                return 'Obese'
-        
-        df['bmi_category'] = df['bmi'].apply(categorize_bmi)
-        print("✓ Categorias de BMI criadas")
-        
-        # 2. Categorias de Pressão Arterial (American Heart Association)
-        def categorize_blood_pressure(systolic, diastolic):
-            if systolic < 120 and diastolic < 80:
-                return 'Normal'
-            elif systolic < 130 and diastolic < 80:
-                return 'Elevated'
-            elif (systolic >= 130 and systolic < 140) or (diastolic >= 80 and diastolic < 90):
-                return 'Stage1_Hypertension'
-            elif systolic >= 140 or diastolic >= 90:
-                return 'Stage2_Hypertension'
-            else:
-                return 'Hypertensive_Crisis'
-        
-        df['bp_category'] = df.apply(lambda x: categorize_blood_pressure(x['ap_hi'], x['ap_lo']), axis=1)
-        print("✓ Categorias de pressão arterial criadas")
-        
-        # 3. Features de interação clinicamente relevantes
-        df['age_cholesterol_interaction'] = df['age'] * df['cholesterol']
-        df['bmi_age_interaction'] = df['bmi'] * df['age']
-        df['pressure_pulse'] = df['ap_hi'] - df['ap_lo']  # Pressão de pulso
-        print("✓ Features de interação criadas")
-        
-        # 4. Lifestyle score (combinação de fatores de estilo de vida)
-        df['lifestyle_score'] = df['smoke'] + df['alco'] - df['active']
-        print("✓ Score de estilo de vida criado")
-        
-        # 5. Categorização de idade
-        def categorize_age(age):
-            if age < 40:
-                return 'Young'
-            elif age < 55:
-                return 'Middle_aged'
-            else:
-                return 'Senior'
-        
-        df['age_category'] = df['age'].apply(categorize_age)
-        print("✓ Categorias de idade criadas")
+        # Implementação vetorizada compartilhada com o serviço (app/core/features.py)
+        df = engineer_features(df)
+        print("✓ Categorias de BMI, pressão arterial e idade criadas")
+        print("✓ Features de interação e score de estilo de vida criados")
         
         print(f"\n📊 Features finais: {df.shape[1]} colunas")
         print(f"  Features categóricas criadas: bmi_category, bp_category, age_category")
@@ -254,14 +214,9 @@ class CardiacRiskModelPipeline:
         print("-" * 40)
         
         # Separar features numéricas e categóricas
-        numeric_features = [
-            'age', 'gender', 'height', 'weight', 'ap_hi', 'ap_lo',
-            'cholesterol', 'gluc', 'smoke', 'alco', 'active', 'bmi',
-            'age_cholesterol_interaction', 'bmi_age_interaction', 
-            'pressure_pulse', 'lifestyle_score'
-        ]
+        numeric_features = list(NUMERIC_FEATURES)
         
-        categorical_features = ['bmi_category', 'bp_category', 'age_category']
+        categorical_features = list(CATEGORICAL_FEATURES)
         
         print(f"✓ Features numéricas ({len(numeric_features)}): {numeric_features}")
         print(f"✓ Features categóricas ({len(categorical_features)}): {categorical_features}")
@@ -561,6 +516,13 @@ class CardiacRiskModelPipeline:
         joblib.dump(self.best_model, model_path)
         print(f"✓ Modelo salvo em: {model_path}")
         
+        # Scorer compilado (apenas LightGBM) para predições de baixa latência
+        if isinstance(self.best_model.named_steps['classifier'], lgb.LGBMClassifier):
+            compiled_path = export_compiled_model(
+                self.best_model, 'models/cardiac_risck_model_v2.compiled.npz'
+            )
+            print(f"✓ Scorer compilado salvo em: {compiled_path}")
+        
         # Salvar pipeline de pré-processamento separadamente
         pipeline_path = 'models/preprocessing_pipeline.joblib'
         joblib.dump(self.preprocessing_pipeline, pipeline_path)
@@ -569,6 +531,7 @@ class CardiacRiskModelPipeline:
         # Salvar metadados
         metadata = {
             'model_name': self.best_model_name,
+            'model_version': datetime.now().strftime('%Y%m%d%H%M%S'),
             'final_metrics': self.final_metrics,
             'cv_results': self.cv_results,
             'training_date': datetime.now().isoformat(),
@@ -580,6 +543,13 @@ class CardiacRiskModelPipeline:
         joblib.dump(metadata, metadata_path)
         print(f"✓ Metadados salvos em: {metadata_path}")
         
+        # Artefato mapeável em memória (apenas LightGBM): carga sem desserializar o pipeline
+        if isinstance(self.best_model.named_steps['classifier'], lgb.LGBMClassifier):
+            artifact_dir = export_model_artifact(
+                self.best_model, 'models/cardiac_risck_model_v2.mmap', metadata
+            )
+            print(f"✓ Artefato mapeável salvo em: {artifact_dir}")
+        
         return model_path
     
     def run_complete_pipeline(self) -> Dict:
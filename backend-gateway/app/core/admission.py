@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from collections import Counter, deque
+from typing import Dict, Any
+
+from fastapi import HTTPException
+
+from app.core.config import MAX_IN_FLIGHT, MAX_QUEUE, QUEUE_TIMEOUT, RETRY_AFTER
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """
+    Requisição recusada pelo controle de admissão
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+class AdmissionController:
+    """
+    Limita as análises simultâneas enviadas aos agentes. Acima do limite as
+    requisições aguardam em uma fila FIFO limitada; fila cheia recusa na hora
+    (429) e espera acima de queue_timeout recusa com 503.
+    """
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, max_queue: int = MAX_QUEUE,
+                 queue_timeout: float = QUEUE_TIMEOUT):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self.max_queue_depth = 0
+        self.counters: Counter = Counter()
+
+    async def acquire(self):
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.counters["rejected_queue_full"] += 1
+            raise AdmissionRejected(429, "Gateway sobrecarregado: fila de análises cheia")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.counters["queued"] += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.counters["rejected_timeout"] += 1
+            raise AdmissionRejected(503, "Gateway sobrecarregado: tempo de espera na fila esgotado")
+        except asyncio.CancelledError:
+            # Vaga já repassada a este waiter: devolve para o próximo
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.counters["admitted"] += 1
+
+    def release(self):
+        # A vaga passa direto ao próximo da fila, sem decrementar in_flight
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            "max_queue_depth_seen": self.max_queue_depth,
+            "queue_timeout_s": self.queue_timeout,
+            **{name: self.counters[name] for name in
+               ("admitted", "queued", "rejected_queue_full", "rejected_timeout")}
+        }
+
+# Instância global
+admission = AdmissionController()
+
+async def admit():
+    """
+    Reserva uma vaga de análise, convertendo a recusa em 429/503 com Retry-After
+    """
+    try:
+        await admission.acquire()
+    except AdmissionRejected as e:
+        logger.warning(f"Requisição recusada pelo controle de admissão: {e.detail}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(RETRY_AFTER)}
+        )
+
+async def admitted(call):
+    """
+    Executa a chamada ocupando uma vaga de análise
+    """
+    await admit()
+    try:
+        return await call()
+    finally:
+        admission.release()
@@ -0,0 +1,109 @@
+import logging
+import math
+import time
+from collections import Counter, deque
+from typing import Optional, Dict, Any
+
+from app.core.config import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpen(Exception):
+    """
+    Chamada recusada pelo circuit breaker aberto
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"circuit breaker aberto (nova tentativa em {retry_after:.1f}s)")
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Circuit breaker de uma dependência: após failure_threshold falhas seguidas
+    abre e recusa na hora; passado reset_timeout deixa uma chamada de teste
+    (half_open), que fecha o circuito se tiver sucesso ou o reabre se falhar.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.counters: Counter = Counter()
+
+    def allow(self):
+        if self.state == "open":
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self.counters["rejected"] += 1
+                raise CircuitOpen(remaining)
+            self.state = "half_open"
+            self._probe_in_flight = False
+            logger.info(f"Circuit breaker {self.name}: half_open, testando a dependência")
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.counters["rejected"] += 1
+                raise CircuitOpen(self.reset_timeout)
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self.counters["successes"] += 1
+        self.consecutive_failures = 0
+        if self.state != "closed":
+            logger.info(f"Circuit breaker {self.name}: fechado")
+        self.state = "closed"
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.counters["failures"] += 1
+        self.consecutive_failures += 1
+        if self.state == "half_open" or (
+            self.state == "closed" and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+            self.counters["opened"] += 1
+            logger.warning(
+                f"Circuit breaker {self.name}: aberto após {self.consecutive_failures} falhas "
+                f"(nova tentativa em {self.reset_timeout}s)"
+            )
+
+    def abandon(self):
+        """
+        Chamada interrompida sem resultado: libera a vaga de teste do half_open
+        """
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_s": self.reset_timeout,
+            **{name: self.counters[name] for name in ("successes", "failures", "opened", "rejected")}
+        }
+
+class LatencyWindow:
+    """
+    Latências das últimas chamadas bem-sucedidas, para percentis e atraso do hedge
+    """
+
+    def __init__(self, size: int = 512):
+        self._samples: "deque[float]" = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)]
@@ -0,0 +1,51 @@
+"""
+Configuração do gateway via variáveis de ambiente
+"""
+
+import os
+
+# Cliente HTTP compartilhado: limites do pool, keep-alive e timeouts por etapa (s)
+HTTP_MAX_CONNECTIONS = int(os.getenv("GATEWAY_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("GATEWAY_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("GATEWAY_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("GATEWAY_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("GATEWAY_HTTP_READ_TIMEOUT", "30"))
+HTTP_WRITE_TIMEOUT = float(os.getenv("GATEWAY_HTTP_WRITE_TIMEOUT", "10"))
+HTTP_POOL_TIMEOUT = float(os.getenv("GATEWAY_HTTP_POOL_TIMEOUT", "5"))
+
+# Explicações pendentes: limite rígido de entradas, TTL (s) e intervalo da limpeza (s)
+PENDING_MAX_ENTRIES = int(os.getenv("GATEWAY_PENDING_MAX_ENTRIES", "10000"))
+PENDING_TTL = float(os.getenv("GATEWAY_PENDING_TTL", "90"))
+PENDING_SWEEP_INTERVAL = float(os.getenv("GATEWAY_PENDING_SWEEP_INTERVAL", "5"))
+EXPLANATION_TIMEOUT = float(os.getenv("GATEWAY_EXPLANATION_TIMEOUT", "60"))
+SSE_KEEPALIVE_INTERVAL = float(os.getenv("GATEWAY_SSE_KEEPALIVE_INTERVAL", "15"))
+# Caminho rápido: score direto do chronic-risk-service; explicação consultada depois
+CHRONIC_SERVICE_URL = os.getenv("CHRONIC_SERVICE_URL", "http://127.0.0.1:8002/predict_risk")
+RESULT_TTL = float(os.getenv("GATEWAY_RESULT_TTL", "300"))
+# Store de pendências: memory (uma réplica) ou redis (compartilhado entre réplicas)
+PENDING_BACKEND = os.getenv("GATEWAY_PENDING_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("GATEWAY_REDIS_URL", "redis://localhost:6379/0")
+REDIS_PREFIX = os.getenv("GATEWAY_REDIS_PREFIX", "heartpredict:gateway")
+# Requisições idênticas simultâneas compartilham a mesma chamada aos agentes
+DEDUP_ENABLED = os.getenv("GATEWAY_DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Controle de admissão: análises simultâneas, fila de espera, espera máxima (s) e Retry-After (s)
+MAX_IN_FLIGHT = int(os.getenv("GATEWAY_MAX_IN_FLIGHT", "200"))
+MAX_QUEUE = int(os.getenv("GATEWAY_MAX_QUEUE", "100"))
+QUEUE_TIMEOUT = float(os.getenv("GATEWAY_QUEUE_TIMEOUT", "5"))
+RETRY_AFTER = int(os.getenv("GATEWAY_RETRY_AFTER", "5"))
+# Envio em lote: pacientes por requisição e pacientes processados simultaneamente
+BULK_MAX_PATIENTS = int(os.getenv("GATEWAY_BULK_MAX_PATIENTS", "1000"))
+BULK_CONCURRENCY = int(os.getenv("GATEWAY_BULK_CONCURRENCY", "16"))
+# Chamadas ao agente JADE: timeout por tentativa (s) e circuit breaker
+JADE_TIMEOUT = float(os.getenv("GATEWAY_JADE_TIMEOUT", "30"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("GATEWAY_BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("GATEWAY_BREAKER_RESET_TIMEOUT", "10"))
+# Hedging: segunda tentativa quando a primeira passa do percentil de latência
+HEDGE_ENABLED = os.getenv("GATEWAY_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("GATEWAY_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = float(os.getenv("GATEWAY_HEDGE_MIN_DELAY", "0.05"))
+HEDGE_MIN_SAMPLES = int(os.getenv("GATEWAY_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MAX_RATIO = float(os.getenv("GATEWAY_HEDGE_MAX_RATIO", "0.1"))
+
+# URL do AgenteGerenciadorPacientes
+JADE_AGENT_URL = os.getenv("JADE_AGENT_URL", "http://localhost:8888/registrar")
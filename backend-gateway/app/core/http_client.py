@@ -0,0 +1,154 @@
+"""
+Cliente HTTP compartilhado pelo gateway, criado no startup da aplicação
+"""
+
+import logging
+from typing import Optional, Dict, Any
+
+import httpx
+
+from app.core.config import (
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_WRITE_TIMEOUT, HTTP_POOL_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+class TrackedStream(httpx.AsyncByteStream):
+    """
+    Corpo da resposta que avisa uma única vez quando é fechado (lido por
+    inteiro, descartado ou interrompido por erro)
+    """
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            on_close, self._on_close = self._on_close, None
+            if on_close is not None:
+                on_close()
+
+class CountingTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte que conta as requisições em andamento, da espera por uma conexão
+    até o fechamento da resposta, usando só a API pública do httpx
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+        self.sent = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.sent += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            self._finished()
+            raise
+        if response.is_closed:
+            # Corpo já lido pelo transporte: a conexão não está mais ocupada
+            self._finished()
+        else:
+            response.stream = TrackedStream(response.stream, self._finished)
+        return response
+
+    def _finished(self):
+        self.in_flight -= 1
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+http_client: Optional[httpx.AsyncClient] = None
+http_transport: Optional[CountingTransport] = None
+
+def http_limits() -> httpx.Limits:
+    """
+    Limites do pool de conexões configurados pelo ambiente
+    """
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+
+def create_http_transport() -> CountingTransport:
+    """
+    Pool de conexões com os limites configurados, com contagem de requisições
+    """
+    return CountingTransport(httpx.AsyncHTTPTransport(limits=http_limits()))
+
+def create_http_client(transport: httpx.AsyncBaseTransport) -> httpx.AsyncClient:
+    """
+    Cliente HTTP de longa duração, reaproveitando conexões entre requisições
+    """
+    return httpx.AsyncClient(
+        transport=transport,
+        # Limites também para os transportes de proxy configurados pelo ambiente
+        limits=http_limits(),
+        timeout=httpx.Timeout(
+            connect=HTTP_CONNECT_TIMEOUT,
+            read=HTTP_READ_TIMEOUT,
+            write=HTTP_WRITE_TIMEOUT,
+            pool=HTTP_POOL_TIMEOUT
+        )
+    )
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Cliente HTTP compartilhado (criado no startup da aplicação)
+    """
+    if http_client is None:
+        raise RuntimeError("Cliente HTTP não inicializado")
+    return http_client
+
+def get_http_pool_stats() -> Dict[str, Any]:
+    """
+    Estado do pool de conexões do cliente compartilhado
+    """
+    in_flight = http_transport.in_flight if http_transport is not None else 0
+    return {
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": HTTP_MAX_KEEPALIVE,
+        "keepalive_expiry_s": HTTP_KEEPALIVE_EXPIRY,
+        "requests_sent": http_transport.sent if http_transport is not None else 0,
+        "in_flight_requests": in_flight,
+        "max_in_flight_requests": http_transport.max_in_flight if http_transport is not None else 0,
+        # HTTP/1.1: cada requisição ocupa uma conexão; acima de max_connections
+        # as demais aguardam uma conexão livre na fila do pool
+        "active_connections": min(in_flight, HTTP_MAX_CONNECTIONS),
+        "queued_requests": max(0, in_flight - HTTP_MAX_CONNECTIONS)
+    }
+
+def start_http_client():
+    """
+    Cria o cliente compartilhado (startup)
+    """
+    global http_client, http_transport
+    http_transport = create_http_transport()
+    http_client = create_http_client(http_transport)
+    logger.info(
+        f"Cliente HTTP criado (max_connections={HTTP_MAX_CONNECTIONS}, "
+        f"keepalive={HTTP_MAX_KEEPALIVE}, expiry={HTTP_KEEPALIVE_EXPIRY}s)"
+    )
+
+async def close_http_client():
+    """
+    Fecha o cliente compartilhado e suas conexões (shutdown)
+    """
+    global http_client, http_transport
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+        http_transport = None
@@ -0,0 +1,152 @@
+"""
+Envio dos pacientes ao AgenteGerenciadorPacientes (JADE), protegido por
+circuit breaker e com hedging opcional
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import Counter
+from typing import Optional, Dict, Any
+
+import httpx
+from fastapi import HTTPException
+
+from app.core.config import (
+    HTTP_CONNECT_TIMEOUT, HTTP_POOL_TIMEOUT, JADE_AGENT_URL, JADE_TIMEOUT,
+    HEDGE_ENABLED, HEDGE_PERCENTILE, HEDGE_MIN_DELAY, HEDGE_MIN_SAMPLES, HEDGE_MAX_RATIO
+)
+from app.core.breaker import CircuitOpen, CircuitBreaker, LatencyWindow
+from app.core.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Instâncias globais
+jade_breaker = CircuitBreaker("jade_agent")
+jade_latency = LatencyWindow()
+jade_counters: Counter = Counter()
+
+def hedge_delay() -> Optional[float]:
+    """
+    Atraso até a tentativa extra, ou None quando o hedge não se aplica
+    (desativado, amostras insuficientes ou orçamento de hedges esgotado)
+    """
+    if not HEDGE_ENABLED or len(jade_latency) < HEDGE_MIN_SAMPLES:
+        return None
+    if jade_counters["hedges_sent"] >= HEDGE_MAX_RATIO * jade_counters["calls"]:
+        return None
+    return max(HEDGE_MIN_DELAY, jade_latency.percentile(HEDGE_PERCENTILE))
+
+def get_jade_stats() -> Dict[str, Any]:
+    """
+    Circuit breaker, latência e hedging das chamadas ao agente JADE
+    """
+    delay = hedge_delay()
+    percentiles = {
+        f"p{p}_ms": round(value * 1000, 2) if value is not None else None
+        for p, value in ((p, jade_latency.percentile(p)) for p in (50, 95, 99))
+    }
+    return {
+        "url": JADE_AGENT_URL,
+        "timeout_s": JADE_TIMEOUT,
+        "breaker": jade_breaker.stats(),
+        "latency": {"samples": len(jade_latency), **percentiles},
+        "hedging": {
+            "enabled": HEDGE_ENABLED,
+            "percentile": HEDGE_PERCENTILE,
+            "current_delay_ms": round(delay * 1000, 2) if delay is not None else None,
+            "calls": jade_counters["calls"],
+            "hedges_sent": jade_counters["hedges_sent"],
+            "hedge_wins": jade_counters["hedge_wins"]
+        }
+    }
+
+async def post_to_jade_agent(chronic_service_data: Dict[str, Any]) -> httpx.Response:
+    """
+    Uma tentativa de envio ao agente JADE, com timeout próprio
+    """
+    return await get_http_client().post(
+        JADE_AGENT_URL,
+        json=chronic_service_data,
+        headers={"Content-Type": "application/json"},
+        timeout=httpx.Timeout(JADE_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_POOL_TIMEOUT)
+    )
+
+async def post_to_jade_agent_hedged(chronic_service_data: Dict[str, Any]) -> httpx.Response:
+    """
+    Envia ao agente JADE; se a resposta demorar mais que o percentil configurado,
+    dispara uma segunda tentativa idêntica e usa a que responder primeiro. As
+    duas levam o mesmo request_id, deduplicado pelo AgenteGerenciadorPacientes.
+    """
+    delay = hedge_delay()
+    if delay is None:
+        return await post_to_jade_agent(chronic_service_data)
+
+    primary = asyncio.ensure_future(post_to_jade_agent(chronic_service_data))
+    attempts = {primary}
+    try:
+        done, _ = await asyncio.wait(attempts, timeout=delay)
+        if done:
+            return primary.result()
+        jade_counters["hedges_sent"] += 1
+        hedge = asyncio.ensure_future(post_to_jade_agent(chronic_service_data))
+        attempts.add(hedge)
+        error: Optional[BaseException] = None
+        while attempts:
+            done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        jade_counters["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in attempts:
+            task.cancel()
+
+async def send_to_jade_agent(chronic_service_data: Dict[str, Any]):
+    """
+    Envia dados para o AgenteGerenciadorPacientes, protegido pelo circuit breaker
+    """
+    logger.info(f"Enviando dados para JADE Agent: {chronic_service_data}")
+    try:
+        jade_breaker.allow()
+    except CircuitOpen as e:
+        logger.warning(f"Envio ao JADE Agent recusado: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço de análise temporariamente indisponível (circuit breaker aberto)",
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+
+    jade_counters["calls"] += 1
+    start = time.monotonic()
+    try:
+        response = await post_to_jade_agent_hedged(chronic_service_data)
+    except httpx.RequestError:
+        jade_breaker.record_failure()
+        raise
+    except BaseException:
+        # Cliente desconectou ou erro inesperado: não diz nada sobre a saúde
+        # do agente, mas a vaga de teste do half_open precisa ser liberada
+        jade_breaker.abandon()
+        raise
+
+    if response.is_success:
+        jade_breaker.record_success()
+        jade_latency.record(time.monotonic() - start)
+    elif response.status_code >= 500:
+        jade_breaker.record_failure()
+    else:
+        # O agente respondeu, mas recusou este pedido: não é sucesso nem falha
+        jade_breaker.abandon()
+
+    if not response.is_success:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro na comunicação com JADE Agent: {response.status_code}"
+        )
+
+    logger.info("Dados enviados com sucesso para JADE Agent")
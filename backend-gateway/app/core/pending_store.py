@@ -0,0 +1,566 @@
+"""
+Store das explicações pendentes: em memória (uma réplica) ou no Redis
+(compartilhado entre réplicas do gateway)
+"""
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Optional, List, Dict, Any
+
+from app.core.config import (
+    HTTP_CONNECT_TIMEOUT, PENDING_MAX_ENTRIES, PENDING_TTL, RESULT_TTL,
+    PENDING_BACKEND, REDIS_URL, REDIS_PREFIX
+)
+
+logger = logging.getLogger(__name__)
+
+class PendingStoreFull(Exception):
+    """
+    Limite de explicações pendentes atingido
+    """
+
+class PendingStore(ABC):
+    """
+    Interface do store de explicações pendentes. A Future e a fila de eventos
+    de cada requisição vivem na réplica que a recebeu; explicações e eventos
+    chegam por resolve/publish em qualquer réplica e são entregues à dona.
+    """
+
+    async def start(self):
+        """
+        Inicializa conexões e assinaturas (chamado no startup)
+        """
+
+    async def close(self):
+        """
+        Libera conexões e assinaturas (chamado no shutdown)
+        """
+
+    @abstractmethod
+    async def register(self, request_id: str, user_id: str, stream: bool = False,
+                       detached: bool = False) -> asyncio.Future:
+        """
+        Registra a espera antes do envio ao agente e devolve a Future local
+        """
+
+    @abstractmethod
+    async def resolve(self, request_id: str, explanation: str) -> bool:
+        """
+        Entrega a explicação à requisição correspondente
+        """
+
+    @abstractmethod
+    async def resolve_user(self, user_id: str, explanation: str) -> bool:
+        """
+        Entrega a explicação à requisição pendente mais antiga do usuário
+        """
+
+    @abstractmethod
+    async def publish(self, request_id: str, stage: str, data: Dict[str, Any]) -> bool:
+        """
+        Encaminha um evento de progresso à requisição em streaming
+        """
+
+    @abstractmethod
+    def events(self, request_id: str) -> Optional[asyncio.Queue]:
+        """
+        Fila local de eventos de progresso da requisição
+        """
+
+    @abstractmethod
+    async def complete(self, request_id: str, status: str, explanation: Optional[str] = None):
+        """
+        Encerra uma entrada desacoplada, guardando o resultado para consulta
+        """
+
+    @abstractmethod
+    async def release(self, request_id: str):
+        """
+        Remove a entrada quando a requisição termina (com ou sem explicação)
+        """
+
+    @abstractmethod
+    async def lookup(self, request_id: str, wait: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        Estado de uma requisição (user_id, status, explanation), aguardando até
+        wait segundos enquanto pendente; None quando desconhecida
+        """
+
+    @abstractmethod
+    async def evict_expired(self) -> int:
+        """
+        Remove entradas mais antigas que o TTL
+        """
+
+    @abstractmethod
+    async def pending(self) -> List[Dict[str, Any]]:
+        """
+        Requisições aguardando nesta réplica
+        """
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Tamanho e contadores do store
+        """
+
+class InMemoryPendingStore(PendingStore):
+    """
+    Requisições aguardando explicação, indexadas pelo request_id de correlação
+    enviado aos agentes JADE. Cada requisição tem sua própria Future; entradas
+    mais antigas que o TTL são removidas e o total é limitado a max_entries.
+    Entradas desacopladas (caminho rápido) não têm ninguém aguardando: ao
+    terminar, o resultado fica disponível para consulta por result_ttl.
+    Atende uma única réplica; também guarda as esperas locais do RedisPendingStore.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = PENDING_MAX_ENTRIES, ttl: float = PENDING_TTL,
+                 result_ttl: float = RESULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.result_ttl = result_ttl
+        # Ordem de inserção = ordem de idade (a limpeza percorre a partir do início)
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._by_user: Dict[str, List[str]] = {}
+        self.counters: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._entries
+
+    def unresolved(self) -> List[str]:
+        """
+        request_ids que ainda aguardam a explicação
+        """
+        return [request_id for request_id, entry in self._entries.items() if not entry["future"].done()]
+
+    async def register(self, request_id: str, user_id: str, stream: bool = False,
+                       detached: bool = False) -> asyncio.Future:
+        """
+        Registra a espera antes do envio ao agente, para que uma resposta rápida
+        do explicador não se perca; com stream, a entrada também recebe os
+        eventos de progresso dos agentes (ex.: score disponível)
+        """
+        if len(self._entries) >= self.max_entries:
+            await self.evict_expired()
+        if len(self._entries) >= self.max_entries:
+            self.counters["rejected"] += 1
+            raise PendingStoreFull(f"{len(self._entries)} explicações pendentes (limite {self.max_entries})")
+        future = asyncio.get_running_loop().create_future()
+        # Evita o aviso de exceção não lida quando a entrada expira sem ninguém aguardando
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._entries[request_id] = {
+            "user_id": user_id,
+            "created_at": time.monotonic(),
+            "future": future,
+            "events": asyncio.Queue() if stream else None,
+            "detached": detached
+        }
+        self._by_user.setdefault(user_id, []).append(request_id)
+        self.counters["registered"] += 1
+        return future
+
+    def _remove(self, request_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.pop(request_id, None)
+        if entry is not None:
+            user_requests = self._by_user.get(entry["user_id"], [])
+            if request_id in user_requests:
+                user_requests.remove(request_id)
+            if not user_requests:
+                self._by_user.pop(entry["user_id"], None)
+        return entry
+
+    async def resolve(self, request_id: str, explanation: str) -> bool:
+        entry = self._entries.get(request_id)
+        if entry is None or entry["future"].done():
+            self.counters["orphaned"] += 1
+            return False
+        entry["future"].set_result(explanation)
+        self.counters["resolved"] += 1
+        if entry["detached"]:
+            await self.complete(request_id, "ready", explanation)
+        return True
+
+    async def resolve_user(self, user_id: str, explanation: str) -> bool:
+        """
+        Compatibilidade com agentes que não enviam request_id: entrega à
+        requisição pendente mais antiga do usuário
+        """
+        for request_id in self._by_user.get(user_id, []):
+            if not self._entries[request_id]["future"].done():
+                return await self.resolve(request_id, explanation)
+        self.counters["orphaned"] += 1
+        return False
+
+    async def publish(self, request_id: str, stage: str, data: Dict[str, Any]) -> bool:
+        entry = self._entries.get(request_id)
+        if entry is None or entry["events"] is None:
+            return False
+        entry["events"].put_nowait({"stage": stage, "data": data})
+        self.counters["events_published"] += 1
+        return True
+
+    def events(self, request_id: str) -> Optional[asyncio.Queue]:
+        entry = self._entries.get(request_id)
+        return entry["events"] if entry is not None else None
+
+    async def complete(self, request_id: str, status: str, explanation: Optional[str] = None):
+        entry = self._remove(request_id)
+        if entry is None:
+            return
+        if not entry["future"].done():
+            entry["future"].cancel()
+        self._results[request_id] = {
+            "user_id": entry["user_id"],
+            "status": status,
+            "explanation": explanation,
+            "completed_at": time.monotonic()
+        }
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    async def release(self, request_id: str):
+        entry = self._remove(request_id)
+        if entry is None:
+            return
+        # wait_for cancela a Future no timeout (ou quando o cliente desconecta)
+        if entry["future"].cancelled():
+            self.counters["timed_out"] += 1
+        elif not entry["future"].done():
+            entry["future"].cancel()
+
+    def _state(self, request_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(request_id)
+        if entry is not None:
+            return {"user_id": entry["user_id"], "status": "pending", "explanation": None}
+        result = self._results.get(request_id)
+        if result is None:
+            return None
+        return {"user_id": result["user_id"], "status": result["status"], "explanation": result["explanation"]}
+
+    async def lookup(self, request_id: str, wait: float = 0.0) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(request_id)
+        if entry is not None and wait > 0:
+            # asyncio.wait não cancela a Future, que outros consultores podem aguardar
+            await asyncio.wait({entry["future"]}, timeout=wait)
+        return self._state(request_id)
+
+    async def evict_expired(self) -> int:
+        """
+        Remove entradas mais antigas que o TTL; quem ainda aguarda recebe timeout
+        """
+        deadline = time.monotonic() - self.ttl
+        expired = 0
+        while self._entries:
+            request_id, entry = next(iter(self._entries.items()))
+            if entry["created_at"] > deadline:
+                break
+            if entry["detached"]:
+                await self.complete(request_id, "timed_out")
+            else:
+                self._remove(request_id)
+            if not entry["future"].done():
+                entry["future"].set_exception(asyncio.TimeoutError())
+            expired += 1
+        self.counters["expired"] += expired
+        result_deadline = time.monotonic() - self.result_ttl
+        while self._results and next(iter(self._results.values()))["completed_at"] <= result_deadline:
+            self._results.popitem(last=False)
+        return expired
+
+    async def pending(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {"request_id": request_id, "user_id": entry["user_id"], "age_s": round(now - entry["created_at"], 3)}
+            for request_id, entry in self._entries.items()
+        ]
+
+    async def stats(self) -> Dict[str, Any]:
+        oldest = next(iter(self._entries.values()), None)
+        return {
+            "backend": self.backend,
+            "size": len(self._entries),
+            "results": len(self._results),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "oldest_age_s": round(time.monotonic() - oldest["created_at"], 3) if oldest else 0.0,
+            **{name: self.counters[name] for name in
+               ("registered", "resolved", "timed_out", "expired", "rejected", "orphaned", "events_published")}
+        }
+
+class RedisPendingStore(PendingStore):
+    """
+    Store compartilhado entre réplicas do gateway. O Redis guarda as entradas
+    pendentes (com TTL), os resultados do caminho rápido e o índice por usuário;
+    explicações, eventos de progresso e conclusões são difundidos em um canal
+    pub/sub que toda réplica assina, acordando a Future local da réplica dona
+    e os long polls de /predictions em qualquer réplica.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = REDIS_PREFIX,
+                 max_entries: int = PENDING_MAX_ENTRIES, ttl: float = PENDING_TTL,
+                 result_ttl: float = RESULT_TTL):
+        # Dependência opcional: só necessária com GATEWAY_PENDING_BACKEND=redis
+        import redis.asyncio as aioredis
+        self.redis = aioredis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.channel = f"{prefix}:events"
+        self.ttl = ttl
+        self.result_ttl = result_ttl
+        self.local = InMemoryPendingStore(max_entries=max_entries, ttl=ttl, result_ttl=result_ttl)
+        self._watchers: Dict[str, List[asyncio.Future]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+        self.counters: Counter = Counter()
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.prefix}:{kind}:{name}"
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+        await asyncio.wait_for(self._subscribed.wait(), HTTP_CONNECT_TIMEOUT)
+        logger.info(f"Store de pendências compartilhado (Redis, canal {self.channel})")
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+        await self.redis.aclose()
+
+    async def _listen(self):
+        """
+        Assina o canal de eventos, reconectando após falhas. Uma mensagem
+        inválida é descartada sem derrubar a assinatura.
+        """
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                await self._resync()
+                self._subscribed.set()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        await self._dispatch(json.loads(message["data"]))
+                    except Exception as e:
+                        self.counters["dispatch_errors"] += 1
+                        logger.error(f"Mensagem descartada do canal {self.channel}: {e}")
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as e:
+                logger.error(f"Assinatura do canal {self.channel} interrompida: {e}")
+                await pubsub.aclose()
+                await asyncio.sleep(1)
+
+    async def _resync(self):
+        """
+        Reaplica as conclusões publicadas enquanto a assinatura estava caída:
+        explicações já gravadas na chave resolved e resultados do caminho rápido
+        """
+        for request_id in self.local.unresolved():
+            explanation = await self.redis.get(self._key("resolved", request_id))
+            if explanation is not None:
+                await self._dispatch({"type": "explanation", "request_id": request_id, "explanation": explanation})
+            elif await self.redis.exists(self._key("result", request_id)):
+                await self._dispatch({"type": "complete", "request_id": request_id})
+        for request_id in list(self._watchers):
+            state = await self._state(request_id)
+            if state is None or state["status"] != "pending":
+                self._wake(request_id)
+
+    async def _dispatch(self, message: Dict[str, Any]):
+        """
+        Entrega uma mensagem do canal às esperas desta réplica
+        """
+        request_id = message["request_id"]
+        self.counters["received"] += 1
+        if request_id in self.local:
+            if message["type"] == "explanation":
+                await self.local.resolve(request_id, message["explanation"])
+            elif message["type"] == "progress":
+                await self.local.publish(request_id, message["stage"], message["data"])
+            elif message["type"] == "complete":
+                await self.local.release(request_id)
+        if message["type"] in ("explanation", "complete"):
+            self._wake(request_id)
+
+    def _wake(self, request_id: str):
+        for watcher in self._watchers.get(request_id, []):
+            if not watcher.done():
+                watcher.set_result(None)
+
+    async def _broadcast(self, message: Dict[str, Any]):
+        await self.redis.publish(self.channel, json.dumps(message))
+        self.counters["published"] += 1
+
+    async def register(self, request_id: str, user_id: str, stream: bool = False,
+                       detached: bool = False) -> asyncio.Future:
+        # O limite de entradas vale por réplica (esperas locais)
+        future = await self.local.register(request_id, user_id, stream=stream, detached=detached)
+        ttl = int(self.ttl) + 1
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(self._key("pending", request_id), mapping={
+                    "user_id": user_id, "detached": int(detached), "created_at": time.time()
+                })
+                pipe.expire(self._key("pending", request_id), ttl)
+                pipe.zadd(self._key("user", user_id), {request_id: time.time()})
+                pipe.expire(self._key("user", user_id), ttl)
+                if detached:
+                    # Permite responder "timed_out" depois que a entrada expira
+                    pipe.set(self._key("known", request_id), user_id, ex=ttl + int(self.result_ttl))
+                await pipe.execute()
+        except Exception:
+            await self.local.release(request_id)
+            raise
+        return future
+
+    async def resolve(self, request_id: str, explanation: str) -> bool:
+        entry = await self.redis.hgetall(self._key("pending", request_id))
+        # SET NX garante uma única entrega mesmo com callbacks repetidos; a
+        # explicação fica na chave para as réplicas que perderem a mensagem
+        if not entry or not await self.redis.set(self._key("resolved", request_id), explanation, nx=True,
+                                                 ex=int(self.ttl) + 1):
+            self.counters["orphaned"] += 1
+            return False
+        if entry.get("detached") == "1":
+            await self._store_result(request_id, entry["user_id"], "ready", explanation)
+        await self._broadcast({"type": "explanation", "request_id": request_id, "explanation": explanation})
+        return True
+
+    async def resolve_user(self, user_id: str, explanation: str) -> bool:
+        for request_id in await self.redis.zrange(self._key("user", user_id), 0, -1):
+            pending, resolved = await asyncio.gather(
+                self.redis.exists(self._key("pending", request_id)),
+                self.redis.exists(self._key("resolved", request_id))
+            )
+            if pending and not resolved:
+                return await self.resolve(request_id, explanation)
+        self.counters["orphaned"] += 1
+        return False
+
+    async def publish(self, request_id: str, stage: str, data: Dict[str, Any]) -> bool:
+        if not await self.redis.exists(self._key("pending", request_id)):
+            return False
+        await self._broadcast({"type": "progress", "request_id": request_id, "stage": stage, "data": data})
+        return True
+
+    def events(self, request_id: str) -> Optional[asyncio.Queue]:
+        return self.local.events(request_id)
+
+    async def _store_result(self, request_id: str, user_id: str, status: str,
+                            explanation: Optional[str]):
+        result = json.dumps({"user_id": user_id, "status": status, "explanation": explanation})
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key("result", request_id), result, ex=int(self.result_ttl))
+            pipe.delete(self._key("pending", request_id))
+            pipe.zrem(self._key("user", user_id), request_id)
+            await pipe.execute()
+
+    async def complete(self, request_id: str, status: str, explanation: Optional[str] = None):
+        user_id = await self.redis.hget(self._key("pending", request_id), "user_id")
+        if user_id is None:
+            return
+        await self._store_result(request_id, user_id, status, explanation)
+        await self._broadcast({"type": "complete", "request_id": request_id})
+
+    async def release(self, request_id: str):
+        state = await self.local.lookup(request_id)
+        await self.local.release(request_id)
+        if state is None or state["status"] != "pending":
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._key("pending", request_id))
+            pipe.zrem(self._key("user", state["user_id"]), request_id)
+            await pipe.execute()
+
+    async def _state(self, request_id: str) -> Optional[Dict[str, Any]]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(self._key("result", request_id))
+            pipe.hget(self._key("pending", request_id), "user_id")
+            pipe.get(self._key("known", request_id))
+            result, pending_user, known_user = await pipe.execute()
+        if result is not None:
+            return json.loads(result)
+        if pending_user is not None:
+            return {"user_id": pending_user, "status": "pending", "explanation": None}
+        if known_user is not None:
+            return {"user_id": known_user, "status": "timed_out", "explanation": None}
+        return None
+
+    async def lookup(self, request_id: str, wait: float = 0.0) -> Optional[Dict[str, Any]]:
+        watcher = None
+        if wait > 0:
+            # Registrado antes da leitura para não perder uma conclusão concorrente
+            watcher = asyncio.get_running_loop().create_future()
+            self._watchers.setdefault(request_id, []).append(watcher)
+        try:
+            state = await self._state(request_id)
+            if watcher is not None and state is not None and state["status"] == "pending":
+                await asyncio.wait({watcher}, timeout=wait)
+                state = await self._state(request_id) or state
+            return state
+        finally:
+            if watcher is not None:
+                watchers = self._watchers.get(request_id, [])
+                watchers.remove(watcher)
+                if not watchers:
+                    self._watchers.pop(request_id, None)
+
+    async def evict_expired(self) -> int:
+        # As chaves no Redis expiram sozinhas; aqui expiram as esperas locais
+        return await self.local.evict_expired()
+
+    async def pending(self) -> List[Dict[str, Any]]:
+        return await self.local.pending()
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            **await self.local.stats(),
+            "backend": self.backend,
+            "channel": self.channel,
+            "watchers": sum(len(watchers) for watchers in self._watchers.values()),
+            "messages_published": self.counters["published"],
+            "messages_received": self.counters["received"],
+            "messages_dropped": self.counters["dispatch_errors"],
+            "orphaned_shared": self.counters["orphaned"]
+        }
+
+def create_pending_store() -> PendingStore:
+    """
+    Store de pendências configurado em GATEWAY_PENDING_BACKEND (memory | redis)
+    """
+    if PENDING_BACKEND == "redis":
+        return RedisPendingStore()
+    if PENDING_BACKEND != "memory":
+        raise ValueError(f"GATEWAY_PENDING_BACKEND inválido: {PENDING_BACKEND}")
+    return InMemoryPendingStore()
+
+# Instância global
+pending_explanations = create_pending_store()
+
+async def sweep_pending_explanations(interval: float):
+    """
+    Remove periodicamente as explicações pendentes expiradas
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            expired = await pending_explanations.evict_expired()
+        except Exception as e:
+            logger.error(f"Erro na limpeza de explicações pendentes: {e}")
+            continue
+        if expired:
+            logger.warning(f"{expired} explicações pendentes expiradas (TTL {PENDING_TTL}s)")
@@ -0,0 +1,57 @@
+import asyncio
+from collections import Counter
+from typing import Dict, Any
+
+from app.core.config import DEDUP_ENABLED
+
+class SingleFlight:
+    """
+    Deduplicação de chamadas em andamento: requisições com a mesma chave
+    aguardam a chamada já iniciada em vez de iniciar outra. A chamada roda em
+    uma task própria, então a desconexão de um cliente não a cancela para os
+    demais; quando o último cliente desconecta, a chamada é cancelada.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        self.counters: Counter = Counter()
+
+    async def do(self, key: str, call):
+        flight = self._calls.get(key)
+        if flight is not None:
+            self.counters["coalesced"] += 1
+        else:
+            self.counters["executed"] += 1
+            flight = {"task": asyncio.ensure_future(call()), "waiters": 0}
+            self._calls[key] = flight
+            flight["task"].add_done_callback(lambda t: self._forget(key, flight))
+        flight["waiters"] += 1
+        try:
+            return await asyncio.shield(flight["task"])
+        finally:
+            flight["waiters"] -= 1
+            if flight["waiters"] == 0 and not flight["task"].done():
+                # Ninguém mais aguarda o resultado
+                self.counters["cancelled"] += 1
+                flight["task"].cancel()
+
+    def _forget(self, key: str, flight: Dict[str, Any]):
+        if self._calls.get(key) is flight:
+            del self._calls[key]
+        # Evita o aviso de exceção não lida quando todos os clientes desconectaram
+        if not flight["task"].cancelled():
+            flight["task"].exception()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.counters["executed"] + self.counters["coalesced"]
+        return {
+            "enabled": DEDUP_ENABLED,
+            "in_flight": len(self._calls),
+            "executed": self.counters["executed"],
+            "coalesced": self.counters["coalesced"],
+            "cancelled": self.counters["cancelled"],
+            "coalesced_ratio": round(self.counters["coalesced"] / total, 4) if total else 0.0
+        }
+
+# Instância global
+inflight_predictions = SingleFlight()
@@ -0,0 +1,43 @@
+import logging
+from fastapi import APIRouter
+
+from app.core.pending_store import pending_explanations
+from app.schemas import ExplanationData, ProgressEvent
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.post("/explanation/{user_id}")
+async def receive_explanation(user_id: str, explanation_data: ExplanationData):
+    """
+    Endpoint para receber explicações do agente explicador
+    """
+    logger.info(f"Recebendo explicação para usuário {user_id}: {explanation_data.explanation}")
+
+    # Entrega a explicação à requisição de origem (request_id) ou, para agentes
+    # sem request_id, à requisição pendente mais antiga do usuário
+    if explanation_data.request_id:
+        delivered = await pending_explanations.resolve(explanation_data.request_id, explanation_data.explanation)
+    else:
+        delivered = await pending_explanations.resolve_user(user_id, explanation_data.explanation)
+
+    if delivered:
+        logger.info(f"Explicação entregue para usuário {user_id} (request_id {explanation_data.request_id})")
+    else:
+        logger.warning(
+            f"Explicação recebida para usuário {user_id} (request_id {explanation_data.request_id}) "
+            "sem requisição aguardando"
+        )
+
+    return {"status": "explanation_received", "user_id": user_id, "request_id": explanation_data.request_id}
+
+@router.post("/progress/{user_id}")
+async def receive_progress(user_id: str, event: ProgressEvent):
+    """
+    Endpoint para eventos de progresso dos agentes (ex.: score do classificador),
+    repassados às requisições em streaming
+    """
+    delivered = await pending_explanations.publish(event.request_id, event.stage, event.data)
+    if delivered:
+        logger.info(f"Evento '{event.stage}' entregue para usuário {user_id} (request_id {event.request_id})")
+    return {"status": "progress_received", "delivered": delivered, "request_id": event.request_id}
@@ -0,0 +1,331 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Dict, Any, AsyncIterator
+
+import httpx
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
+
+from app.core.admission import admission, admit, admitted
+from app.core.config import BULK_CONCURRENCY, EXPLANATION_TIMEOUT, SSE_KEEPALIVE_INTERVAL
+from app.core.jade_client import send_to_jade_agent
+from app.core.pending_store import pending_explanations
+from app.schemas import (
+    PatientData, PredictionResponse, FastPredictionResponse,
+    ExplanationStatusResponse, BulkPredictionRequest
+)
+from app.services import (
+    parse_explanation_json, build_chronic_service_data, register_pending_explanation,
+    fetch_risk_score, wait_for_explanation, coalesce
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.post("/predict", response_model=PredictionResponse)
+async def predict_cardiac_risk(patient_data: PatientData):
+    """
+    Endpoint principal para predição de risco cardíaco
+    """
+    return await coalesce(patient_data, "predict", lambda: admitted(lambda: run_prediction(patient_data)))
+
+async def run_prediction(patient_data: PatientData) -> PredictionResponse:
+    """
+    Envia o paciente aos agentes e aguarda a explicação
+    """
+    try:
+        logger.info(f"Recebendo dados do paciente: {patient_data.user_id}")
+
+        request_id = uuid.uuid4().hex
+        future = await register_pending_explanation(request_id, patient_data.user_id)
+        explanation = None
+        try:
+            await send_to_jade_agent(build_chronic_service_data(patient_data, request_id))
+
+            # Aguardar resposta real do agente explicador
+            explanation = await wait_for_explanation(request_id, patient_data.user_id, future)
+        finally:
+            await pending_explanations.release(request_id)
+
+        if explanation is None:
+            raise HTTPException(
+                status_code=408,
+                detail="Timeout: Não foi possível obter explicação do agente"
+            )
+
+        return PredictionResponse(
+            success=True,
+            request_id=request_id,
+            patient_data=patient_data,
+            prediction={"risk_level": "analyzed"},
+            explanation=explanation
+        )
+
+    except HTTPException:
+        raise
+    except httpx.RequestError as e:
+        logger.error(f"Erro de conexão com JADE Agent: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço de análise temporariamente indisponível"
+        )
+    except Exception as e:
+        logger.error(f"Erro interno: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro interno do servidor: {str(e)}"
+        )
+
+@router.post("/predict/fast", response_model=FastPredictionResponse)
+async def predict_cardiac_risk_fast(patient_data: PatientData):
+    """
+    Caminho rápido: o score do chronic-risk-service é devolvido assim que
+    calculado, enquanto a cadeia JADE gera a explicação em paralelo. A
+    explicação é consultada depois em GET /predictions/{request_id}.
+    Requisições idênticas simultâneas são coalescidas e recebem a mesma
+    resposta, inclusive o mesmo request_id.
+    """
+    return await coalesce(patient_data, "fast", lambda: admitted(lambda: run_fast_prediction(patient_data)))
+
+async def run_fast_prediction(patient_data: PatientData) -> FastPredictionResponse:
+    logger.info(f"Recebendo dados do paciente (caminho rápido): {patient_data.user_id}")
+    request_id = uuid.uuid4().hex
+    await register_pending_explanation(request_id, patient_data.user_id, detached=True)
+    chronic_service_data = build_chronic_service_data(patient_data, request_id)
+
+    score, submitted = await asyncio.gather(
+        fetch_risk_score(chronic_service_data),
+        send_to_jade_agent(chronic_service_data),
+        return_exceptions=True
+    )
+
+    if isinstance(submitted, Exception):
+        # Sem a cadeia JADE não haverá explicação; o score ainda é útil
+        logger.error(f"Explicação indisponível para request_id {request_id}: {submitted!r}")
+        await pending_explanations.complete(request_id, "failed")
+    if isinstance(score, Exception):
+        await pending_explanations.complete(request_id, "failed")
+        if isinstance(score, HTTPException):
+            raise score
+        logger.error(f"Erro de conexão com chronic-risk-service: {score!r}")
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço de risco temporariamente indisponível"
+        )
+
+    explanation_pending = not isinstance(submitted, Exception)
+    return FastPredictionResponse(
+        success=True,
+        request_id=request_id,
+        patient_data=patient_data,
+        prediction=score,
+        explanation_status="pending" if explanation_pending else "unavailable",
+        explanation_url=f"/predictions/{request_id}" if explanation_pending else None
+    )
+
+@router.get("/predictions/{request_id}", response_model=ExplanationStatusResponse)
+async def get_prediction_explanation(request_id: str, wait: float = 0.0):
+    """
+    Consulta a explicação de uma requisição do caminho rápido; com wait > 0
+    aguarda até wait segundos por ela (long polling)
+    """
+    state = await pending_explanations.lookup(request_id, wait=min(max(wait, 0.0), EXPLANATION_TIMEOUT))
+    if state is None:
+        raise HTTPException(status_code=404, detail="Requisição desconhecida ou expirada")
+
+    explanation = None
+    status = state["status"]
+    if status == "ready":
+        explanation = parse_explanation_json(state["explanation"])
+        if explanation is None:
+            status = "failed"
+    return ExplanationStatusResponse(
+        request_id=request_id,
+        user_id=state["user_id"],
+        status=status,
+        explanation=explanation
+    )
+
+async def predict_bulk_item(index: int, raw: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """
+    Processa um paciente do lote; falhas viram um item com success=False
+    """
+    # O registro ainda não foi validado: user_id pode faltar ou ter outro tipo
+    item: Dict[str, Any] = {"index": index, "user_id": raw.get("user_id"), "success": False}
+    try:
+        patient_data = PatientData.model_validate(raw)
+        if mode == "full":
+            result = await predict_cardiac_risk(patient_data)
+        else:
+            result = await predict_cardiac_risk_fast(patient_data)
+    except ValidationError as e:
+        item.update(status_code=422, error="; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+        ))
+        return item
+    except HTTPException as e:
+        item.update(status_code=e.status_code, error=str(e.detail))
+        return item
+    except Exception as e:
+        logger.error(f"Erro no paciente {index} do lote: {e}")
+        item.update(status_code=500, error=f"Erro interno do servidor: {str(e)}")
+        return item
+    item.update(success=True, status_code=200, result=result.model_dump())
+    return item
+
+async def stream_bulk_results(bulk: BulkPredictionRequest) -> AsyncIterator[str]:
+    """
+    Processa o lote com concorrência limitada e emite cada resultado (NDJSON)
+    assim que termina, seguido de uma linha de resumo
+    """
+    start_time = time.time()
+    concurrency = min(bulk.concurrency or BULK_CONCURRENCY, len(bulk.patients))
+    pending_indexes = iter(range(len(bulk.patients)))
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def worker():
+        for index in pending_indexes:
+            await results.put(await predict_bulk_item(index, bulk.patients[index], bulk.mode))
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    succeeded = 0
+    try:
+        for _ in range(len(bulk.patients)):
+            item = await results.get()
+            succeeded += item["success"]
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+        yield json.dumps({"summary": {
+            "total": len(bulk.patients),
+            "succeeded": succeeded,
+            "failed": len(bulk.patients) - succeeded,
+            "mode": bulk.mode,
+            "concurrency": concurrency,
+            "processing_time_ms": round((time.time() - start_time) * 1000, 2)
+        }}) + "\n"
+    finally:
+        # Cliente desconectou: interrompe os pacientes ainda não processados
+        for task in workers:
+            task.cancel()
+
+@router.post("/predict/bulk")
+async def predict_cardiac_risk_bulk(bulk: BulkPredictionRequest):
+    """
+    Envio em lote (clínicas): cada paciente segue o caminho rápido (ou o
+    completo, com mode=full) com concorrência limitada; os resultados são
+    transmitidos em NDJSON conforme terminam e falhas ficam isoladas por paciente
+    """
+    logger.info(f"Recebendo lote de {len(bulk.patients)} pacientes (modo {bulk.mode})")
+    return StreamingResponse(
+        stream_bulk_results(bulk),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """
+    Formata um evento Server-Sent Events
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def stream_prediction_events(
+    request_id: str, patient_data: PatientData, future: asyncio.Future, on_close
+) -> AsyncIterator[str]:
+    """
+    Eventos da análise: accepted, score (quando o classificador publica o
+    resultado do modelo) e explanation; error em timeout ou falha de parsing.
+    A entrada pendente é liberada ao final ou quando o cliente desconecta.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + EXPLANATION_TIMEOUT
+    events = pending_explanations.events(request_id)
+    try:
+        yield format_sse("accepted", {"request_id": request_id, "user_id": patient_data.user_id})
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning(f"Timeout no stream de explicação (request_id {request_id})")
+                yield format_sse("error", {"request_id": request_id, "detail": "Timeout: Não foi possível obter explicação do agente"})
+                return
+            next_event = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait(
+                {next_event, future}, timeout=min(remaining, SSE_KEEPALIVE_INTERVAL),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if next_event in done:
+                event = next_event.result()
+                yield format_sse(event["stage"], {"request_id": request_id, **event["data"]})
+                continue
+            next_event.cancel()
+            if future in done:
+                if future.exception() is not None:
+                    # Entrada expirada pela varredura de pendências
+                    yield format_sse("error", {"request_id": request_id, "detail": "Timeout: Não foi possível obter explicação do agente"})
+                    return
+                explanation = parse_explanation_json(future.result())
+                if explanation is None:
+                    yield format_sse("error", {"request_id": request_id, "detail": "Explicação inválida recebida do agente"})
+                else:
+                    yield format_sse("explanation", {"request_id": request_id, "explanation": explanation.model_dump()})
+                return
+            # Comentário SSE mantém a conexão aberta em proxies
+            yield ": keep-alive\n\n"
+    finally:
+        await pending_explanations.release(request_id)
+        on_close()
+
+@router.post("/predict/stream")
+async def predict_cardiac_risk_stream(patient_data: PatientData):
+    """
+    Variante em streaming (Server-Sent Events) do /predict: envia os eventos
+    de cada etapa à medida que os agentes avançam
+    """
+    logger.info(f"Recebendo dados do paciente (stream): {patient_data.user_id}")
+    # A vaga de análise fica ocupada durante todo o stream
+    await admit()
+    slot = {"held": True}
+
+    def release_slot():
+        # Chamado pelo gerador e pela background task: libera uma única vez
+        if slot["held"]:
+            slot["held"] = False
+            admission.release()
+
+    request_id = uuid.uuid4().hex
+    try:
+        future = await register_pending_explanation(request_id, patient_data.user_id, stream=True)
+    except HTTPException:
+        release_slot()
+        raise
+    try:
+        await send_to_jade_agent(build_chronic_service_data(patient_data, request_id))
+    except HTTPException:
+        await pending_explanations.release(request_id)
+        release_slot()
+        raise
+    except httpx.RequestError as e:
+        await pending_explanations.release(request_id)
+        release_slot()
+        logger.error(f"Erro de conexão com JADE Agent: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço de análise temporariamente indisponível"
+        )
+
+    async def close_stream():
+        # Se o gerador nunca iniciou, seu finally não roda: libera a entrada
+        # pendente e a vaga aqui (as duas liberações são idempotentes)
+        await pending_explanations.release(request_id)
+        release_slot()
+
+    return StreamingResponse(
+        stream_prediction_events(request_id, patient_data, future, release_slot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Cobre o cliente que desconecta antes do primeiro evento
+        background=BackgroundTask(close_stream)
+    )
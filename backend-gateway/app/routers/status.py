@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+
+from app.core.admission import admission
+from app.core.http_client import get_http_pool_stats
+from app.core.jade_client import get_jade_stats
+from app.core.pending_store import pending_explanations
+from app.core.singleflight import inflight_predictions
+
+router = APIRouter()
+
+@router.get("/health")
+async def health_check():
+    """
+    Endpoint de verificação de saúde do serviço
+    """
+    return {"status": "healthy", "service": "HeartPredict Gateway"}
+
+@router.get("/stats")
+async def get_stats():
+    """
+    Estatísticas do gateway: pool de conexões HTTP, explicações pendentes,
+    requisições deduplicadas, controle de admissão e chamadas ao agente JADE
+    """
+    return {
+        "http_pool": get_http_pool_stats(),
+        "pending_explanations": await pending_explanations.stats(),
+        "deduplication": inflight_predictions.stats(),
+        "admission": admission.stats(),
+        "jade_agent": get_jade_stats()
+    }
+
+@router.get("/pending")
+async def get_pending_explanations():
+    """
+    Endpoint para debug - lista explicações pendentes
+    """
+    pending = await pending_explanations.pending()
+    return {
+        "pending_explanations": [entry["user_id"] for entry in pending],
+        "requests": pending
+    }
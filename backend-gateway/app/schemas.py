@@ -0,0 +1,84 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Literal
+
+from app.core.config import BULK_MAX_PATIENTS, BULK_CONCURRENCY
+
+class PatientData(BaseModel):
+    user_id: str
+    age: int
+    gender: int  # 1=Female, 2=Male, 3=Other
+    height: int  # cm
+    weight: float  # kg
+    ap_hi: int  # systolic blood pressure
+    ap_lo: int  # diastolic blood pressure
+    cholesterol: int  # 1=normal, 2=above normal, 3=well above normal
+    gluc: int  # 1=normal, 2=above normal, 3=well above normal
+    smoke: int  # 0=no, 1=yes
+    alco: int  # 0=no, 1=yes
+    active: int  # 0=no, 1=yes
+
+class ContributingFactor(BaseModel):
+    factorName: str
+    factorValue: str
+    riskType: str  # sucesso, alerta, perigo
+    details: str
+
+class Recommendation(BaseModel):
+    title: str
+    details: str
+
+class ModelInfo(BaseModel):
+    accuracy: float
+    disclaimer: str
+
+class StructuredExplanation(BaseModel):
+    patientName: str
+    riskScore: float
+    riskLevel: str
+    predictionStatus: str
+    predictionSummary: str
+    contributingFactors: List[ContributingFactor]
+    recommendations: List[Recommendation]
+    modelInfo: ModelInfo
+
+class ExplanationData(BaseModel):
+    explanation: str  # Raw JSON string from agent
+    request_id: Optional[str] = None  # ID de correlação enviado pelo gateway
+
+class ProgressEvent(BaseModel):
+    request_id: str
+    stage: str  # ex.: "score"
+    data: Dict[str, Any] = {}
+
+class FastPredictionResponse(BaseModel):
+    success: bool
+    request_id: str  # Compartilhado pelas requisições idênticas coalescidas
+    patient_data: PatientData
+    prediction: Dict[str, Any]  # Resposta do chronic-risk-service
+    explanation_status: str  # pending | unavailable
+    explanation_url: Optional[str] = None
+
+class ExplanationStatusResponse(BaseModel):
+    request_id: str
+    user_id: str
+    status: str  # pending | ready | timed_out | failed
+    explanation: Optional[StructuredExplanation] = None
+
+class BulkPredictionRequest(BaseModel):
+    patients: List[Dict[str, Any]] = Field(
+        ...,
+        description="Lista de pacientes no mesmo formato de PatientData",
+        min_length=1,
+        max_length=BULK_MAX_PATIENTS
+    )
+    # fast: score imediato e explicação em /predictions/{request_id}; full: aguarda a explicação
+    mode: Literal["fast", "full"] = "fast"
+    concurrency: Optional[int] = Field(None, ge=1, le=BULK_CONCURRENCY)
+
+class PredictionResponse(BaseModel):
+    success: bool
+    request_id: Optional[str] = None
+    patient_data: Optional[PatientData] = None
+    prediction: Optional[dict] = None
+    explanation: Optional[StructuredExplanation] = None
+    error: Optional[str] = None
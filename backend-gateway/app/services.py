@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Optional, Dict, Any
+
+from fastapi import HTTPException
+
+from app.core.config import CHRONIC_SERVICE_URL, DEDUP_ENABLED, EXPLANATION_TIMEOUT
+from app.core.http_client import get_http_client
+from app.core.pending_store import PendingStoreFull, pending_explanations
+from app.core.singleflight import inflight_predictions
+from app.schemas import PatientData, StructuredExplanation
+
+logger = logging.getLogger(__name__)
+
+def parse_explanation_json(explanation_text: str) -> Optional[StructuredExplanation]:
+    """
+    Converte o texto de explicação JSON do agente para objeto estruturado
+    """
+    try:
+        # Remove possíveis caracteres extras antes/depois do JSON
+        explanation_text = explanation_text.strip()
+
+        # Tenta encontrar JSON válido no texto
+        start_idx = explanation_text.find('{')
+        end_idx = explanation_text.rfind('}') + 1
+
+        if start_idx == -1 or end_idx == 0:
+            logger.error("JSON não encontrado na explicação")
+            return None
+
+        json_text = explanation_text[start_idx:end_idx]
+        explanation_dict = json.loads(json_text)
+
+        # Valida e cria o objeto estruturado
+        return StructuredExplanation(**explanation_dict)
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Erro ao decodificar JSON da explicação: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Erro ao processar explicação estruturada: {e}")
+        return None
+
+def build_chronic_service_data(patient_data: PatientData, request_id: str) -> Dict[str, Any]:
+    """
+    Converte os dados para o formato esperado pelo chronic-risk-service, com o
+    ID de correlação levado pelos agentes JADE até o callback do explicador
+    """
+    return {
+        "user_id": patient_data.user_id,
+        "request_id": request_id,
+        "age": patient_data.age,
+        "gender": patient_data.gender,
+        "height": patient_data.height,
+        "weight": patient_data.weight,
+        "ap_hi": patient_data.ap_hi,
+        "ap_lo": patient_data.ap_lo,
+        "cholesterol": patient_data.cholesterol,
+        "gluc": patient_data.gluc,
+        "smoke": patient_data.smoke,
+        "alco": patient_data.alco,
+        "active": patient_data.active
+    }
+
+async def register_pending_explanation(request_id: str, user_id: str, stream: bool = False,
+                                       detached: bool = False) -> asyncio.Future:
+    """
+    Registra a requisição no store de pendências (503 quando o limite é atingido)
+    """
+    try:
+        return await pending_explanations.register(request_id, user_id, stream=stream, detached=detached)
+    except PendingStoreFull as e:
+        logger.warning(f"Requisição recusada: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Gateway sobrecarregado: muitas explicações pendentes"
+        )
+
+async def fetch_risk_score(chronic_service_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Consulta o score diretamente no chronic-risk-service
+    """
+    response = await get_http_client().post(CHRONIC_SERVICE_URL, json=chronic_service_data)
+
+    if response.status_code == 422:
+        raise HTTPException(status_code=422, detail=response.json().get("detail"))
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro na comunicação com chronic-risk-service: {response.status_code}"
+        )
+    return response.json()
+
+async def wait_for_explanation(
+    request_id: str, user_id: str, future: asyncio.Future, timeout: float = EXPLANATION_TIMEOUT
+) -> Optional[StructuredExplanation]:
+    """
+    Aguarda a explicação do agente explicador, resolvida por receive_explanation
+    """
+    logger.info(f"Aguardando explicação para usuário {user_id} (request_id {request_id})")
+
+    try:
+        explanation_text = await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Timeout aguardando explicação para usuário {user_id} (request_id {request_id})")
+        return None
+
+    logger.info(f"Explicação recebida para usuário {user_id} (request_id {request_id})")
+
+    # Processa o JSON estruturado
+    structured_explanation = parse_explanation_json(explanation_text)
+    if structured_explanation:
+        return structured_explanation
+    else:
+        logger.error(f"Falha ao processar explicação JSON para usuário {user_id}")
+        return None
+
+def patient_fingerprint(patient_data: PatientData, mode: str) -> str:
+    """
+    Hash do payload normalizado, usado como chave da deduplicação
+    """
+    normalized = json.dumps(patient_data.model_dump(), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{mode}:{normalized}".encode()).hexdigest()
+
+async def coalesce(patient_data: PatientData, mode: str, call):
+    """
+    Executa a chamada, compartilhando-a com requisições idênticas em andamento
+    """
+    if not DEDUP_ENABLED:
+        return await call()
+    return await inflight_predictions.do(patient_fingerprint(patient_data, mode), call)
@@ -0,0 +1,57 @@
+"""
+Testes da contagem de requisições do pool HTTP compartilhado
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import http_client
+from app.core.http_client import CountingTransport
+
+@pytest.fixture
+def pool(monkeypatch):
+    """
+    Cliente com transporte contado; o agente só responde quando release é liberado
+    """
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/error":
+            raise httpx.ConnectError("conexão recusada", request=request)
+        await release.wait()
+        return httpx.Response(200, json={"ok": True})
+
+    transport = CountingTransport(httpx.MockTransport(handler))
+    monkeypatch.setattr(http_client, "HTTP_MAX_CONNECTIONS", 2)
+    monkeypatch.setattr(http_client, "http_transport", transport)
+    monkeypatch.setattr(http_client, "http_client", http_client.create_http_client(transport))
+    return release
+
+@pytest.mark.asyncio
+async def test_in_flight_and_queued_requests(pool):
+    """Requisições acima de max_connections aparecem como fila; zeram ao responder"""
+    client = http_client.get_http_client()
+    calls = [asyncio.create_task(client.get("http://jade/ok")) for _ in range(3)]
+    await asyncio.sleep(0)
+    stats = http_client.get_http_pool_stats()
+    assert stats["in_flight_requests"] == 3
+    assert stats["active_connections"] == 2
+    assert stats["queued_requests"] == 1
+
+    pool.set()
+    await asyncio.gather(*calls)
+    stats = http_client.get_http_pool_stats()
+    assert stats["requests_sent"] == 3
+    assert stats["max_in_flight_requests"] == 3
+    assert stats["in_flight_requests"] == stats["queued_requests"] == 0
+
+@pytest.mark.asyncio
+async def test_failed_request_is_released(pool):
+    """Erro de conexão não deixa a requisição contada como em andamento"""
+    with pytest.raises(httpx.ConnectError):
+        await http_client.get_http_client().get("http://jade/error")
+    stats = http_client.get_http_pool_stats()
+    assert stats["requests_sent"] == 1
+    assert stats["in_flight_requests"] == 0
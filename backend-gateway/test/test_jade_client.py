@@ -0,0 +1,108 @@
+"""
+Testes do envio ao agente JADE: contabilização do circuit breaker e das
+amostras de latência usadas pelo hedging
+"""
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core import http_client, jade_client
+from app.core.breaker import CircuitBreaker, LatencyWindow
+
+PATIENT = {"user_id": "user-1", "request_id": "req-1"}
+
+@pytest.fixture
+def jade(monkeypatch):
+    """
+    Breaker, janela de latência e cliente HTTP isolados; o agente responde
+    com o status (ou a exceção) definido em responses
+    """
+    responses = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        outcome = responses.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return httpx.Response(outcome)
+
+    breaker = CircuitBreaker("jade_test", failure_threshold=2, reset_timeout=0)
+    monkeypatch.setattr(jade_client, "jade_breaker", breaker)
+    monkeypatch.setattr(jade_client, "jade_latency", LatencyWindow())
+    monkeypatch.setattr(jade_client, "HEDGE_ENABLED", False)
+    monkeypatch.setattr(http_client, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return breaker, responses
+
+def open_breaker(breaker: CircuitBreaker):
+    """Abre o circuito; com reset_timeout=0 o próximo allow() entra em half_open"""
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == "open"
+
+@pytest.mark.asyncio
+async def test_success_records_latency(jade):
+    """Só respostas 2xx contam como sucesso e como amostra de latência"""
+    breaker, responses = jade
+    responses.append(200)
+    await jade_client.send_to_jade_agent(PATIENT)
+    assert breaker.stats()["successes"] == 1
+    assert len(jade_client.jade_latency) == 1
+
+@pytest.mark.asyncio
+async def test_any_2xx_is_accepted(jade):
+    """Um 204 é sucesso para o breaker e não vira erro para o cliente"""
+    breaker, responses = jade
+    responses.append(204)
+    await jade_client.send_to_jade_agent(PATIENT)
+    assert breaker.stats()["successes"] == 1
+    assert len(jade_client.jade_latency) == 1
+
+@pytest.mark.asyncio
+async def test_client_error_is_neither_success_nor_failure(jade):
+    """4xx não fecha o circuito nem entra na janela de latência, mas libera a vaga de teste"""
+    breaker, responses = jade
+    open_breaker(breaker)
+    responses.append(400)
+    with pytest.raises(HTTPException):
+        await jade_client.send_to_jade_agent(PATIENT)
+    assert breaker.state == "half_open"
+    assert breaker.stats()["successes"] == 0
+    assert len(jade_client.jade_latency) == 0
+
+    responses.append(200)
+    await jade_client.send_to_jade_agent(PATIENT)
+    assert breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_server_error_reopens_breaker(jade):
+    """5xx na chamada de teste reabre o circuito"""
+    breaker, responses = jade
+    open_breaker(breaker)
+    responses.append(503)
+    with pytest.raises(HTTPException):
+        await jade_client.send_to_jade_agent(PATIENT)
+    assert breaker.state == "open"
+    assert len(jade_client.jade_latency) == 0
+
+@pytest.mark.asyncio
+async def test_unexpected_error_releases_probe(jade):
+    """Uma exceção inesperada na chamada de teste não deixa o half_open travado"""
+    breaker, responses = jade
+    open_breaker(breaker)
+    responses.append(RuntimeError("falha inesperada"))
+    with pytest.raises(RuntimeError):
+        await jade_client.send_to_jade_agent(PATIENT)
+    assert breaker.state == "half_open"
+
+    responses.append(200)
+    await jade_client.send_to_jade_agent(PATIENT)
+    assert breaker.state == "closed"
+
+@pytest.mark.asyncio
+async def test_connection_error_counts_as_failure(jade):
+    """Erro de conexão conta como falha do agente"""
+    breaker, responses = jade
+    responses.append(httpx.ConnectError("recusado"))
+    with pytest.raises(httpx.ConnectError):
+        await jade_client.send_to_jade_agent(PATIENT)
+    assert breaker.stats()["failures"] == 1
@@ -0,0 +1,155 @@
+"""
+Testes do store de pendências: InMemoryPendingStore e RedisPendingStore
+(duas réplicas sobre o mesmo servidor fakeredis)
+"""
+
+import asyncio
+import json
+
+import fakeredis
+import pytest
+import pytest_asyncio
+
+from app.core.pending_store import InMemoryPendingStore, RedisPendingStore
+
+EXPLANATION = json.dumps({"riskLevel": "Baixo"})
+
+async def create_redis_store(server: fakeredis.FakeServer) -> RedisPendingStore:
+    """Cria uma réplica conectada ao servidor fake compartilhado"""
+    store = RedisPendingStore(prefix="test:gateway", ttl=5, result_ttl=5)
+    store.redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    await store.start()
+    return store
+
+@pytest_asyncio.fixture
+async def replicas():
+    """Duas réplicas do gateway compartilhando o mesmo Redis"""
+    server = fakeredis.FakeServer()
+    stores = [await create_redis_store(server), await create_redis_store(server)]
+    yield stores
+    for store in stores:
+        await store.close()
+
+@pytest_asyncio.fixture(params=["memory", "redis"])
+async def store_pair(request):
+    """
+    Réplica que registra e réplica que recebe o callback; no store em memória
+    as duas são a mesma instância
+    """
+    if request.param == "memory":
+        store = InMemoryPendingStore(ttl=5, result_ttl=5)
+        await store.start()
+        yield store, store
+        await store.close()
+    else:
+        server = fakeredis.FakeServer()
+        owner, other = await create_redis_store(server), await create_redis_store(server)
+        yield owner, other
+        await owner.close()
+        await other.close()
+
+@pytest.mark.asyncio
+async def test_register_and_resolve(store_pair):
+    """A explicação recebida por qualquer réplica resolve a Future da dona"""
+    owner, other = store_pair
+    future = await owner.register("req-1", "user-1")
+
+    assert await other.resolve("req-1", EXPLANATION)
+    assert await asyncio.wait_for(future, 1) == EXPLANATION
+    await owner.release("req-1")
+    assert await owner.pending() == []
+
+@pytest.mark.asyncio
+async def test_resolve_unknown_request(store_pair):
+    """Callback sem requisição aguardando não é entregue"""
+    _, other = store_pair
+    assert not await other.resolve("desconhecida", EXPLANATION)
+
+@pytest.mark.asyncio
+async def test_resolve_user_legacy(store_pair):
+    """Sem request_id, a explicação vai para a requisição mais antiga do usuário"""
+    owner, other = store_pair
+    first = await owner.register("req-1", "user-1")
+    second = await owner.register("req-2", "user-1")
+
+    assert await other.resolve_user("user-1", EXPLANATION)
+    assert await asyncio.wait_for(first, 1) == EXPLANATION
+    assert not second.done()
+    assert await other.resolve_user("user-1", EXPLANATION)
+    assert await asyncio.wait_for(second, 1) == EXPLANATION
+    assert not await other.resolve_user("user-1", EXPLANATION)
+
+@pytest.mark.asyncio
+async def test_progress_events(store_pair):
+    """Eventos de progresso chegam à fila da requisição em streaming"""
+    owner, other = store_pair
+    await owner.register("req-1", "user-1", stream=True)
+
+    assert await other.publish("req-1", "score", {"chronic_risk_score": 0.3})
+    event = await asyncio.wait_for(owner.events("req-1").get(), 1)
+    assert event == {"stage": "score", "data": {"chronic_risk_score": 0.3}}
+    assert not await other.publish("desconhecida", "score", {})
+
+@pytest.mark.asyncio
+async def test_detached_lookup_waits_for_explanation(store_pair):
+    """Long polling de uma requisição desacoplada termina quando a explicação chega"""
+    owner, other = store_pair
+    await owner.register("req-1", "user-1", detached=True)
+    assert (await other.lookup("req-1"))["status"] == "pending"
+
+    poll = asyncio.create_task(other.lookup("req-1", wait=2))
+    await asyncio.sleep(0.05)
+    assert await owner.resolve("req-1", EXPLANATION)
+    state = await asyncio.wait_for(poll, 1)
+    assert state == {"user_id": "user-1", "status": "ready", "explanation": EXPLANATION}
+    assert await owner.lookup("desconhecida") is None
+
+@pytest.mark.asyncio
+async def test_detached_lookup_times_out(store_pair):
+    """Sem explicação, o long polling devolve pending ao fim da espera"""
+    owner, other = store_pair
+    await owner.register("req-1", "user-1", detached=True)
+    state = await other.lookup("req-1", wait=0.1)
+    assert state["status"] == "pending"
+
+@pytest.mark.asyncio
+async def test_exactly_once_delivery(store_pair):
+    """Callbacks repetidos (ex.: envio com hedging) entregam uma única vez"""
+    owner, other = store_pair
+    future = await owner.register("req-1", "user-1")
+
+    delivered = await asyncio.gather(
+        owner.resolve("req-1", EXPLANATION),
+        other.resolve("req-1", EXPLANATION),
+        other.resolve("req-1", EXPLANATION)
+    )
+    assert sorted(delivered) == [False, False, True]
+    assert await asyncio.wait_for(future, 1) == EXPLANATION
+
+@pytest.mark.asyncio
+async def test_listener_survives_invalid_messages(replicas):
+    """Mensagens inválidas no canal não derrubam a assinatura"""
+    owner, other = replicas
+    future = await owner.register("req-1", "user-1")
+
+    await other.redis.publish(owner.channel, "não é json")
+    await other.redis.publish(owner.channel, json.dumps({"type": "explanation"}))
+    assert await other.resolve("req-1", EXPLANATION)
+    assert await asyncio.wait_for(future, 1) == EXPLANATION
+    assert (await owner.stats())["messages_dropped"] == 2
+
+@pytest.mark.asyncio
+async def test_resync_recovers_missed_resolution(replicas):
+    """Explicação publicada durante uma queda da assinatura é recuperada na reconexão"""
+    owner, other = replicas
+    future = await owner.register("req-1", "user-1")
+    owner._listener.cancel()
+    await asyncio.gather(owner._listener, return_exceptions=True)
+
+    assert await other.resolve("req-1", EXPLANATION)
+    await asyncio.sleep(0.05)
+    assert not future.done()
+
+    owner._subscribed.clear()
+    await owner.start()
+    assert await asyncio.wait_for(future, 1) == EXPLANATION
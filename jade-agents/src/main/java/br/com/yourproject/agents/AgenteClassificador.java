@@ -5,6 +5,9 @@ import jade.core.behaviours.CyclicBehaviour;
 import jade.lang.acl.ACLMessage;
 import jade.lang.acl.MessageTemplate;
 import jade.core.AID;
+import com.fasterxml.jackson.databind.ObjectMapper;
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.node.ObjectNode;
 
 import java.io.IOException;
 import java.net.URI;
@@ -12,6 +15,7 @@ import java.net.http.HttpClient;
 import java.net.http.HttpRequest;
 import java.net.http.HttpResponse;
 import java.time.Duration;
+import java.util.concurrent.CompletableFuture;
 
 /**
  * Agente responsável por comunicar-se com o serviço de classificação de risco cardíaco aprimorado (main_enhanced.py).
@@ -21,7 +25,9 @@ import java.time.Duration;
 public class AgenteClassificador extends Agent {
     
     private static final String AI_SERVICE_URL = "http://127.0.0.1:8002/predict_risk";
+    private static final String BACKEND_GATEWAY_URL = "http://localhost:8000";
     private HttpClient httpClient;
+    private final ObjectMapper objectMapper = new ObjectMapper();
     
     @Override
     protected void setup() {
@@ -62,6 +68,9 @@ public class AgenteClassificador extends Agent {
                     String resultadoIA = chamarServicoIA(content);
                     
                     if (resultadoIA != null) {
+                        // Publica o score no gateway (clientes em streaming) sem bloquear o fluxo
+                        publicarProgressoScore(resultadoIA);
+                        
                         // Envia resultado para o AgenteJulgador
                         enviarResultadoParaJulgador(resultadoIA);
                     } else {
@@ -115,6 +124,48 @@ public class AgenteClassificador extends Agent {
         }
     }
     
+    /**
+     * Envia o score ao backend-gateway como evento de progresso (POST /progress/{userId}).
+     * O envio é assíncrono e falhas são apenas registradas: a explicação final continua
+     * chegando pelo AgenteExplicador.
+     */
+    private void publicarProgressoScore(String resultadoIA) {
+        try {
+            JsonNode resultado = objectMapper.readTree(resultadoIA);
+            JsonNode requestIdNode = resultado.get("request_id");
+            JsonNode userIdNode = resultado.get("user_id");
+            if (requestIdNode == null || requestIdNode.isNull() || userIdNode == null) {
+                // Requisição sem correlação do gateway: não há stream a notificar
+                return;
+            }
+            
+            ObjectNode evento = objectMapper.createObjectNode();
+            evento.put("request_id", requestIdNode.asText());
+            evento.put("stage", "score");
+            evento.set("data", resultado);
+            
+            HttpRequest request = HttpRequest.newBuilder()
+                    .uri(URI.create(BACKEND_GATEWAY_URL + "/progress/" + userIdNode.asText()))
+                    .header("Content-Type", "application/json")
+                    .timeout(Duration.ofSeconds(5))
+                    .POST(HttpRequest.BodyPublishers.ofString(objectMapper.writeValueAsString(evento)))
+                    .build();
+            
+            CompletableFuture<HttpResponse<String>> envio =
+                    httpClient.sendAsync(request, HttpResponse.BodyHandlers.ofString());
+            envio.whenComplete((response, erro) -> {
+                if (erro != null) {
+                    System.err.println("[CLASSIFICADOR] Erro ao publicar progresso no backend-gateway: " + erro.getMessage());
+                } else if (response.statusCode() != 200) {
+                    System.err.println("[CLASSIFICADOR] Backend-gateway recusou progresso. Status: " + response.statusCode());
+                }
+            });
+            
+        } catch (Exception e) {
+            System.err.println("[CLASSIFICADOR] Erro ao preparar evento de progresso: " + e.getMessage());
+        }
+    }
+    
     /**
      * Envia o resultado da classificação para o AgenteJulgador
      */
@@ -47,12 +47,14 @@ public class AgenteExplicador extends Agent {
                         // 2. Processa o pedido de explicação
                         String explicacao = gerarExplicacao(msg.getContent());
                         
-                        // 3. Extrair user_id dos dados
+                        // 3. Extrair user_id e request_id (correlação do gateway) dos dados
                         JsonNode dadosPaciente = objectMapper.readTree(msg.getContent());
                         String userId = dadosPaciente.get("user_id").asText();
+                        JsonNode requestIdNode = dadosPaciente.get("request_id");
+                        String requestId = (requestIdNode != null && !requestIdNode.isNull()) ? requestIdNode.asText() : null;
                         
                         // 4. Envia explicação para o backend-gateway
-                        enviarExplicacaoParaBackend(userId, explicacao);
+                        enviarExplicacaoParaBackend(userId, requestId, explicacao);
                         
                         // 5. Envia a explicação de volta para o agente solicitante
                         ACLMessage reply = msg.createReply();
@@ -209,11 +211,14 @@ public class AgenteExplicador extends Agent {
         return prompt.toString();
     }
     
-    private void enviarExplicacaoParaBackend(String userId, String explicacao) {
+    private void enviarExplicacaoParaBackend(String userId, String requestId, String explicacao) {
         try {
-            // Prepara os dados para envio
+            // Prepara os dados para envio (request_id identifica a requisição de origem no gateway)
             Map<String, String> data = new HashMap<>();
             data.put("explanation", explicacao);
+            if (requestId != null) {
+                data.put("request_id", requestId);
+            }
             
             String jsonData = objectMapper.writeValueAsString(data);
             
@@ -235,7 +240,7 @@ public class AgenteExplicador extends Agent {
             System.out.println("[EXPLICADOR] Response body: " + response.body());
             
             if (response.statusCode() == 200) {
-                System.out.println("[EXPLICADOR] Explicação enviada com sucesso para backend-gateway (userId: " + userId + ")");
+                System.out.println("[EXPLICADOR] Explicação enviada com sucesso para backend-gateway (userId: " + userId + ", requestId: " + requestId + ")");
             } else {
                 System.err.println("[EXPLICADOR] Erro ao enviar explicação para backend: " + response.statusCode());
                 System.err.println("[EXPLICADOR] Response: " + response.body());
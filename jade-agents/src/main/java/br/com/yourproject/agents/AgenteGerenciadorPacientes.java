@@ -4,6 +4,7 @@ import jade.core.Agent;
 import jade.core.AID;
 import jade.lang.acl.ACLMessage;
 import com.fasterxml.jackson.databind.ObjectMapper;
+import com.fasterxml.jackson.databind.JsonNode;
 
 import com.sun.net.httpserver.HttpServer;
 import com.sun.net.httpserver.HttpHandler;
@@ -13,6 +14,9 @@ import java.io.OutputStream;
 import java.io.InputStreamReader;
 import java.io.BufferedReader;
 import java.net.InetSocketAddress;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.Map;
 
 public class AgenteGerenciadorPacientes extends Agent {
 
@@ -37,6 +41,17 @@ public class AgenteGerenciadorPacientes extends Agent {
     }
 
     static class RegistroHttpHandler implements HttpHandler {
+        // request_ids já encaminhados: o gateway pode repetir o envio (hedging) e a
+        // análise deve começar uma única vez
+        private static final int MAX_REQUEST_IDS = 10000;
+        private static final long REQUEST_ID_TTL_MS = 120_000;
+        private final Map<String, Long> requestIdsRecentes = new LinkedHashMap<String, Long>() {
+            @Override
+            protected boolean removeEldestEntry(Map.Entry<String, Long> maisAntigo) {
+                return size() > MAX_REQUEST_IDS;
+            }
+        };
+        
         private Agent meuAgente;
 
         public RegistroHttpHandler(Agent a) {
@@ -88,7 +103,13 @@ public class AgenteGerenciadorPacientes extends Agent {
                 
                 // Verifica se é um JSON válido
                 ObjectMapper mapper = new ObjectMapper();
-                mapper.readTree(dadosJson); // Isso lança exceção se não for JSON válido
+                JsonNode dados = mapper.readTree(dadosJson); // Isso lança exceção se não for JSON válido
+                
+                JsonNode requestIdNode = dados.get("request_id");
+                if (requestIdNode != null && !requestIdNode.isNull() && !registrarRequestId(requestIdNode.asText())) {
+                    System.out.println("[GATEWAY HTTP] Requisição duplicada ignorada (requestId: " + requestIdNode.asText() + ")");
+                    return;
+                }
                 
                 // Cria mensagem para o AgenteClassificador
                 ACLMessage msg = new ACLMessage(ACLMessage.REQUEST);
@@ -106,5 +127,22 @@ public class AgenteGerenciadorPacientes extends Agent {
                 e.printStackTrace();
             }
         }
+        
+        /**
+         * Registra o request_id; retorna false se ele já foi encaminhado dentro do TTL
+         */
+        private synchronized boolean registrarRequestId(String requestId) {
+            long agora = System.currentTimeMillis();
+            // Ordem de inserção = ordem de idade: remove os expirados do início
+            Iterator<Long> instantes = requestIdsRecentes.values().iterator();
+            while (instantes.hasNext() && agora - instantes.next() > REQUEST_ID_TTL_MS) {
+                instantes.remove();
+            }
+            if (requestIdsRecentes.containsKey(requestId)) {
+                return false;
+            }
+            requestIdsRecentes.put(requestId, agora);
+            return true;
+        }
     }
 }
\ No newline at end of file